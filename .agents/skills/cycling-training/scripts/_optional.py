@@ -0,0 +1,63 @@
+"""
+Lazy access to optional third-party dependencies.
+
+The scripts are stdlib-only; NumPy (and friends) only speed up batch paths.
+Imports are attempted on first use, not at module import, so the CLIs keep
+a fast cold start, and the result (including "not installed") is cached.
+"""
+
+import importlib
+from array import array
+
+_modules = {}
+
+
+def load(name: str):
+    """Return the named module, or None when it is not installed."""
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        module = None
+    _modules[name] = module
+    return module
+
+
+def numpy():
+    """Return the numpy module, or None."""
+    return load('numpy')
+
+
+def is_array(samples) -> bool:
+    """True for ndarrays, array.array and memoryviews (buffer-backed samples)."""
+    return hasattr(samples, 'dtype') or isinstance(samples, (memoryview, array))
+
+
+def float_array(samples):
+    """
+    Convert power/HR samples to a float64 ndarray (requires NumPy).
+
+    ndarrays, array.array and memoryviews (e.g. mapped power streams) are
+    converted through the buffer protocol without a Python-level loop;
+    other iterables are read once. None and non-finite samples become 0.
+    """
+    np = numpy()
+    if is_array(samples):
+        values = np.asarray(samples, dtype=float)
+    else:
+        values = np.array([s if s is not None else 0.0 for s in samples], dtype=float)
+    return np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def round_like_python(values, ndigits: int):
+    """numpy.round() corrected to Python's round() at near-ties (rare)."""
+    np = numpy()
+    rounded = np.round(values, ndigits)
+    scaled = np.abs(values * 10.0 ** ndigits)
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded.flat[i] = round(float(values.flat[i]), ndigits)
+    return rounded
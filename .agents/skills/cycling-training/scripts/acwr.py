@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Acute:Chronic Workload Ratio (ACWR) series over a dated daily TSS history.
+
+Usage:
+    python acwr.py <history.csv>
+    python acwr.py history.csv --date 2026-03-01
+    python acwr.py history.csv --acute-days 7 --chronic-days 28 --json --series
+
+History file: same "date,tss" rows as pmc.py.
+
+analyze_week.py computes ACWR as ATL / CTL from two numbers, but the
+often-cited 0.8-1.3 band was derived from other ratios, and where a week
+lands depends on which one is used. Three variants are computed for every
+day, each classified with get_acwr_status():
+- coupled:   7-day mean load / 28-day mean load (the chronic window
+             includes the acute week; Hulin 2014)
+- uncoupled: 7-day mean load / mean load of the 21 days before it
+             (Windt & Gabbett 2018)
+- ewma:      EWMA acute / EWMA chronic with decay 2 / (N + 1)
+             (Williams 2017)
+
+Rolling means come from prefix sums, so each day costs O(1) whatever the
+window; the rolling variants are undefined (None) until a full chronic
+window is available. acwr_matrix() runs all three over a roster (athletes
+× days) with NumPy in O(days) vectorized steps.
+"""
+
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+from itertools import accumulate
+
+import _optional
+from analyze_week import calculate_acwr, get_acwr_status
+from pmc import daily_series, read_daily_tss
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+VARIANTS = ('coupled', 'uncoupled', 'ewma')
+
+
+def _check_windows(acute_days: int, chronic_days: int) -> None:
+    if acute_days < 1:
+        raise ValueError("acute_days must be at least 1")
+    if chronic_days <= acute_days:
+        raise ValueError("chronic_days must be longer than acute_days")
+
+
+def rolling_acwr(daily_tss, acute_days: int = ACUTE_DAYS, chronic_days: int = CHRONIC_DAYS,
+                 coupled: bool = True) -> list:
+    """
+    Rolling-average ACWR for every day of a daily TSS series, in one pass.
+
+    Day i compares the mean of the `acute_days` ending on day i with the
+    mean of the `chronic_days` ending on day i (coupled) or of the
+    chronic_days - acute_days before the acute window (uncoupled). None
+    until day chronic_days - 1; 0.0 when the chronic mean is 0, like
+    calculate_acwr().
+    """
+    _check_windows(acute_days, chronic_days)
+    prefix = [0.0]
+    prefix.extend(accumulate(float(tss) if tss is not None else 0.0 for tss in daily_tss))
+    chronic_span = chronic_days if coupled else chronic_days - acute_days
+    ratios = [None] * min(chronic_days - 1, len(prefix) - 1)
+    for end in range(chronic_days, len(prefix)):
+        acute = (prefix[end] - prefix[end - acute_days]) / acute_days
+        chronic_end = end if coupled else end - acute_days
+        chronic = (prefix[chronic_end] - prefix[end - chronic_days]) / chronic_span
+        ratios.append(calculate_acwr(chronic, acute))
+    return ratios
+
+
+def ewma_acwr(daily_tss, acute_days: int = ACUTE_DAYS, chronic_days: int = CHRONIC_DAYS,
+              acute: float = 0.0, chronic: float = 0.0) -> list:
+    """
+    EWMA ACWR for every day of a daily TSS series, in one pass.
+
+    Each load is an exponentially weighted mean with decay 2 / (N + 1);
+    `acute`/`chronic` seed them on the day before the first entry.
+    """
+    _check_windows(acute_days, chronic_days)
+    acute_decay, chronic_decay = 2 / (acute_days + 1), 2 / (chronic_days + 1)
+    ratios = []
+    for tss in daily_tss:
+        tss = float(tss) if tss is not None else 0.0
+        acute += (tss - acute) * acute_decay
+        chronic += (tss - chronic) * chronic_decay
+        ratios.append(calculate_acwr(chronic, acute))
+    return ratios
+
+
+def acwr_history(history, acute_days: int = ACUTE_DAYS, chronic_days: int = CHRONIC_DAYS,
+                 acute: float = 0.0, chronic: float = 0.0) -> dict:
+    """
+    All ACWR variants for a dated TSS history.
+
+    `history` is anything daily_series() accepts; `acute`/`chronic` seed
+    the EWMA loads. Returns parallel lists keyed "dates", "tss", one per
+    variant in VARIANTS, and "<variant>_status" with the get_acwr_status()
+    Status of each day (None where the ratio is), plus "start_date".
+    """
+    start, tss = daily_series(history)
+    result = {
+        "start_date": start,
+        "dates": [start + timedelta(days=i) for i in range(len(tss))],
+        "tss": tss,
+        "coupled": rolling_acwr(tss, acute_days, chronic_days, coupled=True),
+        "uncoupled": rolling_acwr(tss, acute_days, chronic_days, coupled=False),
+        "ewma": ewma_acwr(tss, acute_days, chronic_days, acute, chronic),
+    }
+    for variant in VARIANTS:
+        result[f"{variant}_status"] = [None if r is None else get_acwr_status(r)
+                                       for r in result[variant]]
+    return result
+
+
+def acwr_matrix(daily_tss, acute_days: int = ACUTE_DAYS, chronic_days: int = CHRONIC_DAYS,
+                acute=0.0, chronic=0.0) -> dict:
+    """
+    All ACWR variants for many aligned daily series at once.
+
+    `daily_tss` is a 2-D array (athletes × days), e.g. a roster sharing a
+    calendar; `acute`/`chronic` are scalars or one EWMA seed per athlete.
+    The rolling variants are prefix-sum differences over whole arrays and
+    the EWMA steps once per day over whole columns. Requires NumPy;
+    returns 2-D float arrays keyed by VARIANTS, NaN where a rolling ratio
+    is undefined. Classify with ACWR_STATUS.codes() on defined days.
+    """
+    numpy = _optional.numpy()
+    if numpy is None:
+        raise RuntimeError("acwr_matrix() requires NumPy; use acwr_history() per athlete")
+    _check_windows(acute_days, chronic_days)
+
+    loads = numpy.asarray(daily_tss, dtype=float)
+    if loads.ndim != 2:
+        raise ValueError("daily_tss must be a 2-D array (athletes x days)")
+    prefix = numpy.zeros((loads.shape[0], loads.shape[1] + 1))
+    numpy.cumsum(loads, axis=1, out=prefix[:, 1:])
+
+    def ratio(acute_load, chronic_load):
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return numpy.where(chronic_load > 0, acute_load / chronic_load, 0.0)
+
+    result = {}
+    end = numpy.arange(chronic_days, loads.shape[1] + 1)
+    acute_mean = (prefix[:, end] - prefix[:, end - acute_days]) / acute_days
+    for variant, chronic_end, span in (
+            ('coupled', end, chronic_days),
+            ('uncoupled', end - acute_days, chronic_days - acute_days)):
+        chronic_mean = (prefix[:, chronic_end] - prefix[:, end - chronic_days]) / span
+        values = numpy.full(loads.shape, numpy.nan)
+        values[:, chronic_days - 1:] = ratio(acute_mean, chronic_mean)
+        result[variant] = values
+
+    acute_load = numpy.broadcast_to(numpy.asarray(acute, dtype=float), loads.shape[:1]).copy()
+    chronic_load = numpy.broadcast_to(numpy.asarray(chronic, dtype=float), loads.shape[:1]).copy()
+    acute_decay, chronic_decay = 2 / (acute_days + 1), 2 / (chronic_days + 1)
+    acute_out = numpy.empty_like(loads)
+    chronic_out = numpy.empty_like(loads)
+    for day in range(loads.shape[1]):
+        tss = loads[:, day]
+        acute_load += (tss - acute_load) * acute_decay
+        chronic_load += (tss - chronic_load) * chronic_decay
+        acute_out[:, day] = acute_load
+        chronic_out[:, day] = chronic_load
+    result["ewma"] = ratio(acute_out, chronic_out)
+    return result
+
+
+def acwr_day(series: dict, index: int = -1) -> dict:
+    """Summarize one day of acwr_history(): each variant with its status."""
+    day = {"date": series["dates"][index].isoformat()}
+    for variant in VARIANTS:
+        value = series[variant][index]
+        day[variant] = {
+            "acwr": None if value is None else round(value, 2),
+            "status": series[f"{variant}_status"][index],
+        }
+    return day
+
+
+def print_day(day: dict, acute_days: int, chronic_days: int):
+    """Print the ACWR variants for one day."""
+    print(f"\n{'='*60}")
+    print(f"  ACWR on {day['date']} ({acute_days}-day acute, {chronic_days}-day chronic)")
+    print(f"{'='*60}\n")
+    for variant in VARIANTS:
+        value, status = day[variant]["acwr"], day[variant]["status"]
+        if value is None:
+            print(f"  {variant:>9}:  n/a   (needs {chronic_days} days of history)")
+        else:
+            print(f"  {variant:>9}:  {value:.2f}  {status['status']} - {status['recommendation']}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rolling (coupled/uncoupled) and EWMA ACWR from a daily TSS history')
+    parser.add_argument('history', help="CSV of 'date,tss' rows ('-' for stdin)")
+    parser.add_argument('--date', type=date.fromisoformat,
+                        help='Day to report (default: last day in history)')
+    parser.add_argument('--acute-days', type=int, default=ACUTE_DAYS,
+                        help=f'Acute window in days (default: {ACUTE_DAYS})')
+    parser.add_argument('--chronic-days', type=int, default=CHRONIC_DAYS,
+                        help=f'Chronic window in days (default: {CHRONIC_DAYS})')
+    parser.add_argument('--series', action='store_true', help='Include the full daily series in JSON output')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        series = acwr_history(read_daily_tss(args.history), args.acute_days, args.chronic_days)
+        index = (args.date - series["start_date"]).days if args.date else len(series["dates"]) - 1
+        if not 0 <= index < len(series["dates"]):
+            raise ValueError(f"{args.date} is outside the history "
+                             f"({series['dates'][0]} to {series['dates'][-1]})")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    day = acwr_day(series, index)
+    if not args.json:
+        print_day(day, args.acute_days, args.chronic_days)
+        return
+
+    output = {"acwr": day}
+    if args.series:
+        output["series"] = {
+            "dates": [d.isoformat() for d in series["dates"]],
+            **{variant: [None if v is None else round(v, 3) for v in series[variant]]
+               for variant in VARIANTS},
+        }
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,22 +8,37 @@ Usage:
     python analyze_week.py 450 65 72 --prev-week-tss 400 --daily-tss 60,80,0,70,90,80,70
     python analyze_week.py 450 65 72 --json
 
+    # Batch mode: one record per line (JSONL) or CSV row, one JSON result per line
+    python analyze_week.py --batch weeks.jsonl
+    python analyze_week.py --batch weeks.csv --workers 8
+    cat weeks.jsonl | python analyze_week.py --batch - --format jsonl
+
+Batch records have weekly_tss, ctl, atl and optional prev_week_tss, daily_tss
+(a list, or a comma/semicolon-separated string in CSV) and id (echoed back).
+
 Metrics calculated:
 - TSB (Training Stress Balance) = CTL - ATL
 - ACWR (Acute:Chronic Workload Ratio) = ATL / CTL
 - Ramp Rate = weekly CTL change estimate
 - Monotony & Strain (Foster 1998) - requires --daily-tss
+  (rolling_monotony_strain() gives a per-day series over any history)
 
 Heuristic thresholds (interpret cautiously; context matters):
 - ACWR: 0.8-1.3 often-cited "optimal" band (widely used; debated)
+  (acwr.py computes rolling and EWMA ACWR series from a daily history)
 - Ramp rate: <3 conservative, 3-5 moderate, 5-8 aggressive, >8 excessive
 - Monotony >2.0 can indicate elevated risk (Foster 1998)
 """
 
-import argparse
-import json
 import sys
 import math
+import os
+from array import array
+from bisect import bisect_left
+from collections import deque, namedtuple
+from itertools import islice, repeat
+
+import _optional
 
 
 def calculate_tsb(ctl: float, atl: float) -> float:
@@ -55,6 +70,12 @@ def calculate_monotony_strain(daily_tss: list) -> dict:
 
     # Standard deviation
     variance = sum((x - mean_tss) ** 2 for x in daily_tss) / len(daily_tss)
+    return _monotony_result(len(daily_tss), sum(daily_tss), variance)
+
+
+def _monotony_result(days: int, weekly_load: float, variance: float) -> dict:
+    """Monotony/strain result from a window's size, total and variance."""
+    mean_tss = weekly_load / days
     std_tss = math.sqrt(variance)
 
     if std_tss < 0.01:  # Avoid division by zero
@@ -62,7 +83,6 @@ def calculate_monotony_strain(daily_tss: list) -> dict:
                 "warning": "Training too uniform - add variety"}
 
     monotony = mean_tss / std_tss
-    weekly_load = sum(daily_tss)
     strain = weekly_load * monotony
 
     return {
@@ -74,6 +94,73 @@ def calculate_monotony_strain(daily_tss: list) -> dict:
     }
 
 
+class RollingMonotony:
+    """
+    Foster monotony/strain over a sliding window of daily TSS.
+
+    Keeps a running sum and sum of squares, so each day costs O(1)
+    instead of recomputing the window. The sums are re-added from the
+    window once per `window` days to stop floating-point drift over
+    multi-year histories (amortized O(1)). value() matches
+    calculate_monotony_strain() on the same days, including the
+    fewer-than-3-days and uniform-training cases.
+    """
+
+    __slots__ = ('window', '_days', '_sum', '_sumsq', '_since_sync')
+
+    def __init__(self, window: int = 7):
+        if window < 1:
+            raise ValueError("window must be at least 1 day")
+        self.window = window
+        self._days = deque(maxlen=window)
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_sync = 0
+
+    def add(self, tss: float) -> dict:
+        """Push one day's TSS (None = rest day); returns value()."""
+        tss = float(tss) if tss is not None else 0.0
+        if len(self._days) == self.window:
+            old = self._days[0]
+            self._sum -= old
+            self._sumsq -= old * old
+        self._days.append(tss)
+        self._since_sync += 1
+        if self._since_sync >= self.window:
+            self._sum = math.fsum(self._days)
+            self._sumsq = math.fsum(x * x for x in self._days)
+            self._since_sync = 0
+        else:
+            self._sum += tss
+            self._sumsq += tss * tss
+        return self.value()
+
+    def value(self) -> dict:
+        """Monotony/strain of the current window."""
+        n = len(self._days)
+        if n < 3:
+            return {"monotony": None, "strain": None, "error": "Need at least 3 days"}
+        mean = self._sum / n
+        return _monotony_result(n, self._sum, max(self._sumsq / n - mean * mean, 0.0))
+
+
+def rolling_monotony_strain(daily_tss, window: int = 7) -> dict:
+    """
+    Monotony and strain for every day of a daily TSS history, in one pass.
+
+    Day i uses the `window` days ending on day i (fewer at the start).
+    Returns parallel lists {"monotony": [...], "strain": [...]} with None
+    while fewer than 3 days are available and inf for uniform windows.
+    """
+    rolling = RollingMonotony(window)
+    monotony, strain = [], []
+    for tss in daily_tss:
+        result = rolling.add(tss)
+        monotony.append(result["monotony"])
+        strain.append(result["strain"])
+    return {"monotony": monotony, "strain": strain}
+
+
 def estimate_ramp_rate(weekly_tss: float, ctl: float) -> float:
     """
     Estimate weekly CTL change (ramp rate).
@@ -87,207 +174,321 @@ def estimate_ramp_rate(weekly_tss: float, ctl: float) -> float:
     return round(weekly_change, 1)
 
 
-def get_acwr_status(acwr: float) -> dict:
+class Status(dict):
+    """
+    Read-only status interpretation: {"status", "color", "recommendation"}.
+
+    A dict subclass, so it indexes and serializes exactly like the dicts
+    the classifiers used to build, but one instance per table row is
+    shared by every caller and any mutation raises TypeError.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, status: str, color: str, recommendation: str):
+        super().__init__(status=status, color=color, recommendation=recommendation)
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Status objects are shared and read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __hash__(self):
+        return hash((self["status"], self["color"], self["recommendation"]))
+
+    def __reduce__(self):
+        return Status, (self["status"], self["color"], self["recommendation"])
+
+    def to_dict(self) -> dict:
+        """Mutable copy."""
+        return dict(self)
+
+
+class StatusTable:
+    """
+    Declarative threshold table for one metric.
+
+    `rows` are (upper_bound, inclusive, Status) in ascending bound order: a
+    value takes the first row with value < bound (or <= bound when
+    inclusive), else `above`. Values are classified with bisect; NaN
+    falls through to `above` like the comparison chains did. Status codes
+    are row indexes (len(rows) for `above`), see statuses[code].
+    """
+
+    __slots__ = ('bounds', 'inclusive', 'statuses')
+
+    def __init__(self, rows, above: Status):
+        self.bounds = tuple(bound for bound, _, _ in rows)
+        self.inclusive = tuple(inclusive for _, inclusive, _ in rows)
+        self.statuses = tuple(status for _, _, status in rows) + (above,)
+
+    def code(self, value: float) -> int:
+        """Status code for one value."""
+        if value != value:  # NaN
+            return len(self.bounds)
+        i = bisect_left(self.bounds, value)
+        if i < len(self.bounds) and value == self.bounds[i] and not self.inclusive[i]:
+            i += 1
+        return i
+
+    def classify(self, value: float) -> Status:
+        """Shared Status for one value."""
+        return self.statuses[self.code(value)]
+
+    def codes(self, values):
+        """
+        Status codes for many values: a uint8 ndarray with NumPy (one
+        searchsorted pass), otherwise array('B').
+        """
+        numpy = _optional.numpy()
+        if numpy is None:
+            return array('B', map(self.code, values))
+        values = numpy.asarray(values, dtype=float)
+        bounds = numpy.array(self.bounds)
+        codes = numpy.searchsorted(bounds, values, side='left')
+        exclusive = ~numpy.array(self.inclusive + (True,))
+        padded = numpy.append(bounds, numpy.inf)
+        codes += (padded[codes] == values) & exclusive[codes]
+        return codes.astype(numpy.uint8)
+
+
+ACWR_STATUS = StatusTable([
+    (0.8, False, Status("UNDERTRAINED", "yellow", "Increase training load gradually to build fitness")),
+    (1.3, True, Status("OPTIMAL", "green", "Sweet spot - good balance of load and recovery")),
+    (1.5, True, Status("CAUTION", "orange", "Elevated injury risk - consider reducing acute load")),
+], Status("DANGER", "red", "High injury risk - reduce load immediately"))
+
+TSB_STATUS = StatusTable([
+    (-30, False, Status("VERY_FATIGUED", "red", "Overreaching - plan recovery days")),
+    (-10, False, Status("FATIGUED", "orange", "Building load - monitor recovery")),
+    (5, False, Status("NEUTRAL", "yellow", "Maintenance phase - ready for training")),
+    (25, False, Status("FRESH", "green", "Good form - ready for hard efforts or racing")),
+], Status("VERY_FRESH", "green", "Peak form - ideal for A races"))
+
+RAMP_STATUS = StatusTable([
+    (3, False, Status("CONSERVATIVE", "green", "Safe progression - good for base building")),
+    (5, True, Status("MODERATE", "green", "Standard progression - sustainable long-term")),
+    (8, True, Status("AGGRESSIVE", "orange", "Fast progression - monitor for overtraining signs")),
+], Status("EXCESSIVE", "red", "Too fast - high injury/overtraining risk"))
+
+MONOTONY_STATUS = StatusTable([
+    (1.5, False, Status("VARIED", "green", "Good training variety")),
+    (2.0, True, Status("MODERATE", "yellow", "Consider adding more recovery days")),
+], Status("HIGH_RISK", "red", "Training too uniform - increase rest day frequency"))
+
+MONOTONY_UNKNOWN = Status("UNKNOWN", "gray", "Need daily TSS data")
+
+
+def get_acwr_status(acwr: float) -> Status:
     """Get ACWR interpretation based on Gabbett 2016, Hulin 2014."""
-    if acwr < 0.8:
-        return {
-            "status": "UNDERTRAINED",
-            "color": "yellow",
-            "recommendation": "Increase training load gradually to build fitness"
-        }
-    elif acwr <= 1.3:
-        return {
-            "status": "OPTIMAL",
-            "color": "green",
-            "recommendation": "Sweet spot - good balance of load and recovery"
-        }
-    elif acwr <= 1.5:
-        return {
-            "status": "CAUTION",
-            "color": "orange",
-            "recommendation": "Elevated injury risk - consider reducing acute load"
-        }
-    else:
-        return {
-            "status": "DANGER",
-            "color": "red",
-            "recommendation": "High injury risk - reduce load immediately"
-        }
+    return ACWR_STATUS.classify(acwr)
 
 
-def get_tsb_status(tsb: float) -> dict:
+def get_tsb_status(tsb: float) -> Status:
     """Get TSB interpretation."""
-    if tsb < -30:
-        return {
-            "status": "VERY_FATIGUED",
-            "color": "red",
-            "recommendation": "Overreaching - plan recovery days"
-        }
-    elif tsb < -10:
-        return {
-            "status": "FATIGUED",
-            "color": "orange",
-            "recommendation": "Building load - monitor recovery"
-        }
-    elif tsb < 5:
-        return {
-            "status": "NEUTRAL",
-            "color": "yellow",
-            "recommendation": "Maintenance phase - ready for training"
-        }
-    elif tsb < 25:
-        return {
-            "status": "FRESH",
-            "color": "green",
-            "recommendation": "Good form - ready for hard efforts or racing"
-        }
-    else:
-        return {
-            "status": "VERY_FRESH",
-            "color": "green",
-            "recommendation": "Peak form - ideal for A races"
-        }
+    return TSB_STATUS.classify(tsb)
 
 
-def get_ramp_status(ramp: float) -> dict:
+def get_ramp_status(ramp: float) -> Status:
     """Get ramp rate interpretation (heuristic)."""
-    if ramp < 3:
-        return {
-            "status": "CONSERVATIVE",
-            "color": "green",
-            "recommendation": "Safe progression - good for base building"
-        }
-    elif ramp <= 5:
-        return {
-            "status": "MODERATE",
-            "color": "green",
-            "recommendation": "Standard progression - sustainable long-term"
-        }
-    elif ramp <= 8:
-        return {
-            "status": "AGGRESSIVE",
-            "color": "orange",
-            "recommendation": "Fast progression - monitor for overtraining signs"
-        }
-    else:
-        return {
-            "status": "EXCESSIVE",
-            "color": "red",
-            "recommendation": "Too fast - high injury/overtraining risk"
-        }
+    return RAMP_STATUS.classify(ramp)
 
 
-def get_monotony_status(monotony: float) -> dict:
+def get_monotony_status(monotony: float) -> Status:
     """Get monotony interpretation based on Foster 1998."""
     if monotony is None:
-        return {"status": "UNKNOWN", "color": "gray", "recommendation": "Need daily TSS data"}
+        return MONOTONY_UNKNOWN
+    return MONOTONY_STATUS.classify(monotony)
 
-    if monotony < 1.5:
-        return {
-            "status": "VARIED",
-            "color": "green",
-            "recommendation": "Good training variety"
-        }
-    elif monotony <= 2.0:
-        return {
-            "status": "MODERATE",
-            "color": "yellow",
-            "recommendation": "Consider adding more recovery days"
+
+def calculate_load_batch(ctl, atl, weekly_tss=None) -> dict:
+    """
+    TSB, ACWR and ramp rate for many athletes/days in one vectorized pass.
+
+    Takes equal-shape arrays (or scalars, broadcast) of CTL, ATL and,
+    optionally, weekly TSS - e.g. a roster x 365-day matrix. Returns
+    columns "tsb", "acwr", "acwr_mask" (True where ctl <= 0), "tsb_status"
+    and "acwr_status", plus "ramp_rate" and "ramp_status" when weekly_tss
+    is given. Values equal calculate_tsb(), calculate_acwr() and
+    estimate_ramp_rate() element for element (ACWR is 0.0 where masked);
+    status codes index TSB_STATUS.statuses etc. and match get_*_status().
+
+    With NumPy installed "acwr" is a masked array and the other columns
+    are ndarrays; otherwise 1-D array.array columns from a pure-Python
+    loop.
+    """
+    numpy = _optional.numpy()
+    if numpy is not None:
+        arrays = [numpy.asarray(ctl, dtype=float), numpy.asarray(atl, dtype=float)]
+        if weekly_tss is not None:
+            arrays.append(numpy.asarray(weekly_tss, dtype=float))
+        arrays = numpy.broadcast_arrays(*arrays)
+        ctl, atl = arrays[0], arrays[1]
+
+        tsb = ctl - atl
+        mask = ctl <= 0
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            acwr = numpy.where(mask, 0.0, atl / numpy.where(mask, 1.0, ctl))
+        result = {
+            "tsb": tsb,
+            "acwr": numpy.ma.masked_array(acwr, mask=mask, fill_value=0.0),
+            "acwr_mask": mask,
+            "tsb_status": TSB_STATUS.codes(tsb),
+            "acwr_status": ACWR_STATUS.codes(acwr),
         }
-    else:
+        if weekly_tss is not None:
+            ramp = _optional.round_like_python((arrays[2] / 7 - ctl) / 6 * 7, 1)
+            result["ramp_rate"] = ramp
+            result["ramp_status"] = RAMP_STATUS.codes(ramp)
+        return result
+
+    columns = [ctl, atl] + ([weekly_tss] if weekly_tss is not None else [])
+    sizes = {len(c) for c in columns if not isinstance(c, (int, float))}
+    if len(sizes) > 1:
+        raise ValueError("ctl, atl and weekly_tss must have the same length")
+    size = sizes.pop() if sizes else 1
+    columns = [repeat(c, size) if isinstance(c, (int, float)) else c for c in columns]
+
+    tsb_col, acwr_col, mask_col = array('d'), array('d'), array('B')
+    tsb_codes, acwr_codes = array('B'), array('B')
+    for c, a in zip(columns[0], columns[1]):
+        tsb = calculate_tsb(c, a)
+        acwr = calculate_acwr(c, a)
+        tsb_col.append(tsb)
+        acwr_col.append(acwr)
+        mask_col.append(c <= 0)
+        tsb_codes.append(TSB_STATUS.code(tsb))
+        acwr_codes.append(ACWR_STATUS.code(acwr))
+    result = {
+        "tsb": tsb_col,
+        "acwr": acwr_col,
+        "acwr_mask": mask_col,
+        "tsb_status": tsb_codes,
+        "acwr_status": acwr_codes,
+    }
+    if weekly_tss is not None:
+        ramp_col = array('d', map(estimate_ramp_rate, columns[2], columns[0]))
+        result["ramp_rate"] = ramp_col
+        result["ramp_status"] = RAMP_STATUS.codes(ramp_col)
+    return result
+
+
+class WeekWarning(namedtuple('WeekWarning', 'level message')):
+    """One analyze_week() warning ("high" or "moderate")."""
+
+    __slots__ = ()
+
+    def to_dict(self) -> dict:
+        return dict(zip(self._fields, self))
+
+
+class WeekAnalysis(namedtuple('WeekAnalysis', (
+        'weekly_tss', 'ctl', 'atl',
+        'tsb', 'acwr', 'ramp_rate', 'week_over_week_change', 'monotony', 'strain',
+        'tsb_status', 'acwr_status', 'ramp_status', 'monotony_status', 'warnings'))):
+    """
+    Compact analyze_week() result: one flat tuple instead of nested dicts.
+
+    Metrics are rounded as in the dict form. week_over_week_change is None
+    without a previous week; monotony_status is None without daily TSS
+    (monotony/strain may be None with daily TSS but fewer than 3 days).
+    Status objects are shared between results; warnings is a tuple of
+    WeekWarning. to_dict() builds the exact dict analyze_week() returns
+    (its statuses are the shared, read-only Status dicts).
+    """
+
+    __slots__ = ()
+
+    def to_dict(self) -> dict:
+        (weekly_tss, ctl, atl, tsb, acwr, ramp_rate, wow_change, monotony, strain,
+         tsb_status, acwr_status, ramp_status, monotony_status, warnings) = self
+        metrics = {"tsb": tsb, "acwr": acwr, "ramp_rate": ramp_rate}
+        status = {"tsb": tsb_status, "acwr": acwr_status, "ramp": ramp_status}
+        if wow_change is not None:
+            metrics["week_over_week_change"] = wow_change
+        if monotony_status is not None:
+            metrics["monotony"] = monotony
+            metrics["strain"] = strain
+            status["monotony"] = monotony_status
         return {
-            "status": "HIGH_RISK",
-            "color": "red",
-            "recommendation": "Training too uniform - increase rest day frequency"
+            "input": {"weekly_tss": weekly_tss, "ctl": ctl, "atl": atl},
+            "metrics": metrics,
+            "status": status,
+            "warnings": [w.to_dict() for w in warnings],
         }
 
 
-def analyze_week(weekly_tss: float, ctl: float, atl: float,
-                 prev_week_tss: float = None, daily_tss: list = None) -> dict:
-    """Perform comprehensive weekly analysis."""
+def analyze_week_compact(weekly_tss: float, ctl: float, atl: float,
+                         prev_week_tss: float = None, daily_tss: list = None,
+                         ramp_rate: float = None) -> WeekAnalysis:
+    """
+    Weekly analysis as a WeekAnalysis (see analyze_week() for the dict form).
 
+    `ramp_rate` is the exact CTL change over the week when known (e.g. a
+    PMC's ramp_rate); otherwise estimate_ramp_rate() approximates it.
+    """
     tsb = calculate_tsb(ctl, atl)
     acwr = calculate_acwr(ctl, atl)
-    ramp = estimate_ramp_rate(weekly_tss, ctl)
-
-    result = {
-        "input": {
-            "weekly_tss": weekly_tss,
-            "ctl": ctl,
-            "atl": atl
-        },
-        "metrics": {
-            "tsb": round(tsb, 1),
-            "acwr": round(acwr, 2),
-            "ramp_rate": ramp
-        },
-        "status": {
-            "tsb": get_tsb_status(tsb),
-            "acwr": get_acwr_status(acwr),
-            "ramp": get_ramp_status(ramp)
-        },
-        "warnings": []
-    }
+    ramp = estimate_ramp_rate(weekly_tss, ctl) if ramp_rate is None else round(ramp_rate, 1)
+    warnings = []
 
     # Add week-over-week comparison if previous week provided
+    wow_change = None
     if prev_week_tss is not None:
         wow_change = ((weekly_tss - prev_week_tss) / prev_week_tss * 100) if prev_week_tss > 0 else 0
-        result["metrics"]["week_over_week_change"] = round(wow_change, 1)
 
         if wow_change > 30:
-            result["warnings"].append({
-                "level": "high",
-                "message": f"Week-over-week TSS increase of {wow_change:.0f}% exceeds 30% threshold"
-            })
+            warnings.append(WeekWarning(
+                "high", f"Week-over-week TSS increase of {wow_change:.0f}% exceeds 30% threshold"))
         elif wow_change > 20:
-            result["warnings"].append({
-                "level": "moderate",
-                "message": f"Week-over-week TSS increase of {wow_change:.0f}% is aggressive"
-            })
+            warnings.append(WeekWarning(
+                "moderate", f"Week-over-week TSS increase of {wow_change:.0f}% is aggressive"))
+        wow_change = round(wow_change, 1)
 
     # Add Monotony/Strain if daily data provided
+    monotony = strain = monotony_status = None
     if daily_tss:
         ms = calculate_monotony_strain(daily_tss)
-        result["metrics"]["monotony"] = ms.get("monotony")
-        result["metrics"]["strain"] = ms.get("strain")
-        result["status"]["monotony"] = get_monotony_status(ms.get("monotony"))
+        monotony, strain = ms.get("monotony"), ms.get("strain")
+        monotony_status = get_monotony_status(ms.get("monotony"))
 
         if ms.get("monotony") and ms["monotony"] > 2.0:
-            result["warnings"].append({
-                "level": "high",
-                "message": f"Monotony {ms['monotony']:.1f} exceeds 2.0 - injury/illness risk elevated"
-            })
+            warnings.append(WeekWarning(
+                "high", f"Monotony {ms['monotony']:.1f} exceeds 2.0 - injury/illness risk elevated"))
 
     # Generate warnings based on metrics
     if acwr > 1.5:
-        result["warnings"].append({
-            "level": "high",
-            "message": f"ACWR {acwr:.2f} in danger zone (>1.5)"
-        })
+        warnings.append(WeekWarning("high", f"ACWR {acwr:.2f} in danger zone (>1.5)"))
     elif acwr > 1.3:
-        result["warnings"].append({
-            "level": "moderate",
-            "message": f"ACWR {acwr:.2f} elevated - monitor closely"
-        })
+        warnings.append(WeekWarning("moderate", f"ACWR {acwr:.2f} elevated - monitor closely"))
 
     if tsb < -30:
-        result["warnings"].append({
-            "level": "high",
-            "message": f"TSB {tsb:.0f} very negative - risk of overreaching"
-        })
+        warnings.append(WeekWarning("high", f"TSB {tsb:.0f} very negative - risk of overreaching"))
 
     if ramp > 8:
-        result["warnings"].append({
-            "level": "high",
-            "message": f"Ramp rate {ramp:.1f} too aggressive"
-        })
+        warnings.append(WeekWarning("high", f"Ramp rate {ramp:.1f} too aggressive"))
 
-    return result
+    return WeekAnalysis(
+        weekly_tss, ctl, atl,
+        round(tsb, 1), round(acwr, 2), ramp, wow_change, monotony, strain,
+        get_tsb_status(tsb), get_acwr_status(acwr), get_ramp_status(ramp), monotony_status,
+        tuple(warnings),
+    )
+
+
+def analyze_week(weekly_tss: float, ctl: float, atl: float,
+                 prev_week_tss: float = None, daily_tss: list = None,
+                 ramp_rate: float = None) -> dict:
+    """Perform comprehensive weekly analysis."""
+    return analyze_week_compact(weekly_tss, ctl, atl, prev_week_tss, daily_tss,
+                                ramp_rate).to_dict()
 
 
 def print_result(result: dict, as_json: bool = False):
     """Print analysis result."""
     if as_json:
+        import json
         print(json.dumps(result, indent=2))
         return
 
@@ -329,10 +530,134 @@ def parse_daily_tss(value: str) -> list:
     try:
         return [float(x.strip()) for x in value.split(',')]
     except ValueError:
+        import argparse
         raise argparse.ArgumentTypeError("Daily TSS must be comma-separated numbers (e.g., 60,80,0,70,90,80,70)")
 
 
+BATCH_FIELDS = ('weekly_tss', 'ctl', 'atl', 'prev_week_tss', 'daily_tss')
+
+
+def read_batch_records(stream, fmt: str = 'jsonl'):
+    """
+    Lazily yield (line_number, record) pairs from a JSONL or CSV stream.
+
+    Only one record is held in memory at a time. Malformed JSON lines are
+    yielded as a ValueError in place of the record so the caller can report
+    them and carry on.
+    """
+    import json
+    if fmt == 'csv':
+        import csv
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f"invalid JSON: {e}")
+
+
+def parse_batch_record(record: dict) -> dict:
+    """Convert a raw batch record into analyze_week() keyword arguments."""
+    kwargs = {}
+    for field in BATCH_FIELDS:
+        value = record.get(field)
+        if value is None or value == '':
+            if field in ('weekly_tss', 'ctl', 'atl'):
+                raise ValueError(f"missing required field '{field}'")
+            continue
+        if field == 'daily_tss':
+            if isinstance(value, str):
+                value = value.replace(';', ',').split(',')
+            kwargs[field] = [float(x) for x in value]
+        else:
+            kwargs[field] = float(value)
+    return kwargs
+
+
+def _analyze_batch_record(line_no: int, record) -> tuple:
+    """Analyze one batch record; returns (compact JSON line, failed)."""
+    import json
+    try:
+        if isinstance(record, Exception):
+            raise record
+        if not isinstance(record, dict):
+            raise ValueError("record must be a JSON object")
+        result = analyze_week(**parse_batch_record(record))
+        if record.get('id') not in (None, ''):
+            result = {"id": record['id'], **result}
+        failed = False
+    except (ValueError, TypeError) as e:
+        result = {"line": line_no, "error": str(e)}
+        failed = True
+    return json.dumps(result, separators=(',', ':')), failed
+
+
+def _analyze_batch_chunk(chunk: list) -> list:
+    """Worker entry point: analyze a chunk of (line_no, record) pairs."""
+    return [_analyze_batch_record(line_no, record) for line_no, record in chunk]
+
+
+def _chunked(iterable, size: int):
+    """Yield lists of up to `size` items."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def run_batch(in_stream, out_stream, fmt: str = 'jsonl',
+              workers: int = 1, chunk_size: int = 256) -> int:
+    """
+    Analyze every record in `in_stream`, writing one compact JSON line each.
+
+    Results stream out in input order with bounded memory. A record that
+    cannot be parsed produces {"line": n, "error": "..."} instead of a
+    result. Returns the number of failed records.
+
+    With workers > 1, records are sharded into chunks of `chunk_size` and
+    analyzed in a process pool (one pickle round-trip per chunk). At most
+    2 × workers chunks are in flight, and chunks are written back in
+    submission order, so output order and memory bounds are unchanged.
+    """
+    records = read_batch_records(in_stream, fmt)
+    if workers <= 1:
+        results = (_analyze_batch_record(line_no, record) for line_no, record in records)
+        return _write_batch_results(results, out_stream)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    def parallel_results(pool):
+        pending = deque()
+        for chunk in _chunked(records, chunk_size):
+            pending.append(pool.submit(_analyze_batch_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _write_batch_results(parallel_results(pool), out_stream)
+
+
+def _write_batch_results(results, out_stream) -> int:
+    """Write (line, failed) pairs to `out_stream`; returns the failure count."""
+    errors = 0
+    write = out_stream.write
+    for line, failed in results:
+        errors += failed
+        write(line)
+        write('\n')
+    return errors
+
+
 def main():
+    import argparse
     parser = argparse.ArgumentParser(
         description='Analyze weekly training load with evidence-based metrics',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -342,17 +667,50 @@ Examples:
   %(prog)s 450 65 72 --prev-week 400    With week-over-week comparison
   %(prog)s 450 65 72 --daily 60,80,0,70,90,80,70  With Monotony/Strain
   %(prog)s 450 65 72 --json             JSON output for scripting
+  %(prog)s --batch weeks.jsonl          One JSON result per input record
         """
     )
-    parser.add_argument('weekly_tss', type=float, help='Total weekly TSS')
-    parser.add_argument('ctl', type=float, help='Current CTL (Chronic Training Load)')
-    parser.add_argument('atl', type=float, help='Current ATL (Acute Training Load)')
+    parser.add_argument('weekly_tss', type=float, nargs='?', help='Total weekly TSS')
+    parser.add_argument('ctl', type=float, nargs='?', help='Current CTL (Chronic Training Load)')
+    parser.add_argument('atl', type=float, nargs='?', help='Current ATL (Acute Training Load)')
     parser.add_argument('--prev-week-tss', type=float, help='Previous week TSS for comparison')
     parser.add_argument('--daily-tss', type=parse_daily_tss,
                        help='Daily TSS values (comma-separated) for Monotony/Strain')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
-
-    args = parser.parse_args()
+    parser.add_argument('--batch', metavar='FILE',
+                       help="Analyze many records from a JSONL/CSV file ('-' for stdin)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'],
+                       help='Batch input format (default: from file extension, else jsonl)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes for --batch (default: 1; 0 = all CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=256,
+                       help='Records per worker task in --batch (default: 256)')
+
+    args = parser.parse_intermixed_args()
+    if not args.batch and args.atl is None:
+        parser.error("weekly_tss, ctl and atl are required unless --batch is given")
+    run(args)
+
+
+def run(args):
+    """Run the CLI for parsed arguments (see main(); also used by cycling.py)."""
+    if args.batch:
+        fmt = args.format or ('csv' if args.batch.lower().endswith('.csv') else 'jsonl')
+        try:
+            stream = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8', newline='')
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        workers = args.workers or os.cpu_count() or 1
+        try:
+            errors = run_batch(stream, sys.stdout, fmt, workers, max(1, args.chunk_size))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        if errors:
+            print(f"Warning: {errors} record(s) could not be analyzed", file=sys.stderr)
+            sys.exit(1)
+        return
 
     # Validate inputs
     if args.ctl < 0 or args.ctl > 200:
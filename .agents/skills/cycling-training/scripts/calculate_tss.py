@@ -13,13 +13,193 @@ Usage:
     # Estimate NP from AP with VI (Variability Index):
     python calculate_tss.py 250 --ap 200 --vi 1.05 60
 
+    # Compute NP and duration from a raw power stream (one sample per line,
+    # a CSV with a "power"/"watts" column, a binary .cyps stream or a FIT file):
+    python calculate_tss.py 250 --power-file ride.csv
+    python calculate_tss.py 250 --power-file ride.cyps
+    python calculate_tss.py 250 --power-file ride.fit
+    python calculate_tss.py 250 --power-file ride.csv --sample-rate 2
+
 TSS Formula: (Duration_sec × NP × IF) / (FTP × 3600) × 100
 IF (Intensity Factor) = NP / FTP
+NP (Normalized Power) = 4th root of the mean of (30 s rolling average power)^4
 """
 
-import argparse
-import json
+import math
 import sys
+from array import array
+from bisect import bisect_right
+from itertools import repeat
+
+import _optional
+
+NP_WINDOW_SEC = 30
+
+# IF lower bounds of zones 2..6; zone code = bisect_right(IF_ZONE_THRESHOLDS, IF)
+IF_ZONE_THRESHOLDS = (0.55, 0.75, 0.90, 1.05, 1.20)
+IF_ZONE_LABELS = (
+    "Z1 Recovery",
+    "Z2 Endurance",
+    "Z3 Tempo",
+    "Z4 Threshold",
+    "Z5 VO2max",
+    "Z6+ Anaerobic",
+)
+
+
+class NormalizedPowerStream:
+    """
+    One-pass, constant-memory Normalized Power accumulator.
+
+    The 30 s rolling mean is kept in a fixed-size ring buffer with a running
+    sum, so each sample costs O(1) regardless of ride length. The mean of the
+    4th powers of the rolling average is accumulated incrementally; the first
+    rolling value is produced once the window is full (TrainingPeaks/WKO
+    convention). Missing samples (None) count as 0 W, like a coasting dropout.
+    """
+
+    __slots__ = ('sample_rate_hz', '_window', '_ring', '_pos', '_window_sum',
+                 '_count', '_power_sum', '_fourth_sum', '_rolling_count')
+
+    def __init__(self, sample_rate_hz: float = 1.0, window_sec: float = NP_WINDOW_SEC):
+        if sample_rate_hz <= 0:
+            raise ValueError("sample_rate_hz must be positive")
+        self.sample_rate_hz = sample_rate_hz
+        self._window = max(1, int(round(window_sec * sample_rate_hz)))
+        self._ring = [0.0] * self._window
+        self._pos = 0
+        self._window_sum = 0.0
+        self._count = 0
+        self._power_sum = 0.0
+        self._fourth_sum = 0.0
+        self._rolling_count = 0
+
+    def add(self, watts: float) -> None:
+        """Add one power sample."""
+        watts = float(watts) if watts is not None else 0.0
+        pos = self._pos
+        self._window_sum += watts - self._ring[pos]
+        self._ring[pos] = watts
+        self._pos = pos + 1 if pos + 1 < self._window else 0
+        self._count += 1
+        self._power_sum += watts
+
+        if self._count >= self._window:
+            rolling = self._window_sum / self._window
+            self._fourth_sum += rolling * rolling * rolling * rolling
+            self._rolling_count += 1
+
+    def extend(self, samples) -> 'NormalizedPowerStream':
+        """Add every sample from an iterable; returns self for chaining."""
+        add = self.add
+        for watts in samples:
+            add(watts)
+        return self
+
+    @property
+    def count(self) -> int:
+        """Number of samples seen."""
+        return self._count
+
+    @property
+    def duration_sec(self) -> float:
+        """Elapsed time covered by the samples."""
+        return self._count / self.sample_rate_hz
+
+    @property
+    def average_power(self) -> float:
+        """Arithmetic mean power (0 for an empty stream)."""
+        return self._power_sum / self._count if self._count else 0.0
+
+    @property
+    def normalized_power(self) -> float:
+        """
+        Normalized Power of the samples seen so far.
+
+        Rides shorter than the rolling window have no rolling average, so
+        their NP falls back to average power.
+        """
+        if not self._rolling_count:
+            return self.average_power
+        return (self._fourth_sum / self._rolling_count) ** 0.25
+
+
+def normalized_power(samples, sample_rate_hz: float = 1.0) -> float:
+    """
+    Calculate Normalized Power from an iterable of power samples.
+
+    Buffer-backed samples (ndarray, array.array, memoryview such as a mapped
+    power stream) are processed vectorized when NumPy is installed.
+    """
+    if _optional.is_array(samples) and _optional.numpy() is not None:
+        return _array_power_stats(samples, sample_rate_hz)[2]
+    return NormalizedPowerStream(sample_rate_hz).extend(samples).normalized_power
+
+
+def _array_power_stats(samples, sample_rate_hz: float) -> tuple:
+    """(count, average power, NP) of buffer-backed samples using NumPy."""
+    numpy = _optional.numpy()
+    if sample_rate_hz <= 0:
+        raise ValueError("sample_rate_hz must be positive")
+    watts = _optional.float_array(samples)
+    count = len(watts)
+    if not count:
+        return 0, 0.0, 0.0
+    average = float(watts.mean())
+    window = max(1, int(round(NP_WINDOW_SEC * sample_rate_hz)))
+    if count < window:
+        return count, average, average
+    prefix = numpy.concatenate(([0.0], numpy.cumsum(watts)))
+    rolling = (prefix[window:] - prefix[:-window]) / window
+    return count, average, float(numpy.mean(rolling ** 4) ** 0.25)
+
+
+def read_power_samples(path: str):
+    """
+    Lazily yield power samples from a text file ('-' reads stdin).
+
+    Accepts one value per line, or CSV with a header row containing a
+    "power" or "watts" column. Blank lines, '#' comments and empty or
+    non-finite cells ("nan", dropouts) are skipped or read as None
+    respectively.
+    """
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        yield from parse_power_lines(stream, path)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def parse_power_lines(lines, name: str = '<input>', columns=('power', 'watts')):
+    """
+    Yield power samples from text lines (see read_power_samples()).
+
+    `columns` are the CSV header names accepted for the sample column, the
+    first also naming the samples in errors (e.g. heart rate files).
+    """
+    column = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        cells = line.split(',')
+        cell = cells[column].strip() if column < len(cells) else ''
+        if not cell:
+            yield None
+            continue
+        try:
+            value = float(cell)
+        except ValueError:
+            header = [c.strip().lower() for c in cells]
+            for name_ in columns:
+                if name_ in header:
+                    column = header.index(name_)
+                    break
+            else:
+                raise ValueError(f"{name}:{line_no}: not a {columns[0]} sample: {line!r}")
+            continue
+        yield value if math.isfinite(value) else None
 
 
 def calculate_tss(ftp: int, np: float, duration_min: float) -> dict:
@@ -29,18 +209,7 @@ def calculate_tss(ftp: int, np: float, duration_min: float) -> dict:
     tss = (duration_sec * np * intensity_factor) / (ftp * 3600) * 100
 
     # Training zone estimate based on IF
-    if intensity_factor < 0.55:
-        zone = "Z1 Recovery"
-    elif intensity_factor < 0.75:
-        zone = "Z2 Endurance"
-    elif intensity_factor < 0.90:
-        zone = "Z3 Tempo"
-    elif intensity_factor < 1.05:
-        zone = "Z4 Threshold"
-    elif intensity_factor < 1.20:
-        zone = "Z5 VO2max"
-    else:
-        zone = "Z6+ Anaerobic"
+    zone = IF_ZONE_LABELS[bisect_right(IF_ZONE_THRESHOLDS, intensity_factor)]
 
     return {
         "ftp": ftp,
@@ -53,9 +222,87 @@ def calculate_tss(ftp: int, np: float, duration_min: float) -> dict:
     }
 
 
+def calculate_tss_batch(ftp, np, duration_min) -> dict:
+    """
+    Score many workouts in one vectorized pass.
+
+    Takes equal-length sequences (or scalars, broadcast) of FTP, NP and
+    duration in minutes and returns columns "intensity_factor", "tss",
+    "zone_code" and "recovery_hours". Values are unrounded; zone codes index
+    IF_ZONE_LABELS using the same thresholds as calculate_tss().
+
+    With NumPy installed the columns are ndarrays; otherwise they are
+    array.array('d') / array.array('B') built by a pure-Python loop.
+    """
+    numpy = _optional.numpy()
+    if numpy is not None:
+        ftp, np, duration_min = numpy.broadcast_arrays(
+            numpy.asarray(ftp, dtype=float),
+            numpy.asarray(np, dtype=float),
+            numpy.asarray(duration_min, dtype=float))
+        intensity_factor = np / ftp
+        tss = (duration_min * 60 * np * intensity_factor) / (ftp * 3600) * 100
+        zone_code = numpy.searchsorted(IF_ZONE_THRESHOLDS, intensity_factor,
+                                       side='right').astype(numpy.uint8)
+        return {
+            "intensity_factor": intensity_factor,
+            "tss": tss,
+            "zone_code": zone_code,
+            "recovery_hours": tss / 50,
+        }
+
+    columns = [ftp, np, duration_min]
+    sizes = {len(c) for c in columns if not isinstance(c, (int, float))}
+    if len(sizes) > 1:
+        raise ValueError("ftp, np and duration_min must have the same length")
+    size = sizes.pop() if sizes else 1
+    columns = [repeat(c, size) if isinstance(c, (int, float)) else c for c in columns]
+
+    if_col, tss_col, zone_col, recovery_col = array('d'), array('d'), array('B'), array('d')
+    for f, n, d in zip(*columns):
+        intensity_factor = n / f
+        tss = (d * 60 * n * intensity_factor) / (f * 3600) * 100
+        if_col.append(intensity_factor)
+        tss_col.append(tss)
+        zone_col.append(bisect_right(IF_ZONE_THRESHOLDS, intensity_factor))
+        recovery_col.append(tss / 50)
+
+    return {
+        "intensity_factor": if_col,
+        "tss": tss_col,
+        "zone_code": zone_col,
+        "recovery_hours": recovery_col,
+    }
+
+
+def calculate_tss_from_stream(ftp: int, samples, sample_rate_hz: float = 1.0) -> dict:
+    """
+    Calculate TSS directly from raw power samples in a single pass.
+
+    NP and duration are derived from the stream, then fed into
+    calculate_tss(). Average power and VI are added to the result.
+    Buffer-backed samples (e.g. a mapped power stream) are processed
+    vectorized when NumPy is installed.
+    """
+    if _optional.is_array(samples) and _optional.numpy() is not None:
+        count, ap, np = _array_power_stats(samples, sample_rate_hz)
+    else:
+        stream = NormalizedPowerStream(sample_rate_hz).extend(samples)
+        count, ap, np = stream.count, stream.average_power, stream.normalized_power
+    if not count:
+        raise ValueError("Power stream is empty")
+
+    result = calculate_tss(ftp, np, count / sample_rate_hz / 60)
+    result["duration_minutes"] = round(result["duration_minutes"], 2)
+    result["average_power"] = round(ap, 1)
+    result["variability_index"] = round(np / ap, 3) if ap > 0 else None
+    return result
+
+
 def print_result(result: dict, as_json: bool = False):
     """Print TSS calculation result."""
     if as_json:
+        import json
         print(json.dumps(result, indent=2))
         return
 
@@ -63,6 +310,8 @@ def print_result(result: dict, as_json: bool = False):
     print(f"  TSS Calculation - FTP: {result['ftp']}W")
     print(f"{'='*50}\n")
     print(f"  Normalized Power:  {result['normalized_power']}W")
+    if 'average_power' in result:
+        print(f"  Average Power:     {result['average_power']}W (VI {result['variability_index']})")
     print(f"  Duration:          {result['duration_minutes']} min")
     print(f"  Intensity Factor:  {result['intensity_factor']}")
     print(f"  TSS:               {result['tss']}")
@@ -72,32 +321,61 @@ def print_result(result: dict, as_json: bool = False):
 
 
 def main():
-    parser = argparse.ArgumentParser(description='Calculate Training Stress Score (TSS)')
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Calculate Training Stress Score (TSS)',
+        usage='%(prog)s [options] FTP NP DURATION\n'
+              '       %(prog)s [options] FTP --ap AP DURATION\n'
+              '       %(prog)s [options] FTP --power-file FILE')
     parser.add_argument('ftp', type=int, help='FTP in watts')
-    parser.add_argument('np', type=float, nargs='?', help='Normalized Power in watts')
-    parser.add_argument('duration', type=float, help='Duration in minutes')
+    parser.add_argument('workout', type=float, nargs='*', metavar='NP DURATION',
+                       help='Normalized Power (W) and duration (min); only the duration '
+                            'with --ap, neither with --power-file')
     parser.add_argument('--ap', type=float, help='Average Power (instead of NP)')
     parser.add_argument('--vi', type=float, default=1.0,
                        help='Variability Index to estimate NP from AP (default: 1.0)')
+    parser.add_argument('--power-file', metavar='FILE',
+                       help="Raw power samples to derive NP and duration from ('-' for stdin)")
+    parser.add_argument('--sample-rate', type=float,
+                       help='Samples per second in --power-file (default: .cyps header rate, else 1)')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
 
-    args = parser.parse_args()
+    run(parser.parse_intermixed_args())
+
 
+def run(args):
+    """Run the CLI for parsed arguments (see main(); also used by cycling.py)."""
     # Validate FTP
     if args.ftp < 50 or args.ftp > 500:
         print("Error: FTP should be between 50-500W", file=sys.stderr)
         sys.exit(1)
 
-    # Determine NP
-    if args.ap:
-        np = args.ap * args.vi
-    elif args.np:
-        np = args.np
-    else:
-        print("Error: Provide either NP or --ap", file=sys.stderr)
+    if args.power_file:
+        if args.workout:
+            print("Error: --power-file derives NP and duration; omit them", file=sys.stderr)
+            sys.exit(1)
+        from power_stream import power_samples
+        try:
+            with power_samples(args.power_file, args.sample_rate) as (samples, rate):
+                result = calculate_tss_from_stream(args.ftp, samples, rate)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print_result(result, args.json)
+        return
+
+    # NP DURATION, or only DURATION when NP is estimated from --ap
+    expected = 1 if args.ap else 2
+    if not args.workout:
+        print("Error: Provide a duration in minutes", file=sys.stderr)
+        sys.exit(1)
+    if len(args.workout) != expected:
+        usage = "FTP --ap AP DURATION" if args.ap else "FTP NP DURATION (or FTP --ap AP DURATION)"
+        print(f"Error: Expected {usage}", file=sys.stderr)
         sys.exit(1)
 
-    result = calculate_tss(args.ftp, np, args.duration)
+    np = args.ap * args.vi if args.ap else args.workout[0]
+    result = calculate_tss(args.ftp, np, args.workout[-1])
     print_result(result, args.json)
 
 
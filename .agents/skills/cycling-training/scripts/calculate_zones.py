@@ -12,48 +12,61 @@ Usage:
     python calculate_zones.py 250 --lthr 165
     python calculate_zones.py 250 --lthr 165 --hr-model karvonen --age 40 --rhr 50
 
+    # Time in zone for a ride (power file as in calculate_tss.py --power-file)
+    python calculate_zones.py 250 --power-file ride.csv
+
 Power models: coggan (default), seiler, isf
 HR models: percent-lthr (default), karvonen
 """
 
-import argparse
-import json
+import math
 import sys
+from collections import namedtuple
+from functools import lru_cache
+
+import _optional
+
+def coggan_bounds(ftp: int) -> list:
+    """Lower watt bound of Coggan zones 2-7 (Z1 starts at 0 W)."""
+    return [
+        int(ftp * 0.55),
+        int(ftp * 0.75) + 1,
+        int(ftp * 0.90) + 1,
+        int(ftp * 1.05) + 1,
+        int(ftp * 1.20) + 1,
+        int(ftp * 1.50) + 1,
+    ]
+
 
 def coggan_zones(ftp: int) -> dict:
     """Coggan 7-zone model."""
-    # Compute boundaries to ensure zone continuity (no gaps)
-    z1_upper = int(ftp * 0.55) - 1
-    z2_lower = z1_upper + 1
-    z2_upper = int(ftp * 0.75)
-    z3_lower = z2_upper + 1
-    z3_upper = int(ftp * 0.90)
-    z4_lower = z3_upper + 1
-    z4_upper = int(ftp * 1.05)
-    z5_lower = z4_upper + 1
-    z5_upper = int(ftp * 1.20)
-    z6_lower = z5_upper + 1
-    z6_upper = int(ftp * 1.50)
+    # Each zone ends 1W below the next zone's lower bound (no gaps)
+    z2_lower, z3_lower, z4_lower, z5_lower, z6_lower, z7_lower = coggan_bounds(ftp)
 
     return {
         "model": "Coggan 7-Zone",
         "ftp": ftp,
         "zones": {
             "Z1 Active Recovery": {"range": f"< {z2_lower}W", "percent": "<55%", "use": "Recovery rides"},
-            "Z2 Endurance": {"range": f"{z2_lower}-{z2_upper}W", "percent": "55-75%", "use": "Aerobic base"},
-            "Z3 Tempo": {"range": f"{z3_lower}-{z3_upper}W", "percent": "76-90%", "use": "Muscular endurance"},
-            "Z4 Threshold": {"range": f"{z4_lower}-{z4_upper}W", "percent": "91-105%", "use": "FTP development"},
-            "Z5 VO2max": {"range": f"{z5_lower}-{z5_upper}W", "percent": "106-120%", "use": "Aerobic capacity"},
-            "Z6 Anaerobic": {"range": f"{z6_lower}-{z6_upper}W", "percent": "121-150%", "use": "AC intervals"},
-            "Z7 Neuromuscular": {"range": f"> {z6_upper}W", "percent": ">150%", "use": "Sprints"},
+            "Z2 Endurance": {"range": f"{z2_lower}-{z3_lower - 1}W", "percent": "55-75%", "use": "Aerobic base"},
+            "Z3 Tempo": {"range": f"{z3_lower}-{z4_lower - 1}W", "percent": "76-90%", "use": "Muscular endurance"},
+            "Z4 Threshold": {"range": f"{z4_lower}-{z5_lower - 1}W", "percent": "91-105%", "use": "FTP development"},
+            "Z5 VO2max": {"range": f"{z5_lower}-{z6_lower - 1}W", "percent": "106-120%", "use": "Aerobic capacity"},
+            "Z6 Anaerobic": {"range": f"{z6_lower}-{z7_lower - 1}W", "percent": "121-150%", "use": "AC intervals"},
+            "Z7 Neuromuscular": {"range": f"> {z7_lower - 1}W", "percent": ">150%", "use": "Sprints"},
         }
     }
 
+def seiler_bounds(ftp: int) -> list:
+    """Lower watt bound of Seiler zones 2-3 (Zone 1 starts at 0 W)."""
+    # Approximation: LT1 ~75% FTP, LT2 ~FTP
+    return [int(ftp * 0.75), ftp + 1]
+
+
 def seiler_zones(ftp: int) -> dict:
     """Seiler 3-zone polarized model."""
-    # Approximation: LT1 ~75% FTP, LT2 ~FTP
-    lt1 = int(ftp * 0.75)
-    lt2 = ftp
+    lt1, z3_lower = seiler_bounds(ftp)
+    lt2 = z3_lower - 1
     return {
         "model": "Seiler 3-Zone (Polarized)",
         "ftp": ftp,
@@ -64,44 +77,138 @@ def seiler_zones(ftp: int) -> dict:
         }
     }
 
+def isf_bounds(ftp: int) -> list:
+    """Lower watt bound of ISF zones 2-5 (Z1 starts at 0 W)."""
+    return [
+        int(ftp * 0.55),
+        int(ftp * 0.75) + 1,
+        int(ftp * 0.90) + 1,
+        int(ftp * 1.05) + 1,
+    ]
+
+
 def isf_zones(ftp: int) -> dict:
     """ISF 5-zone simplified model."""
-    # Compute boundaries to ensure zone continuity (no gaps)
-    z2_lower = int(ftp * 0.55)
-    z2_upper = int(ftp * 0.75)
-    z3_lower = z2_upper + 1
-    z3_upper = int(ftp * 0.90)
-    z4_lower = z3_upper + 1
-    z4_upper = int(ftp * 1.05)
-    z5_lower = z4_upper + 1
+    # Each zone ends 1W below the next zone's lower bound (no gaps)
+    z2_lower, z3_lower, z4_lower, z5_lower = isf_bounds(ftp)
 
     return {
         "model": "ISF 5-Zone",
         "ftp": ftp,
         "zones": {
             "Z1 Recovery": {"range": f"< {z2_lower}W", "percent": "<55%", "use": "Active recovery"},
-            "Z2 Endurance": {"range": f"{z2_lower}-{z2_upper}W", "percent": "55-75%", "use": "Aerobic base"},
-            "Z3 Tempo": {"range": f"{z3_lower}-{z3_upper}W", "percent": "76-90%", "use": "Tempo/Sweet spot"},
-            "Z4 Threshold": {"range": f"{z4_lower}-{z4_upper}W", "percent": "91-105%", "use": "Threshold"},
-            "Z5 VO2max+": {"range": f"> {z4_upper}W", "percent": ">105%", "use": "VO2max and above"},
+            "Z2 Endurance": {"range": f"{z2_lower}-{z3_lower - 1}W", "percent": "55-75%", "use": "Aerobic base"},
+            "Z3 Tempo": {"range": f"{z3_lower}-{z4_lower - 1}W", "percent": "76-90%", "use": "Tempo/Sweet spot"},
+            "Z4 Threshold": {"range": f"{z4_lower}-{z5_lower - 1}W", "percent": "91-105%", "use": "Threshold"},
+            "Z5 VO2max+": {"range": f"> {z5_lower - 1}W", "percent": ">105%", "use": "VO2max and above"},
         }
     }
 
 
+# Upper end of the watt -> zone lookup tables
+LOOKUP_MAX_WATTS = 2500
+
+POWER_MODELS = {
+    'coggan': (coggan_zones, coggan_bounds),
+    'seiler': (seiler_zones, seiler_bounds),
+    'isf': (isf_zones, isf_bounds),
+}
+
+
+def power_zone_bounds(ftp: int, model: str = 'coggan') -> list:
+    """Numeric lower bounds (W) of zones 2..N for a power model."""
+    return POWER_MODELS[model][1](ftp)
+
+
+# Cached power zone model for one (model, FTP) pair (collections.namedtuple
+# rather than typing.NamedTuple: importing typing costs ~4 ms of CLI start).
+#   zones   Same dict as coggan_zones() etc.; shared, do not mutate
+#   names   Zone names in order
+#   bounds  Lower bounds (W) of zones 2..N
+#   lookup  lookup[watts] -> zone index for integer watts 0..LOOKUP_MAX_WATTS
+ZoneModel = namedtuple('ZoneModel', 'zones names bounds lookup')
+
+
+def lookup_table(bounds, size: int) -> bytes:
+    """Dense value -> zone index table for integer values 0..size-1."""
+    table = bytearray()
+    edges = [0] + [min(max(b, 0), size) for b in bounds] + [size]
+    for zone, (lo, hi) in enumerate(zip(edges, edges[1:])):
+        table += bytes([zone]) * max(hi - lo, 0)
+    return bytes(table)
+
+
+@lru_cache(maxsize=256)
+def zone_model(model: str, ftp: int) -> ZoneModel:
+    """
+    Build (once) the zone dict and watt lookup table for a model and FTP.
+
+    Results are kept in a bounded LRU cache keyed by (model, ftp), so a
+    roster sharing a handful of FTPs builds each model once. Classifying
+    an integer wattage is then a single index: lookup[min(watts, 2500)].
+    """
+    zone_fn, bounds_fn = POWER_MODELS[model]
+    zones = zone_fn(ftp)
+    bounds = tuple(bounds_fn(ftp))
+    if bounds[-1] > LOOKUP_MAX_WATTS:
+        raise ValueError(f"FTP {ftp}W is too high for the {LOOKUP_MAX_WATTS}W lookup table")
+    return ZoneModel(zones, tuple(zones["zones"]), bounds,
+                     lookup_table(bounds, LOOKUP_MAX_WATTS + 1))
+
+
+def time_in_zone(samples, ftp: int, model: str = 'coggan', sample_rate_hz: float = 1.0) -> dict:
+    """
+    Seconds spent in each power zone, in one pass over the stream.
+
+    Samples are floored to whole watts, clamped to 0..2500 W and classified
+    through the cached zone_model() lookup table (one array index per
+    sample; a vectorized gather + bincount when NumPy is installed). A
+    sample belongs to the highest zone whose lower bound it reaches.
+    Missing (None) and non-finite samples count as 0 W. Returns an ordered
+    dict of zone name -> seconds.
+    """
+    zm = zone_model(model, ftp)
+    dt = 1.0 / sample_rate_hz
+
+    numpy = _optional.numpy()
+    if numpy is not None:
+        watts = _optional.float_array(samples)
+        index = numpy.clip(watts, 0, LOOKUP_MAX_WATTS).astype(numpy.intp)
+        zones = numpy.frombuffer(zm.lookup, dtype=numpy.uint8)[index]
+        counts = numpy.bincount(zones, minlength=len(zm.names)).tolist()
+    else:
+        lookup = zm.lookup
+        counts = [0] * len(zm.names)
+        for w in samples:
+            if not w or not 0 < w < math.inf:
+                counts[0] += 1
+            else:
+                counts[lookup[int(w) if w < LOOKUP_MAX_WATTS else LOOKUP_MAX_WATTS]] += 1
+
+    return {name: n * dt for name, n in zip(zm.names, counts)}
+
+
+def hr_lthr_bounds(lthr: int) -> list:
+    """Lower bpm bound of %LTHR zones Z2-Z5c (Z1 starts at 0 bpm)."""
+    return [
+        int(lthr * 0.81),
+        int(lthr * 0.89) + 1,
+        int(lthr * 0.93) + 1,
+        int(lthr * 0.99) + 1,
+        int(lthr * 1.02) + 1,
+        int(lthr * 1.06) + 1,
+    ]
+
+
 def hr_zones_percent_lthr(lthr: int) -> dict:
     """Heart rate zones based on % of LTHR (Coggan model)."""
-    # Compute boundaries to ensure zone continuity (no gaps)
-    z1_upper = int(lthr * 0.81) - 1
-    z2_lower = z1_upper + 1
-    z2_upper = int(lthr * 0.89)
-    z3_lower = z2_upper + 1
-    z3_upper = int(lthr * 0.93)
-    z4_lower = z3_upper + 1
-    z4_upper = int(lthr * 0.99)
-    z5a_lower = z4_upper + 1
-    z5a_upper = int(lthr * 1.02)
-    z5b_lower = z5a_upper + 1
-    z5b_upper = int(lthr * 1.06)
+    # Each zone ends 1 bpm below the next zone's lower bound (no gaps)
+    z2_lower, z3_lower, z4_lower, z5a_lower, z5b_lower, z5c_lower = hr_lthr_bounds(lthr)
+    z2_upper = z3_lower - 1
+    z3_upper = z4_lower - 1
+    z4_upper = z5a_lower - 1
+    z5a_upper = z5b_lower - 1
+    z5b_upper = z5c_lower - 1
 
     return {
         "model": "HR Zones (% LTHR)",
@@ -118,6 +225,18 @@ def hr_zones_percent_lthr(lthr: int) -> dict:
     }
 
 
+def hr_karvonen_bounds(age: int, rhr: int) -> list:
+    """
+    Lower bpm bound of Karvonen zones Z2-Z5 (Z1 starts at 0 bpm).
+
+    A bpm shared by two printed ranges belongs to the higher zone; Z5
+    ("> X bpm") starts at X + 1.
+    """
+    hrr = (220 - age) - rhr
+    return [int(rhr + hrr * 0.60), int(rhr + hrr * 0.70), int(rhr + hrr * 0.80),
+            int(rhr + hrr * 0.90) + 1]
+
+
 def hr_zones_karvonen(lthr: int, age: int, rhr: int) -> dict:
     """Heart rate zones using Karvonen formula (Heart Rate Reserve)."""
     max_hr = 220 - age
@@ -146,6 +265,7 @@ def hr_zones_karvonen(lthr: int, age: int, rhr: int) -> dict:
 def print_zones(zones_data: dict, as_json: bool = False):
     """Print zones in human-readable or JSON format."""
     if as_json:
+        import json
         print(json.dumps(zones_data, indent=2))
         return
 
@@ -165,7 +285,21 @@ def print_zones(zones_data: dict, as_json: bool = False):
         print(f"    Use:   {zone_data['use']}")
         print()
 
+def print_time_in_zone(tiz: dict, as_json: bool = False):
+    """Print seconds per zone with the share of total ride time."""
+    if as_json:
+        import json
+        print(json.dumps({"time_in_zone_seconds": tiz}, indent=2))
+        return
+
+    total = sum(tiz.values()) or 1
+    print("  Time in Zone")
+    for zone_name, seconds in tiz.items():
+        print(f"    {zone_name:22} {seconds / 60:7.1f} min  {seconds / total * 100:5.1f}%")
+    print()
+
 def main():
+    import argparse
     parser = argparse.ArgumentParser(description='Calculate cycling power and heart rate zones')
     parser.add_argument('ftp', type=int, help='FTP in watts')
     parser.add_argument('--model', choices=['coggan', 'seiler', 'isf'], default='coggan',
@@ -175,10 +309,17 @@ def main():
                        help='HR zone model (default: percent-lthr)')
     parser.add_argument('--age', type=int, help='Age for Karvonen model')
     parser.add_argument('--rhr', type=int, help='Resting HR for Karvonen model')
+    parser.add_argument('--power-file', metavar='FILE',
+                       help="Report time in each power zone for a ride ('-' for stdin)")
+    parser.add_argument('--sample-rate', type=float,
+                       help='Samples per second in --power-file (default: .cyps header rate, else 1)')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
 
-    args = parser.parse_args()
+    run(parser.parse_args())
+
 
+def run(args):
+    """Run the CLI for parsed arguments (see main(); also used by cycling.py)."""
     if args.ftp < 50 or args.ftp > 500:
         print("Error: FTP should be between 50-500W", file=sys.stderr)
         sys.exit(1)
@@ -193,6 +334,16 @@ def main():
     power_zones = power_models[args.model](args.ftp)
     print_zones(power_zones, args.json)
 
+    if args.power_file:
+        from power_stream import power_samples
+        try:
+            with power_samples(args.power_file, args.sample_rate) as (samples, rate):
+                tiz = time_in_zone(samples, args.ftp, args.model, rate)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print_time_in_zone(tiz, args.json)
+
     # Calculate HR zones if LTHR provided
     if args.lthr:
         if args.lthr < 100 or args.lthr > 220:
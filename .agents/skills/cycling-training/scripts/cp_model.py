@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Critical Power (CP) and W' model fitting from a mean-maximal power curve.
+
+Usage:
+    python cp_model.py ride.csv
+    python cp_model.py ride.fit --model 3p --json
+    python cp_model.py curve.json --curve --min-duration 180 --max-duration 1200
+    python cp_model.py ride.csv --zones          # Coggan zones with CP as FTP
+
+The input is a power file (same formats as mmp.py), or with --curve the
+JSON output of mmp.py --json (e.g. a season-best curve).
+
+Models (t = duration in seconds, P = mean-maximal power):
+- 2p:  P = CP + W'/t                      (hyperbolic, Monod & Scherrer)
+- 3p:  P = CP + W'/(t + k), k = W'/(Pmax - CP)           (Morton 1996)
+- exp: P = CP + (Pmax - CP) * exp(-t/tau), W' = (Pmax - CP) * tau
+
+Each model is linear in CP and a second coefficient once its shape
+parameter (none, k or tau) is fixed, so the coefficients come from
+closed-form least squares. k and tau are found by a coarse-to-fine grid
+search: each pass scores all candidates at once (one array operation with
+NumPy) and the next pass zooms in on the best. A fit takes a few
+milliseconds with NumPy.
+
+The fitted "cp", rounded as "ftp", can be passed straight to
+coggan_zones() or calculate_tss().
+"""
+
+import argparse
+import json
+import math
+import sys
+
+import _optional
+
+MODELS = ('2p', '3p', 'exp')
+
+# Default fitted duration range (s) per model: the 2-parameter model only
+# describes efforts of roughly 2-20 min; the others also cover sprints.
+DEFAULT_RANGES = {'2p': (120, 1200), '3p': (1, 1200), 'exp': (1, 1200)}
+
+# Search range for the shape parameter (k or tau, seconds)
+SHAPE_RANGES = {'3p': (0.1, 600.0), 'exp': (1.0, 3600.0)}
+
+DEFAULT_CANDIDATES = 512
+_PASSES = 3
+
+
+def _regressor(model: str, t, shape, lib):
+    """x(t) for P = a + b*x; `lib` is math for floats or numpy for arrays."""
+    if model == '2p':
+        return 1.0 / t
+    if model == '3p':
+        return 1.0 / (t + shape)
+    return lib.exp(-t / shape)
+
+
+def _score(model: str, t: list, p: list, shapes: list) -> tuple:
+    """
+    Least-squares fit for each candidate shape; returns the best as
+    (shape, a, b, sse). Candidates with b <= 0 are not CP-shaped and are
+    skipped; returns None when none qualifies.
+    """
+    numpy = _optional.numpy()
+    if numpy is not None:
+        t_arr, p_arr = numpy.asarray(t, dtype=float), numpy.asarray(p, dtype=float)
+        x = _regressor(model, t_arr[None, :], numpy.asarray(shapes, dtype=float)[:, None], numpy)
+        n = len(p)
+        xm = x.sum(axis=1) / n
+        dp = p_arr - p_arr.mean()
+        sxx = numpy.einsum('ij,ij->i', x, x) - n * xm * xm  # Centered sums without
+        sxy = x @ dp                                        # materializing x - xm
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            b = numpy.where(sxx > 0, sxy / sxx, 0.0)
+        sse = numpy.where(b > 0, dp @ dp - b * sxy, numpy.inf)
+        i = int(numpy.argmin(sse))
+        if not math.isfinite(sse[i]):
+            return None
+        return shapes[i], float(p_arr.mean() - b[i] * xm[i]), float(b[i]), max(float(sse[i]), 0.0)
+
+    n = len(p)
+    pm = sum(p) / n
+    dp = [v - pm for v in p]
+    syy = sum(d * d for d in dp)
+    best = None
+    for shape in shapes:
+        x = [_regressor(model, ti, shape, math) for ti in t]
+        xm = sum(x) / n
+        sxx = sxy = 0.0
+        for xi, di in zip(x, dp):
+            xi -= xm
+            sxx += xi * xi
+            sxy += xi * di
+        b = sxy / sxx if sxx > 0 else 0.0
+        if b <= 0:
+            continue
+        sse = syy - b * sxy
+        if best is None or sse < best[3]:
+            best = (shape, pm - b * xm, b, max(sse, 0.0))
+    return best
+
+
+def _search(model: str, t: list, p: list, candidates: int) -> tuple:
+    """Coarse-to-fine grid search over the model's shape parameter."""
+    if model == '2p':
+        return _score(model, t, p, [None])
+    lo, hi = SHAPE_RANGES[model]
+    shapes = [lo * (hi / lo) ** (i / (candidates - 1)) for i in range(candidates)]
+    best = None
+    for _ in range(_PASSES):
+        best = _score(model, t, p, shapes)
+        if best is None:
+            return None
+        i = shapes.index(best[0])
+        lo, hi = shapes[max(i - 1, 0)], shapes[min(i + 1, len(shapes) - 1)]
+        shapes = [lo + (hi - lo) * j / (candidates - 1) for j in range(candidates)]
+    return best
+
+
+def _fit_points(curve: dict, model: str, min_duration, max_duration) -> tuple:
+    default_min, default_max = DEFAULT_RANGES[model]
+    lo = default_min if min_duration is None else min_duration
+    hi = default_max if max_duration is None else max_duration
+    points = [(float(d), float(w)) for d, w in zip(curve["durations"], curve["power"])
+              if lo <= d <= hi and w is not None and w > 0]
+    needed = 2 if model == '2p' else 3
+    if len(points) < needed:
+        raise ValueError(f"{model} model needs at least {needed} MMP points "
+                         f"between {lo:g} and {hi:g} s, got {len(points)}")
+    return [d for d, _ in points], [w for _, w in points], lo, hi
+
+
+def fit_cp(curve: dict, model: str = '2p', min_duration: float = None,
+           max_duration: float = None, candidates: int = DEFAULT_CANDIDATES) -> dict:
+    """
+    Fit a CP model to a power-duration curve.
+
+    `curve` is {"durations": [...], "power": [...]} as returned by
+    mean_max_power(); only durations within [min_duration, max_duration]
+    (default DEFAULT_RANGES[model]) are used. `candidates` is the grid size
+    per search pass for the 3p and exp shape parameters.
+
+    Returns cp (W), w_prime (J), pmax (W, None for 2p), k or tau (s) for
+    3p/exp, rmse (W), r2, the number of points fitted, and "ftp": CP
+    rounded to whole watts for coggan_zones()/calculate_tss().
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown CP model: {model} (choose from {', '.join(MODELS)})")
+    t, p, lo, hi = _fit_points(curve, model, min_duration, max_duration)
+    best = _search(model, t, p, max(candidates, 3))
+    if best is None:
+        raise ValueError("Power does not decrease with duration; cannot fit a CP model")
+    shape, cp, b, sse = best
+    if cp <= 0:
+        raise ValueError(f"Fitted CP is not positive ({cp:.1f} W)")
+
+    result = {"model": model, "cp": round(cp, 1)}
+    if model == '2p':
+        result.update({"w_prime": round(b), "pmax": None})
+    elif model == '3p':
+        result.update({"w_prime": round(b), "pmax": round(cp + b / shape), "k": round(shape, 2)})
+    else:
+        result.update({"w_prime": round(b * shape), "pmax": round(cp + b), "tau": round(shape, 2)})
+
+    pm = sum(p) / len(p)
+    syy = sum((v - pm) ** 2 for v in p)
+    result.update({
+        "rmse": round(math.sqrt(sse / len(p)), 2),
+        "r2": round(1 - sse / syy, 4) if syy > 0 else None,
+        "points": len(p),
+        "min_duration": lo,
+        "max_duration": hi,
+        "ftp": int(round(cp)),
+    })
+    return result
+
+
+def fit_cp_models(curve: dict, models=MODELS, **options) -> dict:
+    """Fit several models to one curve; returns {model: fit_cp() result}."""
+    return {model: fit_cp(curve, model, **options) for model in models}
+
+
+def cp_power(fit: dict, durations) -> list:
+    """Power predicted by a fit_cp() result at each duration (s)."""
+    cp, w_prime, model = fit["cp"], fit["w_prime"], fit["model"]
+    if model == '2p':
+        return [cp + w_prime / t for t in durations]
+    if model == '3p':
+        return [cp + w_prime / (t + fit["k"]) for t in durations]
+    tau = fit["tau"]
+    return [cp + w_prime / tau * math.exp(-t / tau) for t in durations]
+
+
+def print_fits(fits: dict, as_json: bool = False):
+    """Print fitted CP models."""
+    if as_json:
+        print(json.dumps(fits, indent=2))
+        return
+
+    print(f"\n{'='*50}")
+    print("  Critical Power Models")
+    print(f"{'='*50}\n")
+    for fit in fits.values():
+        pmax = f" | Pmax={fit['pmax']}W" if fit['pmax'] is not None else ""
+        print(f"  {fit['model']:>3}:  CP={fit['cp']}W | W'={fit['w_prime']}J{pmax}")
+        print(f"        RMSE={fit['rmse']}W | R²={fit['r2']} | "
+              f"{fit['points']} points, {fit['min_duration']:g}-{fit['max_duration']:g} s")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit CP/W' models to a mean-maximal power curve")
+    parser.add_argument('power_file', help="Power samples ('-' for stdin), or an MMP JSON with --curve")
+    parser.add_argument('--curve', action='store_true',
+                        help='Input is mmp.py --json output instead of a power file')
+    parser.add_argument('--model', choices=MODELS + ('all',), default='all',
+                        help='Model to fit (default: all)')
+    parser.add_argument('--min-duration', type=float, help='Shortest duration fitted (s)')
+    parser.add_argument('--max-duration', type=float, help='Longest duration fitted (s)')
+    parser.add_argument('--sample-rate', type=float,
+                        help='Samples per second (default: .cyps header rate, else 1)')
+    parser.add_argument('--zones', action='store_true',
+                        help='Also print Coggan power zones using the fitted CP as FTP')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    models = MODELS if args.model == 'all' else (args.model,)
+    try:
+        if args.curve:
+            stream = sys.stdin if args.power_file == '-' else open(args.power_file, encoding='utf-8')
+            try:
+                curve = json.load(stream)
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+        else:
+            from mmp import mean_max_power
+            from power_stream import power_samples
+            with power_samples(args.power_file, args.sample_rate) as (samples, rate):
+                if not _optional.is_array(samples):
+                    samples = list(samples)
+                if not len(samples):
+                    raise ValueError("Power file is empty")
+                curve = mean_max_power(samples, sample_rate_hz=rate)
+        fits = fit_cp_models(curve, models, min_duration=args.min_duration,
+                             max_duration=args.max_duration)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.zones:
+        print_fits(fits, args.json)
+        return
+
+    from calculate_zones import coggan_zones, print_zones
+    fit = fits['2p'] if '2p' in fits else fits[models[0]]
+    zones = coggan_zones(fit["ftp"])
+    if args.json:
+        print(json.dumps({"fits": fits, "zones": zones}, indent=2))
+        return
+    print_fits(fits)
+    print(f"  Zones from the {fit['model']} model CP ({fit['ftp']}W as FTP):")
+    print_zones(zones)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the cycling-training scripts.
+
+Usage:
+    python cycling.py zones 250 --model seiler --json
+    python cycling.py tss 250 230 60 --json
+    python cycling.py week 450 65 72 --daily-tss 60,80,0,70,90,80,70 --json
+    python cycling.py pmc history.csv --json
+    python cycling.py <command> --help
+
+Commands:
+    zones   calculate_zones.py      tss     calculate_tss.py
+    week    analyze_week.py         pmc     pmc.py
+    mmp     mmp.py                  wbal    wbal.py
+    stream  power_stream.py         fit     fit_decoder.py
+    ingest  ingest.py               export  export.py
+    cp      cp_model.py             simulate simulate.py
+    taper   taper.py                acwr    acwr.py
+    hrtss   hr_tss.py
+
+Arguments are the same as the underlying script. For zones, tss and week
+the common argument forms are parsed by a small hand-written parser and
+handed straight to the script's run(), so neither argparse nor json (for
+text output) is imported. Anything the fast path does not recognize -
+--help, --batch, malformed values - falls back to the script's own
+argparse main(), so errors and help text are unchanged.
+"""
+
+import sys
+
+USAGE = __doc__.split('\n\n')[1].replace('Usage:\n', 'usage:\n', 1)
+
+
+class _Args:
+    """Minimal stand-in for argparse.Namespace."""
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+def _choice(*choices):
+    def convert(value):
+        if value not in choices:
+            raise ValueError(value)
+        return value
+    return convert
+
+
+def _daily_tss(value):
+    from analyze_week import parse_daily_tss
+    return parse_daily_tss(value)
+
+
+# Fast-path grammar per command: (positionals, options, defaults).
+# positionals: (dest, type, required), required '*' collecting the remaining
+# positionals into a list; options: flag -> (dest, type or None for
+# store_true). Defaults must cover every attribute the script's run() reads.
+FAST_PATHS = {
+    'zones': (
+        (('ftp', int, True),),
+        {'--model': ('model', _choice('coggan', 'seiler', 'isf')),
+         '--lthr': ('lthr', int),
+         '--hr-model': ('hr_model', _choice('percent-lthr', 'karvonen')),
+         '--age': ('age', int),
+         '--rhr': ('rhr', int),
+         '--power-file': ('power_file', str),
+         '--sample-rate': ('sample_rate', float),
+         '--json': ('json', None)},
+        {'model': 'coggan', 'lthr': None, 'hr_model': 'percent-lthr', 'age': None,
+         'rhr': None, 'power_file': None, 'sample_rate': None, 'json': False},
+    ),
+    'tss': (
+        (('ftp', int, True), ('workout', float, '*')),
+        {'--ap': ('ap', float),
+         '--vi': ('vi', float),
+         '--power-file': ('power_file', str),
+         '--sample-rate': ('sample_rate', float),
+         '--json': ('json', None)},
+        {'workout': [], 'ap': None, 'vi': 1.0, 'power_file': None,
+         'sample_rate': None, 'json': False},
+    ),
+    'week': (
+        (('weekly_tss', float, True), ('ctl', float, True), ('atl', float, True)),
+        {'--prev-week-tss': ('prev_week_tss', float),
+         '--daily-tss': ('daily_tss', _daily_tss),
+         '--json': ('json', None)},
+        {'prev_week_tss': None, 'daily_tss': None, 'json': False, 'batch': None,
+         'format': None, 'workers': 1, 'chunk_size': 256},
+    ),
+}
+
+COMMANDS = {
+    'zones': 'calculate_zones',
+    'tss': 'calculate_tss',
+    'week': 'analyze_week',
+    'pmc': 'pmc',
+    'mmp': 'mmp',
+    'wbal': 'wbal',
+    'stream': 'power_stream',
+    'fit': 'fit_decoder',
+    'ingest': 'ingest',
+    'export': 'export',
+    'cp': 'cp_model',
+    'simulate': 'simulate',
+    'taper': 'taper',
+    'acwr': 'acwr',
+    'hrtss': 'hr_tss',
+}
+
+
+def fast_args(command: str, argv: list):
+    """
+    Parse argv with the command's fast-path grammar.
+
+    Returns an argparse-like namespace, or None when the arguments need
+    the full argparse parser (unknown flags, --help, bad values).
+    """
+    spec = FAST_PATHS.get(command)
+    if spec is None:
+        return None
+    positionals, options, defaults = spec
+    values = dict(defaults)
+    given = []
+    i = 0
+    try:
+        while i < len(argv):
+            arg = argv[i]
+            if arg.startswith('-'):
+                option = options.get(arg)
+                if option is None:
+                    return None
+                dest, convert = option
+                if convert is None:
+                    values[dest] = True
+                    i += 1
+                    continue
+                if i + 1 >= len(argv) or argv[i + 1].startswith('--'):
+                    return None
+                values[dest] = convert(argv[i + 1])
+                i += 2
+            else:
+                given.append(arg)
+                i += 1
+        for index, (dest, convert, required) in enumerate(positionals):
+            if required == '*':
+                values[dest] = [convert(arg) for arg in given[index:]]
+                given = given[:index]
+                break
+        if len(given) > len(positionals):
+            return None
+        for (dest, convert, required), arg in zip(positionals, given):
+            values[dest] = convert(arg)
+        if any(required is True for _, _, required in positionals[len(given):]):
+            return None
+    except Exception:  # Let argparse report the error properly
+        return None
+    return _Args(**values)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(USAGE)
+        return
+    command, rest = argv[0], argv[1:]
+    module_name = COMMANDS.get(command)
+    if module_name is None:
+        print(f"{USAGE}\n\nError: unknown command '{command}'", file=sys.stderr)
+        sys.exit(2)
+
+    module = __import__(module_name)
+    args = fast_args(command, rest)
+    if args is not None:
+        module.run(args)
+        return
+
+    prog = sys.argv[0].rsplit('/', 1)[-1]
+    sys.argv = [f'{prog} {command}'] + rest
+    module.main()
+
+
+if __name__ == '__main__':
+    main()
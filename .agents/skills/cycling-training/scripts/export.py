@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Columnar export of PMC daily series and weekly analyses (CSV, Parquet, Arrow).
+
+Usage:
+    python export.py history.csv --daily daily.csv --weekly weekly.csv
+    python export.py athletes/*.csv --daily daily.parquet --weekly weekly.parquet
+    python export.py history.csv --daily daily.arrow
+
+One row per day (date, tss, ctl, atl, tsb, ramp_rate, acwr, monotony,
+strain) and one row per week ending on every 7th day up to the last day
+of each history (analyze_week() metrics, status names and warnings).
+With several history files an "athlete" column holds each file's name
+without extension.
+
+The format follows the file extension (.csv, .parquet, .arrow/.feather)
+or --format. Parquet and Arrow require pyarrow. Rows are produced and
+written in chunks, so exporting many athletes never builds the whole
+table (or a JSON document) in memory.
+"""
+
+import argparse
+import csv
+import sys
+from datetime import timedelta
+from itertools import chain
+from pathlib import Path
+
+import _optional
+from analyze_week import calculate_acwr, rolling_monotony_strain
+from pmc import analyze_pmc_week_compact, compute_pmc, read_daily_tss
+
+DEFAULT_CHUNK_SIZE = 4096
+
+# Column name -> type ('date', 'float' or 'str'); "athlete" ('str') is
+# prepended when exporting several athletes.
+DAILY_COLUMNS = {
+    'date': 'date', 'tss': 'float', 'ctl': 'float', 'atl': 'float', 'tsb': 'float',
+    'ramp_rate': 'float', 'acwr': 'float', 'monotony': 'float', 'strain': 'float',
+}
+WEEKLY_COLUMNS = {
+    'week_ending': 'date', 'weekly_tss': 'float', 'ctl': 'float', 'atl': 'float',
+    'tsb': 'float', 'acwr': 'float', 'ramp_rate': 'float', 'week_over_week_change': 'float',
+    'monotony': 'float', 'strain': 'float', 'tsb_status': 'str', 'acwr_status': 'str',
+    'ramp_status': 'str', 'monotony_status': 'str', 'warnings': 'str',
+}
+
+FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+
+def _rounded(values, ndigits: int) -> list:
+    return [round(v, ndigits) for v in values]
+
+
+def daily_columns(pmc: dict, athlete: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yield the daily series of a compute_pmc() result as column chunks.
+
+    Each chunk maps DAILY_COLUMNS names (plus "athlete" if given) to
+    equal-length lists of at most `chunk_size` rows.
+    """
+    tss, ctl, atl = pmc["tss"], pmc["ctl"], pmc["atl"]
+    rolling = rolling_monotony_strain(tss)
+    for lo in range(0, len(tss), chunk_size):
+        hi = min(lo + chunk_size, len(tss))
+        chunk = {"athlete": [athlete] * (hi - lo)} if athlete is not None else {}
+        chunk.update({
+            "date": pmc["dates"][lo:hi],
+            "tss": _rounded(tss[lo:hi], 1),
+            "ctl": _rounded(ctl[lo:hi], 2),
+            "atl": _rounded(atl[lo:hi], 2),
+            "tsb": _rounded(pmc["tsb"][lo:hi], 2),
+            "ramp_rate": _rounded(pmc["ramp_rate"][lo:hi], 2),
+            "acwr": [round(calculate_acwr(c, a), 2) for c, a in zip(ctl[lo:hi], atl[lo:hi])],
+            "monotony": rolling["monotony"][lo:hi],
+            "strain": rolling["strain"][lo:hi],
+        })
+        yield chunk
+
+
+def weekly_columns(pmc: dict, athlete: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yield analyze_pmc_week() for every week of a PMC as column chunks.
+
+    Weeks end on every 7th day counting back from the last day; the first
+    week may start before the history (those days count as 0 TSS).
+    Statuses are exported by name and warnings as one '; '-joined string.
+    """
+    days = len(pmc["tss"])
+    ends = range((days - 1) % 7, days, 7)
+    for lo in range(0, len(ends), chunk_size):
+        rows = []
+        for end in ends[lo:lo + chunk_size]:
+            week_ending = pmc["start_date"] + timedelta(days=end)
+            week = analyze_pmc_week_compact(pmc, week_ending)
+            rows.append((
+                week_ending, week.weekly_tss, week.ctl, week.atl, week.tsb, week.acwr,
+                week.ramp_rate, week.week_over_week_change, week.monotony, week.strain,
+                week.tsb_status['status'], week.acwr_status['status'], week.ramp_status['status'],
+                week.monotony_status['status'] if week.monotony_status else None,
+                '; '.join(w.message for w in week.warnings),
+            ))
+        chunk = {"athlete": [athlete] * len(rows)} if athlete is not None else {}
+        chunk.update(zip(WEEKLY_COLUMNS, map(list, zip(*rows))))
+        yield chunk
+
+
+class CsvWriter:
+    """Append column chunks to a CSV file, after a header row of `columns`."""
+
+    def __init__(self, path: str, columns: dict):
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+        self.rows = 0
+
+    def write(self, chunk: dict) -> None:
+        rows = list(zip(*chunk.values()))
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ArrowWriter:
+    """
+    Append column chunks to a Parquet or Arrow IPC file (requires pyarrow).
+
+    Each chunk becomes one row group (Parquet) or record batch (Arrow).
+    """
+
+    def __init__(self, path: str, columns: dict, fmt: str = 'parquet'):
+        pa = _optional.load('pyarrow')
+        if pa is None:
+            raise RuntimeError(f"{fmt} export requires pyarrow")
+        types = {'date': pa.date32(), 'float': pa.float64(), 'str': pa.string()}
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns.items()])
+        self._table = pa.Table.from_pydict
+        if fmt == 'parquet':
+            self._sink = None
+            self._writer = _optional.load('pyarrow.parquet').ParquetWriter(path, self._schema)
+        else:
+            self._sink = pa.OSFile(path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+        self.rows = 0
+
+    def write(self, chunk: dict) -> None:
+        self._writer.write_table(self._table(chunk, schema=self._schema))
+        self.rows += len(next(iter(chunk.values()), ()))
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def open_writer(path: str, columns: dict, fmt: str = None):
+    """Writer for `path` in `fmt` (default: from the file extension, else CSV)."""
+    fmt = fmt or FORMATS.get(Path(path).suffix.lower(), 'csv')
+    if fmt == 'csv':
+        return CsvWriter(path, columns)
+    if fmt in ('parquet', 'arrow'):
+        return ArrowWriter(path, columns, fmt)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_histories(histories, daily_path: str = None, weekly_path: str = None,
+                     fmt: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     ctl: float = 0.0, atl: float = 0.0) -> dict:
+    """
+    Export daily and/or weekly columns for (athlete, history) pairs.
+
+    `histories` is consumed lazily, one athlete's PMC at a time; pass
+    athlete None for a single history without an "athlete" column.
+    Returns the number of rows written per file.
+    """
+    histories = iter(histories)
+    first = next(histories, None)
+    if first is None:
+        raise ValueError("No TSS histories to export")
+    with_athlete = first[0] is not None
+
+    writers = []
+    try:
+        for path, columns, chunks in ((daily_path, DAILY_COLUMNS, daily_columns),
+                                      (weekly_path, WEEKLY_COLUMNS, weekly_columns)):
+            if path:
+                if with_athlete:
+                    columns = {"athlete": 'str', **columns}
+                writers.append((path, chunks, open_writer(path, columns, fmt)))
+        for athlete, history in chain([first], histories):
+            pmc = compute_pmc(history, ctl, atl)
+            for _, chunks, writer in writers:
+                for chunk in chunks(pmc, athlete, chunk_size):
+                    writer.write(chunk)
+    finally:
+        for _, _, writer in writers:
+            writer.close()
+    return {path: writer.rows for path, _, writer in writers}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export PMC daily series and weekly analyses as CSV/Parquet/Arrow')
+    parser.add_argument('histories', nargs='+',
+                        help="CSVs of 'date,tss' rows, one per athlete")
+    parser.add_argument('--daily', metavar='FILE', help='Daily series output file')
+    parser.add_argument('--weekly', metavar='FILE', help='Weekly analysis output file')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'arrow'],
+                        help='Output format (default: from the file extension)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows per written chunk (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--ctl', type=float, default=0.0, help='CTL before the first day (default: 0)')
+    parser.add_argument('--atl', type=float, default=0.0, help='ATL before the first day (default: 0)')
+
+    args = parser.parse_args()
+    if not args.daily and not args.weekly:
+        parser.error("at least one of --daily or --weekly is required")
+
+    multiple = len(args.histories) > 1
+    histories = ((Path(path).stem if multiple else None, read_daily_tss(path))
+                 for path in args.histories)
+    try:
+        rows = export_histories(histories, args.daily, args.weekly, args.format,
+                                args.chunk_size, args.ctl, args.atl)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for path, count in rows.items():
+        print(f"Wrote {count} rows to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Streaming decoder for FIT activity files (record messages only).
+
+Usage:
+    python fit_decoder.py ride.fit                 # CSV of samples to stdout
+    python fit_decoder.py ride.fit --cyps ride.cyps
+    python calculate_tss.py 250 --power-file ride.fit
+
+Decodes record messages (global message 20) into fixed-size chunks of
+columns: timestamp (unix s), power (W), heart_rate (bpm), cadence (rpm),
+speed (m/s) and altitude (m). Invalid/missing values are None.
+
+Records are not evenly spaced (smart recording writes one every few
+seconds), so fit_power()/fit_heart_rate() and --cyps expand them to 1 Hz
+by timestamp with resample_records(): each record holds until the next
+one (forward fill) and gaps over FIT_MAX_GAP_SEC are pauses, dropped
+like moving time.
+
+The file is read in 64 KB blocks and never held in memory as a whole.
+Each definition message is compiled once into a struct.Struct that
+unpacks only the wanted fields of its data messages; other messages are
+skipped by length. Developer fields and compressed-timestamp headers are
+supported; the file CRC is not verified.
+"""
+
+import argparse
+import struct
+import sys
+from itertools import chain
+
+FIT_SIGNATURE = b'.FIT'
+RECORD_MESG = 20
+FIT_EPOCH_OFFSET = 631065600  # 1989-12-31T00:00:00Z in unix seconds
+
+CHANNELS = ('timestamp', 'power', 'heart_rate', 'cadence', 'speed', 'altitude')
+
+# Longest record gap (s) forward-filled; longer gaps are pauses (auto-pause,
+# stopped recording) and only their first second is kept
+FIT_MAX_GAP_SEC = 30
+
+# Record message fields: field number -> (name, struct code)
+_RECORD_FIELDS = {
+    253: ('timestamp', 'I'),
+    7: ('power', 'H'),
+    3: ('heart_rate', 'B'),
+    4: ('cadence', 'B'),
+    6: ('speed', 'H'),             # mm/s
+    73: ('enhanced_speed', 'I'),   # mm/s
+    2: ('altitude', 'H'),          # 1/5 m, offset 500 m
+    78: ('enhanced_altitude', 'I'),
+}
+_CODE_SIZE = {'B': 1, 'H': 2, 'I': 4}
+_INVALID = {name: (1 << (8 * _CODE_SIZE[code])) - 1 for name, code in _RECORD_FIELDS.values()}
+
+_BLOCK_SIZE = 65536
+
+
+class FitError(ValueError):
+    """Raised for files that are not valid FIT data."""
+
+
+class _Definition:
+    """
+    Compiled layout of one local message type.
+
+    For record messages `run` is a Struct covering the one-byte record
+    header plus the data message, unpacking only the wanted fields, and
+    `index` maps each decoded field name to its position in the result.
+    """
+
+    __slots__ = ('global_num', 'size', 'run', 'index')
+
+    def __init__(self, global_num: int, big_endian: bool, field_defs: list, dev_size: int):
+        self.global_num = global_num
+        self.size = sum(size for _, size in field_defs) + dev_size
+        self.index = {}
+        self.run = None
+        if global_num != RECORD_MESG:
+            return
+
+        fmt = ['>' if big_endian else '<', 'x']
+        for num, size in field_defs:
+            spec = _RECORD_FIELDS.get(num)
+            if spec and _CODE_SIZE[spec[1]] == size and spec[0] not in self.index:
+                self.index[spec[0]] = len(self.index)
+                fmt.append(spec[1])
+            else:
+                fmt.append(f'{size}x')
+        if dev_size:
+            fmt.append(f'{dev_size}x')
+        self.run = struct.Struct(''.join(fmt))
+
+    def decode(self, data: bytes) -> dict:
+        """Decode back-to-back (header + record) messages into columns."""
+        rows = list(self.run.iter_unpack(data))
+        n = len(rows)
+        raw = dict(zip(self.index, zip(*rows))) if self.index else {}
+
+        def column(name):
+            values = raw.get(name)
+            if values is None:
+                return None
+            invalid = _INVALID[name]
+            return [None if v == invalid else v for v in values]
+
+        columns = {'timestamp': column('timestamp'),
+                   'power': column('power'),
+                   'heart_rate': column('heart_rate'),
+                   'cadence': column('cadence')}
+        for name, scale, offset in (('speed', 1000, 0), ('altitude', 5, 500)):
+            values = column('enhanced_' + name)
+            plain = column(name)
+            if values is None:
+                values = plain
+            elif plain is not None:
+                values = [e if e is not None else p for e, p in zip(values, plain)]
+            if values is not None:
+                values = [None if v is None else v / scale - offset for v in values]
+            columns[name] = values
+        for name, values in columns.items():
+            if values is None:
+                columns[name] = [None] * n
+        return columns
+
+
+def _read_header(stream) -> int:
+    """Validate the file header; returns the size of the record data."""
+    head = stream.read(12)
+    if len(head) < 12 or head[8:12] != FIT_SIGNATURE:
+        raise FitError("Not a FIT file")
+    header_size = head[0]
+    if header_size < 12:
+        raise FitError(f"Invalid FIT header size {header_size}")
+    stream.read(header_size - 12)  # Header CRC and any future extension
+    return struct.unpack_from('<I', head, 4)[0]
+
+
+def iter_record_chunks(stream, chunk_size: int = 4096):
+    """
+    Yield record samples from a binary FIT stream in column chunks.
+
+    Each chunk is a dict of equal-length lists keyed by CHANNELS with
+    `chunk_size` samples (the last one may be shorter). Only the current
+    64 KB block and chunk are held in memory.
+
+    Consecutive record messages sharing a header byte - the common case -
+    are located by stride and unpacked in one struct.iter_unpack() call.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    remaining = _read_header(stream)
+    buf = b''
+    pos = 0
+    definitions = {}
+    chunk = {name: [] for name in CHANNELS}
+    last_timestamp = None
+    unpack_definition = struct.Struct('<xBHB').unpack_from
+
+    def fill(n):
+        nonlocal buf, pos
+        if len(buf) - pos < n:
+            buf = buf[pos:] + stream.read(max(_BLOCK_SIZE, n))
+            pos = 0
+            if len(buf) < n:
+                raise FitError("Unexpected end of FIT data")
+
+    while remaining > 0:
+        fill(1)
+        header = buf[pos]
+
+        if header & 0xC0 == 0x40:  # Definition message
+            fill(6)
+            arch, global_num, num_fields = unpack_definition(buf, pos + 1)
+            if arch == 1:
+                global_num = ((global_num & 0xFF) << 8) | (global_num >> 8)
+            size = 6 + num_fields * 3
+            dev_size = 0
+            if header & 0x20:  # Developer data fields follow
+                fill(size + 1)
+                num_dev = buf[pos + size]
+                fill(size + 1 + num_dev * 3)
+                dev_size = sum(buf[pos + size + 2 + i * 3] for i in range(num_dev))
+                size += 1 + num_dev * 3
+            else:
+                fill(size)
+            field_defs = [(buf[i], buf[i + 1]) for i in range(pos + 6, pos + 6 + num_fields * 3, 3)]
+            definitions[header & 0x0F] = _Definition(global_num, arch == 1, field_defs, dev_size)
+            pos += size
+            remaining -= size
+            continue
+
+        compressed = bool(header & 0x80)
+        local = (header >> 5) & 0x03 if compressed else header & 0x0F
+        definition = definitions.get(local)
+        if definition is None:
+            raise FitError(f"Data message for undefined local type {local}")
+        stride = definition.size + 1
+        fill(stride)
+
+        if definition.run is None:  # Not a record message: skip it
+            pos += stride
+            remaining -= stride
+            continue
+
+        # Extend the run over following messages with the same header byte
+        count = 1
+        if not compressed:
+            limit = min(len(buf) - pos, remaining) // stride
+            while count < limit and buf[pos + count * stride] == header:
+                count += 1
+        columns = definition.decode(buf[pos:pos + count * stride])
+        pos += count * stride
+        remaining -= count * stride
+
+        timestamps = columns['timestamp']
+        if compressed:
+            if last_timestamp is not None:
+                offset = header & 0x1F
+                timestamp = (last_timestamp & ~0x1F) + offset
+                if offset < (last_timestamp & 0x1F):
+                    timestamp += 0x20
+                last_timestamp = timestamp
+            if timestamps[0] is None:
+                timestamps[0] = last_timestamp
+        for t in reversed(timestamps):
+            if t is not None:
+                last_timestamp = t
+                break
+        columns['timestamp'] = [None if t is None else t + FIT_EPOCH_OFFSET for t in timestamps]
+
+        for name in CHANNELS:
+            chunk[name].extend(columns[name])
+        while len(chunk['timestamp']) >= chunk_size:
+            yield {name: values[:chunk_size] for name, values in chunk.items()}
+            chunk = {name: values[chunk_size:] for name, values in chunk.items()}
+
+    if chunk['timestamp']:
+        yield chunk
+
+
+def read_fit_records(path: str, chunk_size: int = 4096):
+    """Yield record chunks from a FIT file path (see iter_record_chunks)."""
+    with open(path, 'rb') as f:
+        yield from iter_record_chunks(f, chunk_size)
+
+
+def resample_records(chunks, names=('power',), max_gap_sec: int = FIT_MAX_GAP_SEC):
+    """
+    Expand record chunks to 1 Hz, yielding a tuple of `names` values per second.
+
+    Each record is repeated until the next record's timestamp, so a ride
+    recorded every 5 s keeps its elapsed time. A gap longer than
+    `max_gap_sec` is a pause: the record counts one second and the rest
+    of the gap is dropped. A record whose successor has the same (or an
+    earlier) timestamp is superseded by it; records without a timestamp
+    count one second.
+    """
+    prev = prev_time = None
+    for chunk in chunks:
+        for timestamp, *values in zip(chunk['timestamp'], *(chunk[name] for name in names)):
+            if prev is not None:
+                gap = 1 if timestamp is None or prev_time is None else timestamp - prev_time
+                for _ in range(gap if gap <= max_gap_sec else 1):
+                    yield prev
+            prev, prev_time = tuple(values), timestamp
+    if prev is not None:
+        yield prev
+
+
+def fit_power(path: str):
+    """Lazily yield 1 Hz power samples (None for gaps) from a FIT file."""
+    for (watts,) in resample_records(read_fit_records(path), ('power',)):
+        yield watts
+
+
+def fit_heart_rate(path: str):
+    """Lazily yield 1 Hz heart rate samples (None for gaps) from a FIT file."""
+    for (bpm,) in resample_records(read_fit_records(path), ('heart_rate',)):
+        yield bpm
+
+
+def is_fit_file(path: str) -> bool:
+    """True if `path` has a FIT file header."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(12)
+    except OSError:
+        return False
+    return len(head) == 12 and head[8:12] == FIT_SIGNATURE
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Decode FIT record messages')
+    parser.add_argument('fit_file', help='FIT activity file')
+    parser.add_argument('--cyps', metavar='FILE',
+                        help='Write a binary power stream instead of CSV')
+    args = parser.parse_args()
+
+    try:
+        if args.cyps:
+            from power_stream import write_stream
+            chunks = read_fit_records(args.fit_file)
+            first = next(chunks, None)
+            start = 0
+            if first is not None:
+                start = next((t for t in first['timestamp'] if t is not None), 0)
+                chunks = chain([first], chunks)
+            power, heart_rate, cadence = [], [], []
+            for watts, bpm, rpm in resample_records(chunks, ('power', 'heart_rate', 'cadence')):
+                power.append(watts)
+                heart_rate.append(bpm)
+                cadence.append(rpm)
+            n = write_stream(args.cyps, power, heart_rate, cadence,
+                             sample_rate_hz=1.0, start_time=start)
+            print(f"Wrote {n} samples to {args.cyps}")
+            return
+
+        out = sys.stdout
+        out.write(','.join(CHANNELS) + '\n')
+        for chunk in read_fit_records(args.fit_file):
+            for row in zip(*(chunk[name] for name in CHANNELS)):
+                out.write(','.join('' if v is None else f'{v:g}' for v in row) + '\n')
+    except (OSError, FitError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Heart-rate training load: hrTSS and Banister TRIMP from an HR stream.
+
+Usage:
+    python hr_tss.py <LTHR> <hr_file>
+    python hr_tss.py 165 ride.csv --json
+    python hr_tss.py 165 ride.fit --hr-model karvonen --age 40 --rhr 50
+    python hr_tss.py 165 ride.cyps --age 40 --rhr 50 --sex female
+
+HR file: one bpm value per line or a CSV with a "heart_rate"/"hr"/"bpm"
+column, a .cyps stream with an HR channel or a FIT file.
+
+Models (HR = sample bpm, one value per sample):
+- hrTSS = hours × IF² × 100, the power TSS formula with IF the RMS of a
+  per-sample HR intensity:
+    percent-lthr:  (HR - F) / (LTHR - F), F = 50% of LTHR
+    karvonen:      (HR - RHR) / (LTHR - RHR)   (heart rate reserve)
+  Heart rates at or below the floor (F or RHR) add no load, so time
+  spent at rest or standing does not inflate daily TSS.
+- TRIMP (Banister 1991) = Σ minutes × x × a × e^(b × x),
+  x = (HR - RHR) / (HRmax - RHR), HRmax = 220 - age;
+  a, b = 0.64, 1.92 (male) or 0.86, 1.67 (female). Needs --age and --rhr.
+
+Per-bpm intensity, TRIMP weight and zone are precomputed into lookup
+tables (zones from calculate_zones.lookup_table() with the same bounds as
+hr_zones_percent_lthr()/hr_zones_karvonen()), so a sample costs three
+array indexes: one pass at constant memory, or one gather with NumPy for
+buffer-backed streams. "tss" is on the same scale as calculate_tss() and
+can go into a daily TSS history or analyze_week() alongside power rides.
+"""
+
+import math
+import sys
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+
+import _optional
+from calculate_tss import IF_ZONE_LABELS, IF_ZONE_THRESHOLDS
+from calculate_zones import (
+    hr_karvonen_bounds,
+    hr_lthr_bounds,
+    hr_zones_karvonen,
+    hr_zones_percent_lthr,
+    lookup_table,
+)
+
+# Upper end of the bpm lookup tables
+HR_LOOKUP_MAX = 250
+
+HR_MODELS = ('percent-lthr', 'karvonen')
+
+# percent-lthr intensity floor as a fraction of LTHR: below roughly resting
+# and standing HR, well under the Z2 endurance bound of 81%
+LTHR_FLOOR = 0.5
+
+# Banister TRIMP weighting (a, b) by sex
+TRIMP_COEFFICIENTS = {'male': (0.64, 1.92), 'female': (0.86, 1.67)}
+
+# Cached HR load model for one set of parameters:
+#   names      Zone names in order
+#   bounds     Lower bounds (bpm) of zones 2..N
+#   zones      zones[bpm] -> zone index for integer bpm 0..HR_LOOKUP_MAX
+#   intensity  intensity[bpm] -> squared HR intensity (IF²)
+#   trimp      trimp[bpm] -> TRIMP per minute, None without age and RHR
+HrModel = namedtuple('HrModel', 'names bounds zones intensity trimp')
+
+
+@lru_cache(maxsize=256)
+def hr_model(lthr: int, model: str = 'percent-lthr', age: int = None, rhr: int = None,
+             sex: str = 'male') -> HrModel:
+    """
+    Build (once) the bpm lookup tables for an athlete's HR parameters.
+
+    Kept in a bounded LRU cache like calculate_zones.zone_model(), so a
+    roster builds each parameter set once.
+    """
+    if model == 'karvonen':
+        if age is None or rhr is None:
+            raise ValueError("Karvonen model requires age and rhr")
+        zones, bounds, floor = hr_zones_karvonen(lthr, age, rhr), hr_karvonen_bounds(age, rhr), rhr
+    elif model == 'percent-lthr':
+        zones, bounds, floor = hr_zones_percent_lthr(lthr), hr_lthr_bounds(lthr), lthr * LTHR_FLOOR
+    else:
+        raise ValueError(f"Unknown HR model: {model} (choose from {', '.join(HR_MODELS)})")
+    if not floor < lthr <= HR_LOOKUP_MAX:
+        raise ValueError(f"LTHR {lthr} bpm must be above RHR and at most {HR_LOOKUP_MAX}")
+
+    size = HR_LOOKUP_MAX + 1
+    intensity = array('d', ((max(bpm - floor, 0) / (lthr - floor)) ** 2 for bpm in range(size)))
+    trimp = None
+    if age is not None and rhr is not None:
+        if sex not in TRIMP_COEFFICIENTS:
+            raise ValueError(f"Unknown sex for TRIMP: {sex} (choose from male, female)")
+        max_hr = 220 - age
+        if max_hr <= rhr:
+            raise ValueError(f"Resting HR {rhr} must be below max HR {max_hr}")
+        a, b = TRIMP_COEFFICIENTS[sex]
+        trimp = array('d')
+        for bpm in range(size):
+            x = min(max((bpm - rhr) / (max_hr - rhr), 0.0), 1.0)
+            trimp.append(x * a * math.exp(b * x))
+    return HrModel(tuple(zones["zones"]), tuple(bounds), lookup_table(bounds, size),
+                   intensity, trimp)
+
+
+class HeartRateLoadStream:
+    """
+    One-pass, constant-memory hrTSS/TRIMP accumulator.
+
+    Each sample is floored to whole bpm, clamped to 0..250 and looked up
+    in the HrModel tables; only running sums and per-zone counts are
+    kept. Dropouts (None or 0) count as elapsed time without load but are
+    left out of the average HR.
+    """
+
+    __slots__ = ('model', 'sample_rate_hz', '_count', '_hr_count', '_hr_sum',
+                 '_intensity_sum', '_trimp_sum', '_zone_counts')
+
+    def __init__(self, model: HrModel, sample_rate_hz: float = 1.0):
+        if sample_rate_hz <= 0:
+            raise ValueError("sample_rate_hz must be positive")
+        self.model = model
+        self.sample_rate_hz = sample_rate_hz
+        self._count = 0
+        self._hr_count = 0
+        self._hr_sum = 0.0
+        self._intensity_sum = 0.0
+        self._trimp_sum = 0.0
+        self._zone_counts = [0] * len(model.names)
+
+    def add(self, bpm: float) -> None:
+        """Add one heart rate sample."""
+        if not bpm or bpm < 0:
+            index = 0
+        else:
+            index = int(bpm) if bpm < HR_LOOKUP_MAX else HR_LOOKUP_MAX
+            self._hr_count += 1
+            self._hr_sum += bpm
+        model = self.model
+        self._count += 1
+        self._intensity_sum += model.intensity[index]
+        if model.trimp is not None:
+            self._trimp_sum += model.trimp[index]
+        self._zone_counts[model.zones[index]] += 1
+
+    def extend(self, samples) -> 'HeartRateLoadStream':
+        """Add every sample from an iterable; returns self for chaining."""
+        add = self.add
+        for bpm in samples:
+            add(bpm)
+        return self
+
+    @property
+    def count(self) -> int:
+        """Number of samples seen."""
+        return self._count
+
+    @property
+    def duration_sec(self) -> float:
+        """Elapsed time covered by the samples."""
+        return self._count / self.sample_rate_hz
+
+    def sums(self) -> tuple:
+        """(count, HR count, HR sum, IF² sum, TRIMP weight sum, zone counts)."""
+        return (self._count, self._hr_count, self._hr_sum, self._intensity_sum,
+                self._trimp_sum, list(self._zone_counts))
+
+
+def _array_hr_sums(samples, model: HrModel) -> tuple:
+    """HeartRateLoadStream.sums() of buffer-backed samples using NumPy."""
+    numpy = _optional.numpy()
+    bpm = numpy.maximum(_optional.float_array(samples), 0.0)
+    index = numpy.minimum(bpm, HR_LOOKUP_MAX).astype(numpy.intp)
+    trimp = 0.0
+    if model.trimp is not None:
+        trimp = float(numpy.frombuffer(model.trimp, dtype=float)[index].sum())
+    zones = numpy.frombuffer(model.zones, dtype=numpy.uint8)[index]
+    return (len(bpm), int(numpy.count_nonzero(bpm)), float(bpm.sum()),
+            float(numpy.frombuffer(model.intensity, dtype=float)[index].sum()), trimp,
+            numpy.bincount(zones, minlength=len(model.names)).tolist())
+
+
+def calculate_hr_tss(samples, lthr: int, model: str = 'percent-lthr', age: int = None,
+                     rhr: int = None, sex: str = 'male', sample_rate_hz: float = 1.0) -> dict:
+    """
+    hrTSS, TRIMP and time in HR zones from a heart rate stream.
+
+    Buffer-backed samples (e.g. a mapped .cyps HR channel) are processed
+    with one NumPy gather when NumPy is installed; anything else streams
+    through HeartRateLoadStream. The result has calculate_tss()'s
+    "duration_minutes", "intensity_factor", "tss", "estimated_zone" and
+    "recovery_hours", plus "lthr", "hr_model", "average_hr" (over samples
+    with a reading; None if there are none), "trimp" (None without age and
+    rhr) and "time_in_zone_seconds".
+    """
+    if sample_rate_hz <= 0:
+        raise ValueError("sample_rate_hz must be positive")
+    tables = hr_model(lthr, model, age, rhr, sex)
+    if _optional.is_array(samples) and _optional.numpy() is not None:
+        sums = _array_hr_sums(samples, tables)
+    else:
+        sums = HeartRateLoadStream(tables, sample_rate_hz).extend(samples).sums()
+    count, hr_count, hr_sum, intensity_sum, trimp_sum, zone_counts = sums
+    if not count:
+        raise ValueError("Heart rate stream is empty")
+
+    duration_sec = count / sample_rate_hz
+    intensity_factor = math.sqrt(intensity_sum / count)
+    tss = intensity_sum / sample_rate_hz / 3600 * 100
+    zone = IF_ZONE_LABELS[bisect_right(IF_ZONE_THRESHOLDS, intensity_factor)]
+    return {
+        "lthr": lthr,
+        "hr_model": model,
+        "average_hr": round(hr_sum / hr_count, 1) if hr_count else None,
+        "duration_minutes": round(duration_sec / 60, 2),
+        "intensity_factor": round(intensity_factor, 3),
+        "tss": round(tss, 1),
+        "estimated_zone": zone,
+        "recovery_hours": round(tss / 50, 1),
+        "trimp": round(trimp_sum / sample_rate_hz / 60, 1) if tables.trimp is not None else None,
+        "time_in_zone_seconds": {name: n / sample_rate_hz
+                                 for name, n in zip(tables.names, zone_counts)},
+    }
+
+
+def print_result(result: dict, as_json: bool = False):
+    """Print an hrTSS result."""
+    if as_json:
+        import json
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"\n{'='*50}")
+    print(f"  hrTSS - LTHR: {result['lthr']} bpm ({result['hr_model']})")
+    print(f"{'='*50}\n")
+    if result['average_hr'] is not None:
+        print(f"  Average HR:        {result['average_hr']} bpm")
+    print(f"  Duration:          {result['duration_minutes']} min")
+    print(f"  Intensity Factor:  {result['intensity_factor']}")
+    print(f"  hrTSS:             {result['tss']}")
+    if result['trimp'] is not None:
+        print(f"  TRIMP:             {result['trimp']}")
+    print(f"  Estimated Zone:    {result['estimated_zone']}")
+    print(f"  Est. Recovery:     {result['recovery_hours']} hours")
+    print()
+
+    from calculate_zones import print_time_in_zone
+    print_time_in_zone(result['time_in_zone_seconds'])
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Calculate hrTSS and TRIMP from heart rate data')
+    parser.add_argument('lthr', type=int, help='Lactate threshold heart rate (bpm)')
+    parser.add_argument('hr_file', help="Heart rate samples ('-' for stdin)")
+    parser.add_argument('--hr-model', choices=HR_MODELS, default='percent-lthr',
+                        help='HR intensity model (default: percent-lthr)')
+    parser.add_argument('--age', type=int, help='Age (Karvonen model and TRIMP)')
+    parser.add_argument('--rhr', type=int, help='Resting HR (Karvonen model and TRIMP)')
+    parser.add_argument('--sex', choices=sorted(TRIMP_COEFFICIENTS), default='male',
+                        help='TRIMP weighting (default: male)')
+    parser.add_argument('--sample-rate', type=float,
+                        help='Samples per second (default: .cyps header rate, else 1)')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    if args.lthr < 100 or args.lthr > 220:
+        print("Error: LTHR should be between 100-220 bpm", file=sys.stderr)
+        sys.exit(1)
+
+    from power_stream import heart_rate_samples
+    try:
+        with heart_rate_samples(args.hr_file, args.sample_rate) as (samples, rate):
+            result = calculate_hr_tss(samples, args.lthr, args.hr_model, args.age, args.rhr,
+                                      args.sex, rate)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_result(result, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Score a directory of activity files concurrently and aggregate daily TSS.
+
+Usage:
+    python ingest.py rides/ 250                      # 'date,tss' rows for pmc.py
+    python ingest.py rides/ 250 > history.csv && python pmc.py history.csv
+    python ingest.py rides/ 250 --week --json
+    python ingest.py rides/ 250 --concurrency 16 --workers 4
+
+Reads .fit, .cyps, .csv and .txt files (not recursive). Each file is
+scored with calculate_tss_from_stream() and its TSS added to the day the
+ride started:
+- FIT: first record timestamp (UTC)
+- .cyps: header start time (UTC), if set
+- otherwise a YYYY-MM-DD or YYYYMMDD date in the file name, else the
+  file's modification date
+
+Pipeline (asyncio):
+- readers load files in threads, at most `concurrency` at a time
+- a bounded queue hands the bytes to `workers` scorers; when scoring falls
+  behind, readers wait on the full queue (backpressure), so at most
+  concurrency + queue_size + workers files are in memory
+- scorers decode and compute NP/TSS in an executor (a process pool by
+  default), so CPU work runs in parallel and off the event loop
+
+Files that cannot be read or scored (any exception in the scorer) are
+reported under "errors" and do not stop the run.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from itertools import chain
+from pathlib import Path
+
+from calculate_tss import calculate_tss_from_stream, parse_power_lines
+from fit_decoder import FIT_SIGNATURE, iter_record_chunks, resample_records
+from power_stream import MAGIC, parse_stream
+
+ACTIVITY_SUFFIXES = ('.fit', '.cyps', '.csv', '.txt')
+
+_DATE_IN_NAME = re.compile(r'(?<!\d)(\d{4})-?(\d{2})-?(\d{2})(?!\d)')
+
+
+def activity_files(directory: str, suffixes=ACTIVITY_SUFFIXES) -> list:
+    """Sorted activity file paths directly inside `directory`."""
+    return sorted(p for p in Path(directory).iterdir()
+                  if p.is_file() and p.suffix.lower() in suffixes)
+
+
+def activity_date(name: str, start_time: int = None, mtime: float = None) -> date:
+    """
+    Date of an activity: from its start time (unix s, UTC), else a date in
+    the file name, else the modification time (local).
+    """
+    if start_time:
+        return datetime.fromtimestamp(start_time, timezone.utc).date()
+    for match in _DATE_IN_NAME.finditer(Path(name).name):
+        try:
+            return date(*map(int, match.groups()))
+        except ValueError:
+            continue
+    if mtime is not None:
+        return date.fromtimestamp(mtime)
+    raise ValueError(f"{name}: no activity date")
+
+
+def score_activity(name: str, data: bytes, ftp: int, sample_rate_hz: float = 1.0,
+                   mtime: float = None) -> dict:
+    """
+    Decode one activity file's bytes and calculate its TSS.
+
+    The format is detected from the content (.cyps magic, FIT header, else
+    text power samples); FIT records are resampled to 1 Hz by timestamp
+    (fit_decoder.resample_records()). Returns the calculate_tss_from_stream() result
+    with "file" and "date" (ISO) added. This is the CPU-bound stage of the
+    pipeline; it is a module-level function so a process pool can run it.
+    """
+    start_time = None
+    rate = sample_rate_hz
+    if data[:len(MAGIC)] == MAGIC:
+        stream = parse_stream(data)
+        samples = stream["watts"]
+        rate = stream["sample_rate_hz"] or sample_rate_hz
+        start_time = stream["start_time"]
+    elif data[8:12] == FIT_SIGNATURE:
+        chunks = iter_record_chunks(io.BytesIO(data))
+        first = next(chunks, None)
+        if first is not None:
+            start_time = next((t for t in first['timestamp'] if t is not None), None)
+            chunks = chain([first], chunks)
+        samples = [watts for watts, in resample_records(chunks)]
+        rate = 1.0
+    else:
+        samples = parse_power_lines(data.decode('utf-8').splitlines(), Path(name).name)
+
+    result = calculate_tss_from_stream(ftp, samples, rate)
+    return {"file": name, "date": activity_date(name, start_time, mtime).isoformat(), **result}
+
+
+def _read_file(path) -> tuple:
+    with open(path, 'rb') as f:
+        return f.read(), os.fstat(f.fileno()).st_mtime
+
+
+async def ingest_files(paths, ftp: int, sample_rate_hz: float = 1.0, concurrency: int = 8,
+                       workers: int = None, queue_size: int = None, executor=None,
+                       progress=None) -> dict:
+    """
+    Score activity files concurrently and aggregate TSS per day.
+
+    At most `concurrency` files are read at once; `workers` scorers
+    (default: CPU count) feed `executor` (default: a process pool of that
+    size) through a queue of `queue_size` files (default: `workers`).
+    `progress(done, total, item)` is called after each file with its
+    result or error dict.
+
+    Returns {"daily_tss": {ISO date: TSS}, "activities": [...],
+    "errors": [{"file", "error"}]}, sorted by date. "daily_tss" feeds
+    pmc.compute_pmc() directly.
+    """
+    if ftp <= 0:
+        raise ValueError("ftp must be positive")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    queue = asyncio.Queue(maxsize=queue_size or workers)
+    activities, errors = [], []
+    done = 0
+
+    def finished(item: dict, into: list) -> None:
+        nonlocal done
+        into.append(item)
+        done += 1
+        if progress is not None:
+            progress(done, len(paths), item)
+
+    async def read(path) -> None:
+        try:
+            try:
+                data, mtime = await loop.run_in_executor(None, _read_file, path)
+            except OSError as e:
+                finished({"file": str(path), "error": str(e)}, errors)
+                return
+            await queue.put((path, data, mtime))
+        finally:
+            semaphore.release()
+
+    async def feed() -> None:
+        readers = []
+        try:
+            for path in paths:
+                await semaphore.acquire()
+                readers.append(loop.create_task(read(path)))
+            await asyncio.gather(*readers)
+        finally:
+            for reader in readers:
+                reader.cancel()
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def score(pool) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            path, data, mtime = item
+            del item
+            try:
+                result = await loop.run_in_executor(
+                    pool, score_activity, str(path), data, ftp, sample_rate_hz, mtime)
+            except Exception as e:  # FitError, undecodable text, worker crashes...
+                finished({"file": str(path), "error": str(e) or type(e).__name__}, errors)
+            else:
+                finished(result, activities)
+
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    tasks = [loop.create_task(feed())] + [loop.create_task(score(pool)) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if executor is None:
+            pool.shutdown()
+
+    activities.sort(key=lambda a: (a["date"], a["file"]))
+    errors.sort(key=lambda e: e["file"])
+    daily = {}
+    for activity in activities:
+        daily[activity["date"]] = daily.get(activity["date"], 0.0) + activity["tss"]
+    return {
+        "daily_tss": {day: round(tss, 1) for day, tss in daily.items()},
+        "activities": activities,
+        "errors": errors,
+    }
+
+
+def ingest_directory(directory: str, ftp: int, **options) -> dict:
+    """Run ingest_files() over activity_files(directory) to completion."""
+    return asyncio.run(ingest_files(activity_files(directory), ftp, **options))
+
+
+def _progress_bar(done: int, total: int, item: dict) -> None:
+    end = '\n' if done == total else ''
+    print(f"\r  Scored {done}/{total} files", end=end, file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Score a directory of activity files and aggregate daily TSS')
+    parser.add_argument('directory', help='Directory of .fit/.cyps/.csv/.txt activity files')
+    parser.add_argument('ftp', type=int, help='Functional Threshold Power in watts')
+    parser.add_argument('--sample-rate', type=float, default=1.0,
+                        help='Samples per second for text files (default: 1)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Files read at once (default: 8)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Scoring processes (default: CPU count)')
+    parser.add_argument('--week', action='store_true',
+                        help='Analyze the last week of the derived PMC instead of listing daily TSS')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    if args.ftp < 50 or args.ftp > 500:
+        print("Error: FTP should be between 50-500W", file=sys.stderr)
+        sys.exit(1)
+
+    progress = _progress_bar if sys.stderr.isatty() else None
+    try:
+        result = ingest_directory(args.directory, args.ftp, sample_rate_hz=args.sample_rate,
+                                  concurrency=args.concurrency, workers=args.workers,
+                                  progress=progress)
+        week = None
+        if args.week:
+            from pmc import analyze_pmc_week, compute_pmc
+            week = analyze_pmc_week(compute_pmc(result["daily_tss"]))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for error in result["errors"]:
+        print(f"Skipped {error['file']}: {error['error']}", file=sys.stderr)
+
+    if args.json:
+        if week is not None:
+            result["week"] = week
+        print(json.dumps(result, indent=2))
+    elif week is not None:
+        from analyze_week import print_result
+        print_result(week)
+    else:
+        print("date,tss")
+        for day, tss in result["daily_tss"].items():
+            print(f"{day},{tss}")
+
+
+if __name__ == '__main__':
+    main()
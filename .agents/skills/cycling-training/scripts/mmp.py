@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Mean Maximal Power (power-duration curve) from a raw power stream.
+
+Usage:
+    python mmp.py <power_file>
+    python mmp.py ride.csv --json
+    python mmp.py ride.csv --full --json      # every duration 1 s .. ride length
+    python mmp.py ride.csv --sample-rate 2
+
+Power file: one sample per line, a CSV with a "power"/"watts" column, or a
+binary .cyps stream (same formats as calculate_tss.py --power-file).
+
+MMP(d) = best average power over any d-second window of the ride.
+Window sums come from a prefix-sum array, so each duration is one
+O(n) sliding-window maximum (vectorized with NumPy when installed).
+"""
+
+import argparse
+import json
+import sys
+from operator import sub
+
+import _optional
+from power_stream import power_samples
+
+# Durations highlighted in text output (see references/analytics.md)
+KEY_DURATIONS = (5, 30, 60, 300, 1200, 3600)
+
+
+def duration_grid(max_duration: int, sparse: bool = True) -> list:
+    """
+    Durations (seconds) at which to evaluate the curve.
+
+    The full grid is every second up to `max_duration`. The sparse grid
+    keeps curve shape with far fewer points: 1 s steps to 2 min, 5 s to
+    10 min, 30 s to 1 h, then 1 min steps, always ending at max_duration.
+    """
+    if max_duration < 1:
+        return []
+    if not sparse:
+        return list(range(1, max_duration + 1))
+
+    grid = []
+    for start, stop, step in ((1, 120, 1), (120, 600, 5), (600, 3600, 30),
+                              (3600, max_duration, 60)):
+        grid.extend(range(start, min(stop, max_duration + 1), step))
+    if not grid or grid[-1] != max_duration:
+        grid.append(max_duration)
+    return grid
+
+
+def mean_max_power(samples, durations=None, sample_rate_hz: float = 1.0,
+                   sparse: bool = True) -> dict:
+    """
+    Compute the power-duration curve.
+
+    `durations` are in seconds; by default duration_grid() up to the ride
+    length (sparse unless `sparse=False`). Durations longer than the ride
+    are dropped. Missing samples (None) count as 0 W.
+    Returns {"durations": [...], "power": [...]} as parallel lists.
+    """
+    numpy = _optional.numpy()
+    if numpy is not None:
+        watts = _optional.float_array(samples)
+    else:
+        watts = [float(w) if w is not None else 0.0 for w in samples]
+    n = len(watts)
+
+    ride_sec = int(n / sample_rate_hz)
+    if durations is None:
+        durations = duration_grid(ride_sec, sparse)
+    durations = [d for d in durations if 1 <= round(d * sample_rate_hz) <= n]
+
+    power = []
+    if numpy is not None:
+        prefix = numpy.concatenate(([0.0], numpy.cumsum(watts, dtype=float)))
+        for d in durations:
+            k = int(round(d * sample_rate_hz))
+            power.append(float((prefix[k:] - prefix[:-k]).max()) / k)
+    else:
+        prefix = [0.0] * (n + 1)
+        total = 0.0
+        for i, w in enumerate(watts, 1):
+            total += w
+            prefix[i] = total
+        for d in durations:
+            k = int(round(d * sample_rate_hz))
+            power.append(max(map(sub, prefix[k:], prefix)) / k)
+
+    return {"durations": durations, "power": power}
+
+
+def print_curve(curve: dict, as_json: bool = False):
+    """Print the power-duration curve."""
+    if as_json:
+        print(json.dumps({"durations": curve["durations"],
+                          "power": [round(p, 1) for p in curve["power"]]}))
+        return
+
+    print(f"\n{'='*40}")
+    print("  Mean Maximal Power")
+    print(f"{'='*40}\n")
+    best = dict(zip(curve["durations"], curve["power"]))
+    for d in KEY_DURATIONS:
+        if d in best:
+            label = f"{d} s" if d < 60 else f"{d // 60} min"
+            print(f"  {label:>8}:  {best[d]:.0f}W")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute Mean Maximal Power from a power stream')
+    parser.add_argument('power_file', help="Power samples ('-' for stdin)")
+    parser.add_argument('--sample-rate', type=float,
+                        help='Samples per second (default: .cyps header rate, else 1)')
+    parser.add_argument('--full', action='store_true',
+                        help='Every duration from 1 s to ride length (default: sparse grid)')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        with power_samples(args.power_file, args.sample_rate) as (samples, rate):
+            if not _optional.is_array(samples):
+                samples = list(samples)
+            if not len(samples):
+                raise ValueError("Power file is empty")
+            curve = mean_max_power(samples, sample_rate_hz=rate, sparse=not args.full)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_curve(curve, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Performance Management Chart (PMC) from a dated daily TSS history.
+
+Usage:
+    python pmc.py <history.csv>
+    python pmc.py history.csv --week-ending 2026-03-01
+    python pmc.py history.csv --json
+    python pmc.py history.csv --json --series
+
+    # Checkpoint the load state, then append new days in O(1) each:
+    python pmc.py history.csv --save-checkpoint state.json
+    python pmc.py --checkpoint state.json --append 2026-03-02=85 --append 2026-03-03=0
+    python pmc.py --checkpoint state.json --verify history.csv
+
+History file: "date,tss" rows with ISO dates (header optional). Several rows
+for the same date are summed; days missing from the file count as 0 TSS.
+
+Model (exponentially weighted, one linear pass):
+- CTL (Fitness) = CTL_yesterday + (TSS_today - CTL_yesterday) / 42
+- ATL (Fatigue) = ATL_yesterday + (TSS_today - ATL_yesterday) / 7
+- TSB (Form)    = CTL - ATL
+- Ramp rate     = CTL_today - CTL_7_days_ago (CTL points per week)
+- Monotony/strain (--series) over the rolling 7 days ending each day
+
+The CTL/ATL of any week feed straight into analyze_week().
+"""
+
+import argparse
+import json
+import sys
+from collections import deque
+from datetime import date, timedelta
+
+import _optional
+from analyze_week import (
+    WeekAnalysis,
+    analyze_week,
+    analyze_week_compact,
+    calculate_monotony_strain,
+    print_result as print_week,
+    rolling_monotony_strain,
+)
+
+CTL_DAYS = 42
+ATL_DAYS = 7
+
+
+def _as_date(value) -> date:
+    """Coerce a date or ISO 'YYYY-MM-DD' string to a date."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip())
+
+
+def daily_series(history) -> tuple:
+    """
+    Normalize dated TSS entries into a contiguous daily series.
+
+    Accepts a mapping of date -> TSS or an iterable of (date, TSS) pairs;
+    dates may be date objects or ISO strings and need not be sorted.
+    Returns (start_date, [tss per day]) with gaps filled by 0.
+    """
+    items = history.items() if hasattr(history, 'items') else history
+    totals = {}
+    for day, tss in items:
+        day = _as_date(day)
+        totals[day] = totals.get(day, 0.0) + float(tss)
+
+    if not totals:
+        raise ValueError("TSS history is empty")
+
+    start = min(totals)
+    days = (max(totals) - start).days + 1
+    series = [0.0] * days
+    for day, tss in totals.items():
+        series[(day - start).days] = tss
+    return start, series
+
+
+def compute_pmc(history, ctl: float = 0.0, atl: float = 0.0) -> dict:
+    """
+    Compute the daily CTL, ATL, TSB and ramp-rate series in a single pass.
+
+    `history` is anything daily_series() accepts; `ctl`/`atl` seed the load
+    on the day before the first entry. Returns parallel lists keyed by
+    "dates", "tss", "ctl", "atl", "tsb" and "ramp_rate", plus "start_date".
+    """
+    start, tss_series = daily_series(history)
+
+    ctl_series, atl_series, tsb_series, ramp_series = [], [], [], []
+    seed_ctl = ctl
+    for i, tss in enumerate(tss_series):
+        ctl += (tss - ctl) / CTL_DAYS
+        atl += (tss - atl) / ATL_DAYS
+        ctl_series.append(ctl)
+        atl_series.append(atl)
+        tsb_series.append(ctl - atl)
+        ramp_series.append(ctl - (ctl_series[i - 7] if i >= 7 else seed_ctl))
+
+    return {
+        "start_date": start,
+        "dates": [start + timedelta(days=i) for i in range(len(tss_series))],
+        "tss": tss_series,
+        "ctl": ctl_series,
+        "atl": atl_series,
+        "tsb": tsb_series,
+        "ramp_rate": ramp_series,
+    }
+
+
+def compute_pmc_matrix(daily_tss, ctl=0.0, atl=0.0) -> dict:
+    """
+    Compute CTL/ATL/TSB for many aligned daily series at once.
+
+    `daily_tss` is a 2-D array (series × days), e.g. a roster sharing a
+    calendar; `ctl`/`atl` are scalars or one seed per series. The recurrence
+    runs once per day over whole columns, so cost is O(days) vectorized
+    steps. Requires NumPy; returns 2-D arrays keyed "ctl", "atl", "tsb".
+    """
+    numpy = _optional.numpy()
+    if numpy is None:
+        raise RuntimeError("compute_pmc_matrix() requires NumPy; use compute_pmc() per series")
+
+    loads = numpy.asarray(daily_tss, dtype=float)
+    if loads.ndim != 2:
+        raise ValueError("daily_tss must be a 2-D array (series x days)")
+
+    ctl_out = numpy.empty_like(loads)
+    atl_out = numpy.empty_like(loads)
+    ctl = numpy.broadcast_to(numpy.asarray(ctl, dtype=float), loads.shape[:1]).copy()
+    atl = numpy.broadcast_to(numpy.asarray(atl, dtype=float), loads.shape[:1]).copy()
+    for day in range(loads.shape[1]):
+        tss = loads[:, day]
+        ctl += (tss - ctl) / CTL_DAYS
+        atl += (tss - atl) / ATL_DAYS
+        ctl_out[:, day] = ctl
+        atl_out[:, day] = atl
+
+    return {"ctl": ctl_out, "atl": atl_out, "tsb": ctl_out - atl_out}
+
+
+def analyze_pmc_week_compact(pmc: dict, week_ending=None) -> WeekAnalysis:
+    """
+    Run analyze_week_compact() for the 7 days ending on `week_ending`.
+
+    Defaults to the last day of the PMC. Weekly TSS, daily TSS, the
+    previous week's TSS, the end-of-week CTL/ATL and the exact 7-day CTL
+    ramp all come from the PMC; days before the history starts count as 0
+    TSS. CTL/ATL are passed rounded to 1 decimal, as a PMC chart displays
+    them.
+    """
+    end = len(pmc["tss"]) - 1
+    if week_ending is not None:
+        end = (_as_date(week_ending) - pmc["start_date"]).days
+    if not 0 <= end < len(pmc["tss"]):
+        raise ValueError(f"Week ending {week_ending} is outside the TSS history")
+
+    tss = pmc["tss"]
+    daily = [tss[i] if i >= 0 else 0.0 for i in range(end - 6, end + 1)]
+    prev_week = sum(tss[max(0, end - 13):max(0, end - 6)]) if end >= 7 else None
+
+    return analyze_week_compact(sum(daily), round(pmc["ctl"][end], 1), round(pmc["atl"][end], 1),
+                                prev_week_tss=prev_week, daily_tss=daily,
+                                ramp_rate=pmc["ramp_rate"][end])
+
+
+def analyze_pmc_week(pmc: dict, week_ending=None) -> dict:
+    """Weekly analysis of a PMC as a dict (see analyze_pmc_week_compact())."""
+    return analyze_pmc_week_compact(pmc, week_ending).to_dict()
+
+
+class LoadState:
+    """
+    Checkpointable PMC state: advance one day in O(1) instead of replaying history.
+
+    Holds the last date, CTL, ATL, the last 7 daily TSS values (for
+    monotony/strain) and the last 8 CTL values (for the 7-day ramp rate).
+    Advancing uses the same EWMA recurrence as compute_pmc(), so the state
+    after appending a day equals the last day of a full recompute.
+    """
+
+    __slots__ = ('last_date', 'ctl', 'atl', 'seed_ctl', 'seed_atl', 'daily', 'ctl_history')
+
+    def __init__(self, ctl: float = 0.0, atl: float = 0.0, last_date: date = None):
+        self.last_date = last_date
+        self.ctl = ctl
+        self.atl = atl
+        self.seed_ctl = ctl
+        self.seed_atl = atl
+        self.daily = deque(maxlen=7)
+        self.ctl_history = deque(maxlen=8)
+
+    def _step(self, tss: float) -> None:
+        self.ctl += (tss - self.ctl) / CTL_DAYS
+        self.atl += (tss - self.atl) / ATL_DAYS
+        self.daily.append(tss)
+        self.ctl_history.append(self.ctl)
+
+    def advance(self, day, tss: float) -> None:
+        """
+        Add one day's TSS.
+
+        Skipped days are filled as rest days. Appending to the current last
+        date adds to that day (a second ride): the recurrence is linear in
+        today's TSS, so CTL/ATL simply gain tss/42 and tss/7. Dates before
+        the last date cannot be applied incrementally and raise ValueError.
+        """
+        day = _as_date(day)
+        tss = float(tss)
+        if self.last_date is not None:
+            gap = (day - self.last_date).days
+            if gap < 0:
+                raise ValueError(f"{day} is before the checkpoint date {self.last_date}; recompute instead")
+            if gap == 0 and self.daily:
+                self.ctl += tss / CTL_DAYS
+                self.atl += tss / ATL_DAYS
+                self.daily[-1] += tss
+                self.ctl_history[-1] = self.ctl
+                return
+            for _ in range(gap - 1):
+                self._step(0.0)
+        self._step(tss)
+        self.last_date = day
+
+    @property
+    def tsb(self) -> float:
+        """Training Stress Balance on the last date."""
+        return self.ctl - self.atl
+
+    @property
+    def ramp_rate(self) -> float:
+        """CTL change over the last 7 days (matches compute_pmc())."""
+        if len(self.ctl_history) == self.ctl_history.maxlen:
+            return self.ctl - self.ctl_history[0]
+        return self.ctl - self.seed_ctl
+
+    def monotony_strain(self) -> dict:
+        """Foster monotony/strain over the rolling 7-day window."""
+        return calculate_monotony_strain(list(self.daily))
+
+    def analyze_week(self, prev_week_tss: float = None) -> dict:
+        """Run analyze_week() for the 7 days ending on the last date."""
+        daily = [0.0] * (7 - len(self.daily)) + list(self.daily)
+        return analyze_week(sum(daily), round(self.ctl, 1), round(self.atl, 1),
+                            prev_week_tss=prev_week_tss, daily_tss=daily,
+                            ramp_rate=self.ramp_rate)
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible checkpoint."""
+        return {
+            "last_date": self.last_date.isoformat() if self.last_date else None,
+            "ctl": self.ctl,
+            "atl": self.atl,
+            "seed_ctl": self.seed_ctl,
+            "seed_atl": self.seed_atl,
+            "daily_tss": list(self.daily),
+            "ctl_history": list(self.ctl_history),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LoadState':
+        """Restore a state written by to_dict()."""
+        state = cls(data["seed_ctl"], data["seed_atl"])
+        state.last_date = _as_date(data["last_date"]) if data["last_date"] else None
+        state.ctl = data["ctl"]
+        state.atl = data["atl"]
+        state.daily.extend(data["daily_tss"])
+        state.ctl_history.extend(data["ctl_history"])
+        return state
+
+    @classmethod
+    def from_pmc(cls, pmc: dict, ctl: float = 0.0, atl: float = 0.0) -> 'LoadState':
+        """Build the state at the last day of a computed PMC seeded with ctl/atl."""
+        state = cls(ctl, atl, pmc["dates"][-1])
+        state.ctl = pmc["ctl"][-1]
+        state.atl = pmc["atl"][-1]
+        state.daily.extend(pmc["tss"][-7:])
+        state.ctl_history.extend(pmc["ctl"][-8:])
+        return state
+
+
+def save_checkpoint(state: LoadState, path: str) -> None:
+    """Write a LoadState checkpoint as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state.to_dict(), f)
+
+
+def load_checkpoint(path: str) -> LoadState:
+    """Read a LoadState checkpoint written by save_checkpoint()."""
+    with open(path, encoding='utf-8') as f:
+        return LoadState.from_dict(json.load(f))
+
+
+def verify_checkpoint(state: LoadState, history, tolerance: float = 1e-6) -> dict:
+    """
+    Compare an incrementally advanced state with a full recompute.
+
+    Replays `history` with compute_pmc() from the state's seed CTL/ATL and
+    reports the absolute differences of CTL, ATL and ramp rate plus whether
+    the dates and 7-day window agree. "ok" is True when everything matches
+    within `tolerance`.
+    """
+    pmc = compute_pmc(history, state.seed_ctl, state.seed_atl)
+    full = LoadState.from_pmc(pmc, state.seed_ctl, state.seed_atl)
+
+    report = {
+        "date_match": full.last_date == state.last_date,
+        "ctl_error": abs(full.ctl - state.ctl),
+        "atl_error": abs(full.atl - state.atl),
+        "ramp_rate_error": abs(full.ramp_rate - state.ramp_rate),
+        "window_match": len(full.daily) == len(state.daily) and all(
+            abs(a - b) <= tolerance for a, b in zip(full.daily, state.daily)),
+    }
+    report["ok"] = (report["date_match"] and report["window_match"]
+                    and max(report["ctl_error"], report["atl_error"],
+                            report["ramp_rate_error"]) <= tolerance)
+    return report
+
+
+def parse_append(value: str) -> tuple:
+    """Parse a DATE=TSS pair for --append."""
+    try:
+        day, tss = value.split('=')
+        return date.fromisoformat(day.strip()), float(tss)
+    except ValueError:
+        raise argparse.ArgumentTypeError("--append expects DATE=TSS (e.g., 2026-03-02=85)")
+
+
+def read_daily_tss(path: str) -> list:
+    """Read (date, tss) pairs from a 'date,tss' CSV file ('-' reads stdin)."""
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    entries = []
+    first_row = True
+    try:
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            cells = [c.strip() for c in line.split(',')]
+            if first_row:
+                first_row = False
+                try:
+                    date.fromisoformat(cells[0])
+                except ValueError:
+                    continue  # Header row
+            try:
+                entries.append((date.fromisoformat(cells[0]), float(cells[1])))
+            except (ValueError, IndexError):
+                raise ValueError(f"{path}:{line_no}: expected 'date,tss', got {line!r}")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return entries
+
+
+def state_summary(state: LoadState) -> dict:
+    """Summarize a LoadState like latest_day() does for a PMC day."""
+    return {
+        "date": state.last_date.isoformat() if state.last_date else None,
+        "ctl": round(state.ctl, 1),
+        "atl": round(state.atl, 1),
+        "tsb": round(state.tsb, 1),
+        "ramp_rate": round(state.ramp_rate, 1),
+    }
+
+
+def latest_day(pmc: dict, index: int = -1) -> dict:
+    """Summarize a single PMC day."""
+    return {
+        "date": pmc["dates"][index].isoformat(),
+        "ctl": round(pmc["ctl"][index], 1),
+        "atl": round(pmc["atl"][index], 1),
+        "tsb": round(pmc["tsb"][index], 1),
+        "ramp_rate": round(pmc["ramp_rate"][index], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Derive CTL/ATL/TSB from daily TSS history and analyze a week')
+    parser.add_argument('history', nargs='?', help="CSV of 'date,tss' rows ('-' for stdin)")
+    parser.add_argument('--week-ending', type=date.fromisoformat,
+                        help='Last day of the week to analyze (default: last day in history)')
+    parser.add_argument('--ctl', type=float, default=0.0, help='CTL before the first day (default: 0)')
+    parser.add_argument('--atl', type=float, default=0.0, help='ATL before the first day (default: 0)')
+    parser.add_argument('--series', action='store_true', help='Include the full daily series in JSON output')
+    parser.add_argument('--save-checkpoint', metavar='FILE',
+                        help='Write the load state at the end of the history to FILE')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='Load state from FILE instead of replaying a history')
+    parser.add_argument('--append', type=parse_append, action='append', default=[],
+                        metavar='DATE=TSS', help='Advance the checkpoint by one day (repeatable)')
+    parser.add_argument('--verify', metavar='HISTORY',
+                        help='Compare the checkpoint with a full recompute of HISTORY')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    if args.checkpoint:
+        run_checkpoint(args)
+        return
+    if not args.history:
+        parser.error("a history file is required unless --checkpoint is given")
+
+    try:
+        pmc = compute_pmc(read_daily_tss(args.history), args.ctl, args.atl)
+        week = analyze_pmc_week(pmc, args.week_ending)
+        if args.save_checkpoint:
+            save_checkpoint(LoadState.from_pmc(pmc, args.ctl, args.atl), args.save_checkpoint)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    index = (args.week_ending - pmc["start_date"]).days if args.week_ending else -1
+    day = latest_day(pmc, index)
+
+    if args.json:
+        output = {"pmc": day, "week": week}
+        if args.series:
+            output["series"] = {
+                "dates": [d.isoformat() for d in pmc["dates"]],
+                **{key: [round(v, 2) for v in pmc[key]]
+                   for key in ("tss", "ctl", "atl", "tsb", "ramp_rate")},
+                **rolling_monotony_strain(pmc["tss"]),
+            }
+        print(json.dumps(output, indent=2))
+        return
+
+    print(f"\n  PMC on {day['date']}: CTL={day['ctl']} | ATL={day['atl']} | "
+          f"TSB={day['tsb']:+.1f} | Ramp={day['ramp_rate']:+.1f} CTL/week")
+    print_week(week)
+
+
+def run_checkpoint(args) -> None:
+    """CLI path for --checkpoint: append days, verify, and report."""
+    try:
+        state = load_checkpoint(args.checkpoint)
+        for day, tss in args.append:
+            state.advance(day, tss)
+        if args.append:
+            save_checkpoint(state, args.checkpoint)
+        report = verify_checkpoint(state, read_daily_tss(args.verify)) if args.verify else None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    day = state_summary(state)
+    week = state.analyze_week() if state.last_date else None
+    if args.json:
+        output = {"pmc": day, "week": week}
+        if report is not None:
+            output["verify"] = report
+        print(json.dumps(output, indent=2))
+    else:
+        print(f"\n  Checkpoint {day['date']}: CTL={day['ctl']} | ATL={day['atl']} | "
+              f"TSB={day['tsb']:+.1f} | Ramp={day['ramp_rate']:+.1f} CTL/week")
+        if report is not None:
+            verdict = "OK" if report["ok"] else "MISMATCH"
+            print(f"  Verify: {verdict} (CTL err {report['ctl_error']:.2e}, "
+                  f"ATL err {report['atl_error']:.2e})")
+        if week:
+            print_week(week)
+
+    if report is not None and not report["ok"]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
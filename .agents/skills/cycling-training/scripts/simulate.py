@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Project CTL/ATL/TSB/ACWR forward for one or many candidate training plans.
+
+Usage:
+    python simulate.py <CTL> <ATL> --weeks 425,475,525,275,525,575,625,325
+    python simulate.py 60 55 --weeks 425,475,525,275 --weeks 450,500,550,300 --json
+    python simulate.py 60 55 --plans plans.csv --prev-week-tss 400
+
+Plans:
+- --weeks: weekly TSS targets (repeatable, one plan each), spread over the
+  days with --pattern (default: the Mon-Sun shape of week 1 in
+  assets/base-8-week.md: rest, endurance, recovery, tempo, rest, long, recovery)
+- --plans: CSV with one plan per row of daily TSS, optionally led by a name
+
+Each plan is run through the PMC recurrence (compute_pmc(): CTL 42-day and
+ATL 7-day exponentially weighted) from the current CTL/ATL, for every plan
+at once with NumPy. Every projected week is then analyzed exactly as
+pmc.py analyzes a week of history: analyze_week() on the week's daily TSS,
+end-of-week CTL/ATL (rounded to 1 decimal), the previous week's TSS and the
+exact 7-day CTL ramp.
+The weekly statuses, monotony and warning counts are computed for all
+plans × weeks as arrays; week_analysis() gives the full analyze_week()
+result, warnings included, for any one week.
+"""
+
+import argparse
+import json
+import math
+import sys
+
+import _optional
+from analyze_week import (
+    ACWR_STATUS,
+    MONOTONY_STATUS,
+    RAMP_STATUS,
+    TSB_STATUS,
+    analyze_week,
+    analyze_week_compact,
+    calculate_acwr,
+    calculate_load_batch,
+    calculate_tsb,
+)
+from pmc import ATL_DAYS, CTL_DAYS, compute_pmc_matrix
+
+# Mon-Sun TSS of week 1 in assets/base-8-week.md, used as relative weights
+DEFAULT_PATTERN = (0, 65, 20, 75, 0, 165, 28)
+
+WEEKLY_KEYS = ('weekly_tss', 'ctl', 'atl', 'tsb', 'acwr', 'ramp_rate', 'ctl_change',
+               'week_over_week_change', 'monotony', 'strain', 'tsb_status', 'acwr_status',
+               'ramp_status', 'monotony_status', 'high_warnings', 'moderate_warnings')
+
+
+def expand_weekly_tss(weekly_tss, pattern=DEFAULT_PATTERN) -> list:
+    """Spread weekly TSS targets over 7 days in proportion to `pattern`."""
+    if len(pattern) != 7 or sum(pattern) <= 0 or min(pattern) < 0:
+        raise ValueError("pattern needs 7 non-negative day weights with a positive sum")
+    total = sum(pattern)
+    return [week * weight / total for week in weekly_tss for weight in pattern]
+
+
+def _plan_rows(plans) -> list:
+    """Validate plans as a list of equal-length rows of whole weeks."""
+    rows = list(plans)
+    if rows and not hasattr(rows[0], '__len__'):
+        rows = [rows]
+    if len({len(row) for row in rows}) > 1:
+        raise ValueError("All plans must have the same number of days")
+    if not rows or not len(rows[0]) or len(rows[0]) % 7:
+        raise ValueError("Plans must cover a whole number of weeks of daily TSS")
+    return rows
+
+
+def simulate_plans(plans, ctl: float = 0.0, atl: float = 0.0, prev_week_tss: float = None) -> dict:
+    """
+    Project load for candidate plans of planned daily TSS.
+
+    `plans` is a 2-D array (plans × days, days a multiple of 7) or a single
+    plan; `ctl`/`atl` are the current values (the day before the plans
+    start). Returns:
+
+    - "daily": "ctl", "atl", "tsb", "acwr" (plans × days)
+    - "weekly": WEEKLY_KEYS (plans × weeks), the analyze_week() metrics of
+      each week plus "ctl_change" (projected CTL gain over the week, also
+      the week's exact "ramp_rate" rounded to 1 decimal), status
+      codes indexing TSB_STATUS.statuses etc., and the number of "high" and
+      "moderate" analyze_week() warnings. The first week's
+      week_over_week_change is NaN (None without NumPy) unless
+      `prev_week_tss` is given.
+
+    Arrays are ndarrays with NumPy, else lists of per-plan lists.
+    """
+    numpy = _optional.numpy()
+    if numpy is None:
+        return _simulate_pure(_plan_rows(plans), ctl, atl, prev_week_tss)
+
+    if not hasattr(plans, 'ndim'):
+        plans = _plan_rows(plans)
+    loads = numpy.asarray(plans, dtype=float)
+    if loads.ndim == 1:
+        loads = loads[None, :]
+    if loads.ndim != 2 or not loads.shape[1] or loads.shape[1] % 7:
+        raise ValueError("Plans must cover a whole number of weeks of daily TSS")
+    count, weeks = loads.shape[0], loads.shape[1] // 7
+    round_py = _optional.round_like_python
+
+    pmc = compute_pmc_matrix(loads, ctl, atl)
+    daily = {**pmc, "acwr": calculate_load_batch(pmc["ctl"], pmc["atl"])["acwr"].filled(0.0)}
+
+    by_week = loads.reshape(count, weeks, 7)
+    weekly_tss = by_week.sum(axis=2)
+    end_ctl, end_atl = pmc["ctl"][:, 6::7], pmc["atl"][:, 6::7]
+    week_ctl, week_atl = round_py(end_ctl, 1), round_py(end_atl, 1)
+    load = calculate_load_batch(week_ctl, week_atl)
+    tsb, acwr = load["tsb"], load["acwr"].filled(0.0)
+    ctl_change = end_ctl - numpy.concatenate([numpy.full((count, 1), float(ctl)), end_ctl[:, :-1]], axis=1)
+    ramp = round_py(ctl_change, 1)
+
+    first = numpy.nan if prev_week_tss is None else float(prev_week_tss)
+    prev = numpy.concatenate([numpy.full((count, 1), first), weekly_tss[:, :-1]], axis=1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        wow = numpy.where(prev > 0, (weekly_tss - prev) / prev * 100,
+                          numpy.where(numpy.isnan(prev), numpy.nan, 0.0))
+        mean = weekly_tss / 7
+        std = numpy.sqrt(((by_week - mean[..., None]) ** 2).sum(axis=2) / 7)
+        uniform = std < 0.01
+        raw_monotony = numpy.where(uniform, numpy.inf, mean / std)
+    monotony = numpy.where(uniform, numpy.inf, round_py(numpy.where(uniform, 0.0, raw_monotony), 2))
+    strain = numpy.where(uniform, numpy.inf,
+                         round_py(numpy.where(uniform, 0.0, weekly_tss * raw_monotony), 0))
+
+    # Same thresholds as analyze_week_compact()'s warnings
+    high = ((wow > 30).astype(numpy.uint8) + (monotony > 2.0) + (acwr > 1.5)
+            + (tsb < -30) + (ramp > 8))
+    moderate = ((wow > 20) & (wow <= 30)).astype(numpy.uint8) + ((acwr > 1.3) & (acwr <= 1.5))
+
+    weekly = {
+        "weekly_tss": weekly_tss,
+        "ctl": week_ctl,
+        "atl": week_atl,
+        "tsb": round_py(tsb, 1),
+        "acwr": round_py(acwr, 2),
+        "ramp_rate": ramp,
+        "ctl_change": ctl_change,
+        "week_over_week_change": round_py(wow, 1),
+        "monotony": monotony,
+        "strain": strain,
+        "tsb_status": load["tsb_status"],
+        "acwr_status": load["acwr_status"],
+        "ramp_status": RAMP_STATUS.codes(ramp),
+        "monotony_status": MONOTONY_STATUS.codes(monotony),
+        "high_warnings": high.astype(numpy.uint8),
+        "moderate_warnings": moderate.astype(numpy.uint8),
+    }
+    return {"daily": daily, "weekly": weekly, "prev_week_tss": prev_week_tss}
+
+
+def _simulate_pure(rows: list, ctl: float, atl: float, prev_week_tss) -> dict:
+    daily = {key: [] for key in ("ctl", "atl", "tsb", "acwr")}
+    weekly = {key: [] for key in WEEKLY_KEYS}
+    for plan in rows:
+        c, a = float(ctl), float(atl)
+        ctl_row, atl_row = [], []
+        for tss in plan:
+            c += (float(tss) - c) / CTL_DAYS
+            a += (float(tss) - a) / ATL_DAYS
+            ctl_row.append(c)
+            atl_row.append(a)
+        daily["ctl"].append(ctl_row)
+        daily["atl"].append(atl_row)
+        daily["tsb"].append([c - a for c, a in zip(ctl_row, atl_row)])
+        daily["acwr"].append([calculate_acwr(c, a) for c, a in zip(ctl_row, atl_row)])
+
+        cells = {key: [] for key in WEEKLY_KEYS}
+        prev, prev_ctl = prev_week_tss, float(ctl)
+        for end in range(6, len(plan), 7):
+            days = [float(tss) for tss in plan[end - 6:end + 1]]
+            week_ctl, week_atl = round(ctl_row[end], 1), round(atl_row[end], 1)
+            week = analyze_week_compact(sum(days), week_ctl, week_atl, prev, days,
+                                        ramp_rate=ctl_row[end] - prev_ctl)
+            levels = [w.level for w in week.warnings]
+            for key, value in (
+                    ("weekly_tss", week.weekly_tss), ("ctl", week_ctl), ("atl", week_atl),
+                    ("tsb", week.tsb), ("acwr", week.acwr), ("ramp_rate", week.ramp_rate),
+                    ("ctl_change", ctl_row[end] - prev_ctl),
+                    ("week_over_week_change", week.week_over_week_change),
+                    ("monotony", week.monotony), ("strain", week.strain),
+                    ("tsb_status", TSB_STATUS.code(calculate_tsb(week_ctl, week_atl))),
+                    ("acwr_status", ACWR_STATUS.code(calculate_acwr(week_ctl, week_atl))),
+                    ("ramp_status", RAMP_STATUS.code(week.ramp_rate)),
+                    ("monotony_status", MONOTONY_STATUS.code(week.monotony)),
+                    ("high_warnings", levels.count("high")),
+                    ("moderate_warnings", levels.count("moderate"))):
+                cells[key].append(value)
+            prev, prev_ctl = week.weekly_tss, ctl_row[end]
+        for key in WEEKLY_KEYS:
+            weekly[key].append(cells[key])
+    return {"daily": daily, "weekly": weekly, "prev_week_tss": prev_week_tss}
+
+
+def week_analysis(result: dict, plans, plan: int, week: int) -> dict:
+    """
+    Full analyze_week() result (statuses, warnings) for one projected week.
+
+    `plans` must be the array passed to simulate_plans().
+    """
+    rows = _plan_rows(plans)
+    weekly = result["weekly"]
+    days = [float(tss) for tss in rows[plan][7 * week:7 * week + 7]]
+    prev = weekly["weekly_tss"][plan][week - 1] if week else result["prev_week_tss"]
+    return analyze_week(sum(days), float(weekly["ctl"][plan][week]), float(weekly["atl"][plan][week]),
+                        prev_week_tss=None if prev is None else float(prev), daily_tss=days,
+                        ramp_rate=float(weekly["ctl_change"][plan][week]))
+
+
+def read_plans(path: str) -> tuple:
+    """Read (names, daily TSS rows) from a plans CSV ('-' reads stdin)."""
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    names, rows = [], []
+    try:
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            cells = [c.strip() for c in line.split(',')]
+            try:
+                float(cells[0])
+                name = f"plan {len(rows) + 1}"
+            except ValueError:
+                name, cells = cells[0], cells[1:]
+            try:
+                rows.append([float(c) if c else 0.0 for c in cells])
+            except ValueError:
+                raise ValueError(f"{path}:{line_no}: expected daily TSS values, got {line!r}")
+            names.append(name)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return names, rows
+
+
+def _cell(weekly: dict, key: str, plan: int, week: int):
+    value = weekly[key][plan][week]
+    value = value.item() if hasattr(value, 'item') else value
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def summarize(result: dict, names: list) -> list:
+    """Per-plan, per-week JSON-ready rows with status names."""
+    weekly = result["weekly"]
+    tables = {"tsb_status": TSB_STATUS, "acwr_status": ACWR_STATUS,
+              "ramp_status": RAMP_STATUS, "monotony_status": MONOTONY_STATUS}
+    plans = []
+    for p, name in enumerate(names):
+        weeks = []
+        for w in range(len(weekly["weekly_tss"][p])):
+            row = {key: _cell(weekly, key, p, w) for key in WEEKLY_KEYS}
+            for key, table in tables.items():
+                row[key] = table.statuses[row[key]]['status']
+            row["ctl_change"] = round(row["ctl_change"], 1)
+            weeks.append({"week": w + 1, **row})
+        plans.append({"plan": name, "weeks": weeks})
+    return plans
+
+
+def print_summary(plans: list, as_json: bool = False):
+    """Print projected weeks per plan."""
+    if as_json:
+        print(json.dumps(plans, indent=2))
+        return
+
+    for plan in plans:
+        print(f"\n{'='*72}")
+        print(f"  {plan['plan']}")
+        print(f"{'='*72}")
+        print(f"  {'Wk':>2} {'TSS':>6} {'CTL':>6} {'ATL':>6} {'TSB':>6} {'ACWR':>5} "
+              f"{'dCTL':>5}  {'Form':<13} {'ACWR':<12} Warnings")
+        for w in plan["weeks"]:
+            warnings = f"{w['high_warnings']} high" if w['high_warnings'] else ""
+            if w['moderate_warnings']:
+                warnings += (", " if warnings else "") + f"{w['moderate_warnings']} moderate"
+            print(f"  {w['week']:>2} {w['weekly_tss']:>6.0f} {w['ctl']:>6.1f} {w['atl']:>6.1f} "
+                  f"{w['tsb']:>+6.1f} {w['acwr']:>5.2f} {w['ctl_change']:>+5.1f}  "
+                  f"{w['tsb_status']:<13} {w['acwr_status']:<12} {warnings}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Project CTL/ATL/TSB for candidate training plans')
+    parser.add_argument('ctl', type=float, help='Current CTL (Chronic Training Load)')
+    parser.add_argument('atl', type=float, help='Current ATL (Acute Training Load)')
+    parser.add_argument('--weeks', action='append', default=[], metavar='TSS,TSS,...',
+                        help='Weekly TSS targets of one plan (repeatable)')
+    parser.add_argument('--pattern', default=','.join(map(str, DEFAULT_PATTERN)),
+                        help='Mon-Sun weights for spreading weekly TSS (default: %(default)s)')
+    parser.add_argument('--plans', metavar='FILE', help='CSV of daily TSS, one plan per row')
+    parser.add_argument('--prev-week-tss', type=float, help='TSS of the week before the plans')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+    if not args.weeks and not args.plans:
+        parser.error("give at least one --weeks plan or a --plans file")
+
+    try:
+        pattern = [float(x) for x in args.pattern.split(',')]
+        names, rows = read_plans(args.plans) if args.plans else ([], [])
+        for i, weeks in enumerate(args.weeks, 1):
+            names.append(f"weeks {i}: {weeks}")
+            rows.append(expand_weekly_tss([float(x) for x in weeks.split(',')], pattern))
+        result = simulate_plans(rows, args.ctl, args.atl, args.prev_week_tss)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_summary(summarize(result, names), args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Taper optimizer: the taper that reaches a race-day TSB with the least CTL loss.
+
+Usage:
+    python taper.py <CTL> <ATL> <days_to_race>
+    python taper.py 85 90 21 --target-status FRESH
+    python taper.py 85 90 21 --target-tsb 12 --tolerance 3 --baseline 95 --json
+
+Candidate plans (references/periodization.md, Tapering Protocols):
+- taper length: 3-21 days before the race (capped at days_to_race)
+- volume reduction: 10-90% of the baseline daily TSS, reached on race eve
+- shape: step (cut at once), linear or exponential decay toward the cut
+- intensity days: 0-3 per taper week carrying twice an easy day's TSS
+  (same weekly volume, intensity maintained)
+Days before the taper are trained at the baseline (default: current CTL,
+i.e. maintenance).
+
+Every candidate runs through the PMC recurrence (compute_pmc()) from the
+current CTL/ATL; race-day TSB is the form after the day before the race.
+Plans whose ACWR or 7-day CTL ramp exceeds the limits on any day are
+discarded (defaults: the top of ACWR_STATUS OPTIMAL, 1.3, and of
+RAMP_STATUS AGGRESSIVE, 8 CTL/week). Of the rest, the plan reaching the
+target TSB band with the highest race-day CTL wins; if none reaches it,
+the plan closest to the band. With NumPy all ~3,900 candidates are one
+(candidates × days) array stepped day by day.
+"""
+
+import argparse
+import json
+import math
+import sys
+from itertools import product
+
+import _optional
+from analyze_week import ACWR_STATUS, RAMP_STATUS, TSB_STATUS, get_tsb_status
+from pmc import ATL_DAYS, CTL_DAYS, compute_pmc_matrix
+
+TAPER_LENGTHS = tuple(range(3, 22))
+REDUCTIONS = tuple(round(0.1 + 0.05 * i, 2) for i in range(17))
+SHAPES = ('step', 'linear', 'exponential')
+INTENSITY_DAYS = (0, 1, 2, 3)
+
+# Intensity days, as days before race eve within each taper week, in the
+# order they are added: 3 days out, then 5, then 1 (race eve stays easy).
+INTENSITY_OFFSETS = (3, 5, 1)
+INTENSITY_WEIGHT = 2.0
+
+MAX_ACWR = ACWR_STATUS.bounds[1]   # Top of OPTIMAL
+MAX_RAMP = RAMP_STATUS.bounds[-1]  # Top of AGGRESSIVE
+
+
+def tsb_range(status: str) -> tuple:
+    """(low, high) TSB band of a TSB_STATUS status name (e.g. "FRESH")."""
+    names = [s["status"] for s in TSB_STATUS.statuses]
+    if status not in names:
+        raise ValueError(f"Unknown TSB status: {status} (choose from {', '.join(names)})")
+    i = names.index(status)
+    bounds = (-math.inf,) + TSB_STATUS.bounds + (math.inf,)
+    return bounds[i], bounds[i + 1]
+
+
+def candidate_grid(days_to_race: int) -> list:
+    """All (length, reduction, shape, intensity_days) candidates for the race."""
+    lengths = [n for n in TAPER_LENGTHS if n <= days_to_race]
+    return list(product(lengths, REDUCTIONS, SHAPES, INTENSITY_DAYS))
+
+
+def _load_factor(shape: str, reduction: float, progress: float) -> float:
+    """Fraction of baseline volume `progress` (0-1] of the way into the taper."""
+    if shape == 'step':
+        return 1.0 - reduction
+    if shape == 'linear':
+        return 1.0 - reduction * progress
+    return (1.0 - reduction) ** progress
+
+
+def taper_plan(baseline: float, days_to_race: int, length: int, reduction: float,
+               shape: str, intensity_days: int) -> list:
+    """Daily TSS up to the day before the race for one taper candidate."""
+    weekly_weight = (7 + intensity_days * (INTENSITY_WEIGHT - 1)) / 7
+    intense = set(INTENSITY_OFFSETS[:intensity_days])
+    plan = []
+    for day in range(days_to_race):
+        before = days_to_race - day  # 1 = race eve
+        if before > length:
+            plan.append(float(baseline))
+            continue
+        weight = INTENSITY_WEIGHT if (before - 1) % 7 in intense else 1.0
+        factor = _load_factor(shape, reduction, (length - before + 1) / length)
+        plan.append(baseline * factor * weight / weekly_weight)
+    return plan
+
+
+def _taper_matrix(numpy, baseline: float, days_to_race: int, grid: list):
+    """taper_plan() for every candidate as one (candidates × days) array."""
+    length = numpy.array([c[0] for c in grid], dtype=float)[:, None]
+    reduction = numpy.array([c[1] for c in grid], dtype=float)[:, None]
+    shape = numpy.array([SHAPES.index(c[2]) for c in grid])[:, None]
+    intensity = numpy.array([c[3] for c in grid])[:, None]
+
+    before = days_to_race - numpy.arange(days_to_race, dtype=float)[None, :]
+    progress = (length - before + 1) / length
+    factor = numpy.select(
+        [shape == 0, shape == 1],
+        [numpy.broadcast_to(1.0 - reduction, progress.shape), 1.0 - reduction * progress],
+        (1.0 - reduction) ** progress)
+    offset = (before.astype(int) - 1) % 7
+    intense = numpy.zeros(progress.shape, dtype=bool)
+    for k, day in enumerate(INTENSITY_OFFSETS):
+        intense |= (intensity > k) & (offset == day)
+    weight = numpy.where(intense, INTENSITY_WEIGHT, 1.0)
+    weekly_weight = (7 + intensity * (INTENSITY_WEIGHT - 1)) / 7
+    return numpy.where(before > length, float(baseline), baseline * factor * weight / weekly_weight)
+
+
+def _evaluate_pure(plans: list, ctl: float, atl: float) -> list:
+    """(race CTL, race ATL, max ACWR, max ramp) per plan, compute_pmc() order."""
+    results = []
+    for plan in plans:
+        c, a = float(ctl), float(atl)
+        history = [c]
+        max_acwr = max_ramp = -math.inf
+        for i, tss in enumerate(plan):
+            c += (tss - c) / CTL_DAYS
+            a += (tss - a) / ATL_DAYS
+            history.append(c)
+            max_acwr = max(max_acwr, a / c if c > 0 else 0.0)
+            max_ramp = max(max_ramp, c - history[max(i - 6, 0)])
+        results.append((c, a, max_acwr, max_ramp))
+    return results
+
+
+def optimize_taper(ctl: float, atl: float, days_to_race: int, tsb_low: float = 5.0,
+                   tsb_high: float = 25.0, baseline: float = None,
+                   max_acwr: float = MAX_ACWR, max_ramp: float = MAX_RAMP) -> dict:
+    """
+    Search taper plans for the best race-day form.
+
+    `days_to_race` counts the training days left before race day; race-day
+    TSB is the CTL - ATL after the last of them. The target band is
+    tsb_low <= TSB < tsb_high, half-open like the TSB_STATUS bands
+    (default: FRESH, see tsb_range()).
+    `baseline` is the daily TSS before the taper (default: `ctl`).
+
+    Returns the winning candidate's parameters and "daily_tss", its
+    race-day "ctl", "atl", "tsb" and "tsb_status", "ctl_loss" (current
+    minus race-day CTL), the max ACWR and ramp over the plan,
+    "target_met", and how many candidates were "evaluated" and "feasible".
+    Raises ValueError when no candidate respects the ACWR/ramp limits.
+    """
+    if days_to_race < TAPER_LENGTHS[0]:
+        raise ValueError(f"Need at least {TAPER_LENGTHS[0]} days to the race")
+    if tsb_low >= tsb_high:
+        raise ValueError("tsb_low must be below tsb_high")
+    baseline = ctl if baseline is None else baseline
+    grid = candidate_grid(days_to_race)
+
+    numpy = _optional.numpy()
+    if numpy is not None:
+        plans = _taper_matrix(numpy, baseline, days_to_race, grid)
+        pmc = compute_pmc_matrix(plans, ctl, atl)
+        c, a = pmc["ctl"], pmc["atl"]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            acwr = numpy.where(c > 0, a / numpy.where(c > 0, c, 1.0), 0.0).max(axis=1)
+        earlier = numpy.concatenate([numpy.full((len(grid), 1), float(ctl)), c], axis=1)
+        lagged = earlier[:, numpy.maximum(numpy.arange(days_to_race) - 6, 0)]
+        ramp = (c - lagged).max(axis=1)
+        race_ctl, race_atl = c[:, -1], a[:, -1]
+    else:
+        plans = [taper_plan(baseline, days_to_race, *candidate) for candidate in grid]
+        race_ctl, race_atl, acwr, ramp = map(list, zip(*_evaluate_pure(plans, ctl, atl)))
+
+    best, best_key, feasible = None, None, 0
+    for i in range(len(grid)):
+        if acwr[i] > max_acwr or ramp[i] > max_ramp:
+            continue
+        feasible += 1
+        tsb = float(race_ctl[i] - race_atl[i])
+        outside = not tsb_low <= tsb < tsb_high
+        miss = max(tsb_low - tsb, tsb - tsb_high, 0.0)
+        key = (outside, miss, -float(race_ctl[i]))  # In the band first, then most CTL kept
+        if best_key is None or key < best_key:
+            best, best_key = i, key
+    if best is None:
+        raise ValueError(f"No taper keeps ACWR <= {max_acwr} and ramp <= {max_ramp}; "
+                         f"lower the baseline or relax the limits")
+
+    length, reduction, shape, intensity_days = grid[best]
+    race_ctl, race_atl = float(race_ctl[best]), float(race_atl[best])
+    tsb = race_ctl - race_atl
+    return {
+        "taper_days": length,
+        "reduction": reduction,
+        "shape": shape,
+        "intensity_days": intensity_days,
+        "daily_tss": [round(float(t), 1) for t in plans[best]],
+        "ctl": round(race_ctl, 1),
+        "atl": round(race_atl, 1),
+        "tsb": round(tsb, 1),
+        "tsb_status": get_tsb_status(tsb),
+        "ctl_loss": round(ctl - race_ctl, 1),
+        "max_acwr": round(float(acwr[best]), 2),
+        "max_ramp": round(float(ramp[best]), 1),
+        "target_met": not best_key[0],
+        "evaluated": len(grid),
+        "feasible": feasible,
+    }
+
+
+def print_result(result: dict, tsb_low: float, tsb_high: float, as_json: bool = False):
+    """Print the chosen taper."""
+    if as_json:
+        print(json.dumps(result, indent=2))
+        return
+
+    band = f"{tsb_low:g} to {tsb_high:g}".replace('-inf to', 'up to').replace('to inf', 'or more')
+    print(f"\n{'='*60}")
+    print(f"  Taper Plan - target TSB {band}")
+    print(f"{'='*60}\n")
+    print(f"  Taper:      {result['taper_days']} days, {result['shape']}, "
+          f"-{result['reduction']:.0%} volume, {result['intensity_days']} intensity day(s)/week")
+    print(f"  Race day:   CTL={result['ctl']} | ATL={result['atl']} | TSB={result['tsb']:+.1f} "
+          f"({result['tsb_status']['status']})")
+    print(f"  CTL loss:   {result['ctl_loss']}")
+    print(f"  Max ACWR:   {result['max_acwr']:.2f} | Max ramp: {result['max_ramp']:+.1f} CTL/week")
+    if not result['target_met']:
+        print("  ⚠️  No taper reaches the target band; this is the closest.")
+    print(f"\n  Daily TSS (to race eve): {', '.join(f'{t:.0f}' for t in result['daily_tss'])}")
+    print(f"\n  {result['feasible']} of {result['evaluated']} candidate tapers within limits\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find the taper that reaches a race-day TSB')
+    parser.add_argument('ctl', type=float, help='Current CTL (Chronic Training Load)')
+    parser.add_argument('atl', type=float, help='Current ATL (Acute Training Load)')
+    parser.add_argument('days_to_race', type=int, help='Training days left before race day')
+    parser.add_argument('--target-status', default='FRESH',
+                        help='TSB status band to reach (default: FRESH)')
+    parser.add_argument('--target-tsb', type=float,
+                        help='Target TSB instead of a status band (with --tolerance)')
+    parser.add_argument('--tolerance', type=float, default=5.0,
+                        help='Allowed distance from --target-tsb (default: 5)')
+    parser.add_argument('--baseline', type=float,
+                        help='Daily TSS before the taper (default: current CTL)')
+    parser.add_argument('--max-acwr', type=float, default=MAX_ACWR,
+                        help=f'Highest ACWR allowed on any day (default: {MAX_ACWR})')
+    parser.add_argument('--max-ramp', type=float, default=MAX_RAMP,
+                        help=f'Highest 7-day CTL ramp allowed (default: {MAX_RAMP})')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        if args.target_tsb is not None:
+            low, high = args.target_tsb - args.tolerance, args.target_tsb + args.tolerance
+        else:
+            low, high = tsb_range(args.target_status.upper())
+        result = optimize_taper(args.ctl, args.atl, args.days_to_race, low, high,
+                                args.baseline, args.max_acwr, args.max_ramp)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_result(result, low, high, args.json)
+
+
+if __name__ == '__main__':
+    main()
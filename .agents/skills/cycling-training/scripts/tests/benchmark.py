@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for analyze_week.py, calculate_tss.py and calculate_zones.py.
+
+Usage:
+    python tests/benchmark.py                          # JSON results to stdout
+    python tests/benchmark.py --output baseline.json
+    python tests/benchmark.py --compare baseline.json --max-slowdown 1.5
+    python tests/benchmark.py --filter calculate_tss --quick
+
+Every public function of the three scripts is timed with timeit on
+synthetic inputs at several sizes, plus the cold-start time of each CLI.
+Results are the best seconds-per-call over several repeats (the least
+noisy estimate). --compare exits with status 1 when any benchmark is more
+than --max-slowdown times slower than the stored baseline.
+
+Baselines are machine-specific: record one on the machine you compare on.
+Not collected by pytest (the file name does not match test_*.py).
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from contextlib import redirect_stdout
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import _optional
+import analyze_week
+import calculate_tss
+import calculate_zones
+
+MODULES = (analyze_week, calculate_tss, calculate_zones)
+
+# Public names without a benchmark of their own
+NOT_BENCHMARKED = {
+    'calculate_zones.ZoneModel',  # Plain record types, built by the functions
+    'analyze_week.Status',
+    'analyze_week.StatusTable',  # Timed via the tables' classify()/codes()
+    'analyze_week.WeekWarning',
+}
+
+CLI_COMMANDS = {
+    'analyze_week': ['450', '65', '72', '--daily-tss', '60,80,0,70,90,80,70', '--json'],
+    'calculate_tss': ['250', '230', '60', '--json'],
+    'calculate_zones': ['250', '--json'],
+    'cycling': ['week', '450', '65', '72'],
+}
+
+DEFAULT_MAX_SLOWDOWN = 1.5
+
+
+def _daily(n: int) -> list:
+    """Deterministic, varied daily TSS values."""
+    return [float((i * 37) % 11 * 15 + (i % 3) * 7) for i in range(n)]
+
+
+def _ride(n: int) -> list:
+    """Deterministic, varied 1 Hz power samples."""
+    return [float(150 + (i * 53) % 250) for i in range(n)]
+
+
+def _batch_jsonl(n: int) -> str:
+    """JSONL batch input with n weekly records."""
+    return ''.join(json.dumps({"id": i, "weekly_tss": 400 + i % 200, "ctl": 60 + i % 20,
+                               "atl": 55 + i % 40, "prev_week_tss": 380,
+                               "daily_tss": _daily(7)}) + '\n' for i in range(n))
+
+
+def _batch_csv(n: int) -> str:
+    """CSV batch input with n weekly records."""
+    rows = ['weekly_tss,ctl,atl,prev_week_tss,daily_tss']
+    rows += [f'{400 + i % 200},{60 + i % 20},{55 + i % 40},380,"60;80;0;70;90;80;70"' for i in range(n)]
+    return '\n'.join(rows) + '\n'
+
+
+def build_benchmarks(tmpdir: str) -> dict:
+    """
+    Map benchmark name -> zero-argument callable.
+
+    Names are "<module>.<function>[<size>]"; inputs are built here, once,
+    so only the call itself is timed.
+    """
+    aw, ct, cz = analyze_week, calculate_tss, calculate_zones
+    week = aw.analyze_week(450, 65, 72, prev_week_tss=400, daily_tss=_daily(7))
+    tiz = cz.time_in_zone(_ride(600), 250)
+    compact = aw.analyze_week_compact(450, 65, 72, prev_week_tss=400, daily_tss=_daily(7))
+
+    def rolling(days):
+        stream = aw.RollingMonotony()
+        for tss in days:
+            stream.add(tss)
+
+    benches = {
+        'analyze_week.calculate_tsb': lambda: aw.calculate_tsb(65.0, 72.0),
+        'analyze_week.calculate_acwr': lambda: aw.calculate_acwr(65.0, 72.0),
+        'analyze_week.estimate_ramp_rate': lambda: aw.estimate_ramp_rate(450.0, 65.0),
+        'analyze_week.get_acwr_status': lambda: aw.get_acwr_status(1.1),
+        'analyze_week.get_tsb_status': lambda: aw.get_tsb_status(-12.0),
+        'analyze_week.get_ramp_status': lambda: aw.get_ramp_status(4.0),
+        'analyze_week.get_monotony_status': lambda: aw.get_monotony_status(1.7),
+        'analyze_week.parse_daily_tss': lambda: aw.parse_daily_tss('60,80,0,70,90,80,70'),
+        'analyze_week.parse_batch_record': lambda: aw.parse_batch_record(
+            {"weekly_tss": "450", "ctl": "65", "atl": "72", "daily_tss": "60;80;0;70;90;80;70"}),
+        'analyze_week.analyze_week[basic]': lambda: aw.analyze_week(450, 65, 72),
+        'analyze_week.analyze_week[full]': lambda: aw.analyze_week(
+            450, 65, 72, prev_week_tss=400, daily_tss=[60, 80, 0, 70, 90, 80, 70]),
+        'analyze_week.analyze_week_compact[basic]': lambda: aw.analyze_week_compact(450, 65, 72),
+        'analyze_week.analyze_week_compact[full]': lambda: aw.analyze_week_compact(
+            450, 65, 72, prev_week_tss=400, daily_tss=[60, 80, 0, 70, 90, 80, 70]),
+        'analyze_week.WeekAnalysis[to_dict]': lambda: compact.to_dict(),
+        'analyze_week.print_result': lambda: aw.print_result(week),
+        'analyze_week.print_result[json]': lambda: aw.print_result(week, as_json=True),
+        'calculate_tss.calculate_tss': lambda: ct.calculate_tss(250, 230, 60),
+        'calculate_tss.print_result': lambda: ct.print_result(ct.calculate_tss(250, 230, 60)),
+        'calculate_zones.coggan_bounds': lambda: cz.coggan_bounds(250),
+        'calculate_zones.coggan_zones': lambda: cz.coggan_zones(250),
+        'calculate_zones.seiler_bounds': lambda: cz.seiler_bounds(250),
+        'calculate_zones.seiler_zones': lambda: cz.seiler_zones(250),
+        'calculate_zones.isf_bounds': lambda: cz.isf_bounds(250),
+        'calculate_zones.isf_zones': lambda: cz.isf_zones(250),
+        'calculate_zones.power_zone_bounds': lambda: cz.power_zone_bounds(250, 'coggan'),
+        'calculate_zones.lookup_table': lambda: cz.lookup_table(cz.coggan_bounds(250),
+                                                                cz.LOOKUP_MAX_WATTS + 1),
+        'calculate_zones.zone_model[hit]': lambda: cz.zone_model('coggan', 250),
+        'calculate_zones.zone_model[miss]': lambda: (cz.zone_model.cache_clear(),
+                                                     cz.zone_model('coggan', 250)),
+        'calculate_zones.hr_lthr_bounds': lambda: cz.hr_lthr_bounds(165),
+        'calculate_zones.hr_karvonen_bounds': lambda: cz.hr_karvonen_bounds(40, 50),
+        'calculate_zones.hr_zones_percent_lthr': lambda: cz.hr_zones_percent_lthr(165),
+        'calculate_zones.hr_zones_karvonen': lambda: cz.hr_zones_karvonen(165, 40, 50),
+        'calculate_zones.print_zones': lambda: cz.print_zones(cz.coggan_zones(250)),
+        'calculate_zones.print_zones[json]': lambda: cz.print_zones(cz.coggan_zones(250), True),
+        'calculate_zones.print_time_in_zone': lambda: cz.print_time_in_zone(tiz),
+    }
+
+    for n in (7, 28, 365):
+        daily = _daily(n)
+        benches[f'analyze_week.calculate_monotony_strain[{n}]'] = \
+            lambda d=daily: aw.calculate_monotony_strain(d)
+    for n in (365, 3650):
+        daily = _daily(n)
+        benches[f'analyze_week.rolling_monotony_strain[{n}]'] = \
+            lambda d=daily: aw.rolling_monotony_strain(d)
+        benches[f'analyze_week.RollingMonotony[{n}]'] = \
+            lambda d=daily: rolling(d)
+
+    for n in (365, 3650):
+        tsb = [(i * 7) % 90 - 50.0 for i in range(n)]
+        benches[f'analyze_week.StatusTable.codes[{n}]'] = lambda v=tsb: aw.TSB_STATUS.codes(v)
+        benches[f'analyze_week.StatusTable.classify[{n}]'] = \
+            lambda v=tsb: [aw.TSB_STATUS.classify(x) for x in v]
+
+    for athletes in (1, 50):
+        shape = (athletes, 365)
+        ctl = [[40.0 + (a * 3 + d) % 60 for d in range(365)] for a in range(athletes)]
+        atl = [[30.0 + (a * 5 + d * 7) % 90 for d in range(365)] for a in range(athletes)]
+        weekly = [[300.0 + (a + d * 11) % 600 for d in range(365)] for a in range(athletes)]
+        if _optional.numpy() is None:
+            ctl, atl, weekly = (sum(m, []) for m in (ctl, atl, weekly))
+        benches[f'analyze_week.calculate_load_batch[{shape[0]}x{shape[1]}]'] = \
+            lambda c=ctl, a=atl, w=weekly: aw.calculate_load_batch(c, a, w)
+
+    for n in (10, 1000):
+        jsonl, csv_text = _batch_jsonl(n), _batch_csv(n)
+        benches[f'analyze_week.read_batch_records[jsonl-{n}]'] = \
+            lambda t=jsonl: sum(1 for _ in aw.read_batch_records(io.StringIO(t)))
+        benches[f'analyze_week.read_batch_records[csv-{n}]'] = \
+            lambda t=csv_text: sum(1 for _ in aw.read_batch_records(io.StringIO(t), 'csv'))
+        benches[f'analyze_week.run_batch[{n}]'] = \
+            lambda t=jsonl: aw.run_batch(io.StringIO(t), io.StringIO())
+
+    for n in (3600, 18000):
+        ride = _ride(n)
+        path = os.path.join(tmpdir, f'ride-{n}.csv')
+        with open(path, 'w') as f:
+            f.write('power\n' + '\n'.join(f'{w:g}' for w in ride) + '\n')
+        benches[f'calculate_tss.NormalizedPowerStream[{n}]'] = \
+            lambda r=ride: ct.NormalizedPowerStream().extend(r)
+        benches[f'calculate_tss.normalized_power[{n}]'] = \
+            lambda r=ride: ct.normalized_power(r)
+        benches[f'calculate_tss.calculate_tss_from_stream[{n}]'] = \
+            lambda r=ride: ct.calculate_tss_from_stream(250, r)
+        benches[f'calculate_tss.read_power_samples[{n}]'] = \
+            lambda p=path: sum(1 for _ in ct.read_power_samples(p))
+        lines = ['power'] + [f'{w:g}' for w in ride]
+        benches[f'calculate_tss.parse_power_lines[{n}]'] = \
+            lambda l=lines: sum(1 for _ in ct.parse_power_lines(l))
+        for model in ('coggan', 'seiler', 'isf'):
+            benches[f'calculate_zones.time_in_zone[{model}-{n}]'] = \
+                lambda r=ride, m=model: cz.time_in_zone(r, 250, m)
+
+    for n in (1, 100, 10000):
+        ftp = [200 + i % 100 for i in range(n)]
+        np_values = [150 + i % 150 for i in range(n)]
+        minutes = [30 + i % 240 for i in range(n)]
+        benches[f'calculate_tss.calculate_tss_batch[{n}]'] = \
+            lambda f=ftp, p=np_values, d=minutes: ct.calculate_tss_batch(f, p, d)
+
+    return benches
+
+
+def time_call(func, min_time: float = 0.05, repeat: int = 5) -> float:
+    """Best seconds per call of func() over `repeat` timing runs."""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / elapsed) if elapsed else number * 10)
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        best = min(best, timer.timeit(number) / number)
+    return best
+
+
+def time_cold_start(module: str, repeat: int = 5) -> float:
+    """Best wall-clock seconds for one CLI invocation in a fresh interpreter."""
+    command = [sys.executable, str(SCRIPTS_DIR / f'{module}.py')] + CLI_COMMANDS[module]
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def public_names() -> set:
+    """'module.name' for every public function or class defined in the scripts."""
+    names = set()
+    for module in MODULES:
+        for name, obj in vars(module).items():
+            if (not name.startswith('_') and callable(obj)
+                    and getattr(obj, '__module__', None) == module.__name__):
+                names.add(f'{module.__name__}.{name}')
+    return names
+
+
+def uncovered(benchmark_names) -> set:
+    """Public names with no benchmark (main()/run() are covered by cold start)."""
+    covered = {name.split('[')[0] for name in benchmark_names}
+    covered |= {f'{module}.{name}' for module in CLI_COMMANDS for name in ('main', 'run')}
+    return public_names() - covered - NOT_BENCHMARKED
+
+
+def run(name_filter: str = None, quick: bool = False, cold_start: bool = True) -> dict:
+    """Run the benchmarks; returns the JSON-serializable results document."""
+    min_time, repeat = (0.01, 3) if quick else (0.05, 5)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        benches = build_benchmarks(tmpdir)
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            for name, func in benches.items():
+                if name_filter and name_filter not in name:
+                    continue
+                results[name] = time_call(func, min_time, repeat)
+
+    if cold_start:
+        for module in CLI_COMMANDS:
+            name = f'{module}.main[cold-start]'
+            if not name_filter or name_filter in name:
+                results[name] = time_cold_start(module, repeat)
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": _optional.numpy() is not None,
+        "unit": "seconds per call",
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, max_slowdown: float = DEFAULT_MAX_SLOWDOWN) -> dict:
+    """
+    Compare two results documents.
+
+    Returns {"ratios": {name: current/baseline}, "regressions": [names over
+    max_slowdown], "missing": [baseline names not in current]}. Only names
+    present in both are compared.
+    """
+    ratios = {}
+    for name, seconds in current["results"].items():
+        base = baseline["results"].get(name)
+        if base:
+            ratios[name] = seconds / base
+    return {
+        "ratios": ratios,
+        "regressions": sorted(name for name, ratio in ratios.items() if ratio > max_slowdown),
+        "missing": sorted(set(baseline["results"]) - set(current["results"])),
+    }
+
+
+def print_comparison(report: dict, max_slowdown: float) -> None:
+    """Print the ratio table with regressions flagged."""
+    for name, ratio in sorted(report["ratios"].items()):
+        flag = '  SLOWER' if ratio > max_slowdown else ''
+        print(f"  {name:60} {ratio:6.2f}x{flag}", file=sys.stderr)
+    if report["missing"]:
+        print(f"  Not run (in baseline): {', '.join(report['missing'])}", file=sys.stderr)
+    if report["regressions"]:
+        print(f"\n  {len(report['regressions'])} benchmark(s) over {max_slowdown}x the baseline",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cycling-training scripts')
+    parser.add_argument('--output', metavar='FILE', help='Write results JSON to FILE (default: stdout)')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a stored results JSON')
+    parser.add_argument('--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help=f'Slowdown ratio that fails --compare (default: {DEFAULT_MAX_SLOWDOWN})')
+    parser.add_argument('--filter', metavar='TEXT', help='Only run benchmarks whose name contains TEXT')
+    parser.add_argument('--quick', action='store_true', help='Shorter timing runs (noisier)')
+    parser.add_argument('--no-cold-start', action='store_true', help='Skip CLI cold-start timing')
+
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(2)
+
+    document = run(args.filter, args.quick, not args.no_cold_start)
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if baseline is not None:
+        if baseline.get("numpy") != document["numpy"]:
+            print("  Warning: NumPy availability differs from the baseline", file=sys.stderr)
+        report = compare(document, baseline, args.max_slowdown)
+        print_comparison(report, args.max_slowdown)
+        if report["regressions"]:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
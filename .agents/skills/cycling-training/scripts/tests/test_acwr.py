@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for acwr.py - rolling and EWMA ACWR series.
+
+Prefix-sum results are checked against windows summed directly, and the
+roster matrix against the per-athlete series.
+"""
+
+import math
+import random
+import sys
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from acwr import VARIANTS, acwr_history, acwr_matrix, ewma_acwr, rolling_acwr
+from analyze_week import ACWR_STATUS, get_acwr_status
+
+START = date(2026, 1, 1)
+random.seed(11)
+DAILY = [random.choice([0, 0, 45, 70, 95, 140, 250]) for _ in range(200)]
+
+
+class TestRollingAcwr(unittest.TestCase):
+    """Test the prefix-sum rolling variants."""
+
+    def test_coupled_matches_windows(self):
+        """Coupled ACWR is the 7-day mean over the 28-day mean."""
+        ratios = rolling_acwr(DAILY)
+        for i in range(27, len(DAILY)):
+            expected = (sum(DAILY[i - 6:i + 1]) / 7) / (sum(DAILY[i - 27:i + 1]) / 28)
+            self.assertAlmostEqual(ratios[i], expected, places=9)
+
+    def test_uncoupled_matches_windows(self):
+        """Uncoupled ACWR excludes the acute week from the chronic mean."""
+        ratios = rolling_acwr(DAILY, coupled=False)
+        for i in range(27, len(DAILY)):
+            expected = (sum(DAILY[i - 6:i + 1]) / 7) / (sum(DAILY[i - 27:i - 6]) / 21)
+            self.assertAlmostEqual(ratios[i], expected, places=9)
+
+    def test_undefined_until_full_window(self):
+        """Days before a full chronic window are None."""
+        ratios = rolling_acwr(DAILY[:30], acute_days=3, chronic_days=10)
+        self.assertEqual(ratios[:9], [None] * 9)
+        self.assertIsNotNone(ratios[9])
+        self.assertEqual(rolling_acwr([50] * 5), [None] * 5)
+
+    def test_zero_chronic_load(self):
+        """A chronic mean of 0 gives 0.0, like calculate_acwr()."""
+        self.assertEqual(rolling_acwr([0] * 28)[-1], 0.0)
+
+    def test_uniform_load(self):
+        """Constant training is 1.0 in every variant once defined."""
+        self.assertEqual(rolling_acwr([80] * 40)[-1], 1.0)
+        self.assertEqual(rolling_acwr([80] * 40, coupled=False)[-1], 1.0)
+        self.assertAlmostEqual(ewma_acwr([80] * 40, acute=80, chronic=80)[-1], 1.0)
+
+    def test_invalid_windows(self):
+        """The chronic window must be longer than the acute one."""
+        for acute, chronic in ((0, 28), (7, 7)):
+            with self.subTest(acute=acute, chronic=chronic), self.assertRaises(ValueError):
+                rolling_acwr(DAILY, acute, chronic)
+
+
+class TestEwmaAcwr(unittest.TestCase):
+    """Test the EWMA variant."""
+
+    def test_matches_recurrence(self):
+        """Loads decay by 2 / (N + 1) from the seeds."""
+        ratios = ewma_acwr(DAILY[:3], acute=40, chronic=50)
+        acute, chronic = 40.0, 50.0
+        for tss, ratio in zip(DAILY, ratios):
+            acute = 0.25 * tss + 0.75 * acute
+            chronic = 2 / 29 * tss + 27 / 29 * chronic
+            self.assertAlmostEqual(ratio, acute / chronic)
+
+
+class TestAcwrHistory(unittest.TestCase):
+    """Test the dated history interface."""
+
+    def test_statuses(self):
+        """Every defined ratio carries its get_acwr_status() Status."""
+        history = [(START + timedelta(days=i), tss) for i, tss in enumerate(DAILY)]
+        series = acwr_history(history)
+        self.assertEqual(series["dates"][-1], START + timedelta(days=len(DAILY) - 1))
+        for variant in VARIANTS:
+            for ratio, status in zip(series[variant], series[f"{variant}_status"]):
+                self.assertIs(status, None if ratio is None else get_acwr_status(ratio))
+
+    def test_gaps_are_rest_days(self):
+        """Missing dates count as 0 TSS."""
+        series = acwr_history({"2026-01-01": 100, "2026-01-31": 100})
+        self.assertEqual(len(series["dates"]), 31)
+        self.assertEqual(series["coupled"][-1], 4.0)
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestAcwrMatrix(unittest.TestCase):
+    """Test the roster matrix against the per-athlete series."""
+
+    def test_rows_match_single_series(self):
+        """Each row matches acwr_history() on that athlete."""
+        rows = [DAILY, DAILY[::-1], [0] * 100 + DAILY[:100]]
+        matrix = acwr_matrix(rows, acute=[0, 30, 60], chronic=40)
+        for a, row in enumerate(rows):
+            series = acwr_history(dict(zip((START + timedelta(days=i) for i in range(200)), row)),
+                                  acute=30 * a, chronic=40)
+            for variant in VARIANTS:
+                for day in (0, 26, 27, 120, 199):
+                    expected = series[variant][day]
+                    actual = float(matrix[variant][a, day])
+                    with self.subTest(athlete=a, variant=variant, day=day):
+                        if expected is None:
+                            self.assertTrue(math.isnan(actual))
+                        else:
+                            self.assertAlmostEqual(actual, expected, places=9)
+                            self.assertEqual(ACWR_STATUS.statuses[ACWR_STATUS.code(actual)],
+                                             series[f"{variant}_status"][day])
+
+    def test_short_history(self):
+        """Fewer days than the chronic window are all NaN for rolling ratios."""
+        matrix = acwr_matrix([[50] * 10])
+        self.assertTrue(all(math.isnan(v) for v in matrix["coupled"][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,24 +6,43 @@ Verifies TSB, ACWR, Monotony/Strain calculations, status interpretations,
 and the full analyze_week() function including warnings.
 """
 
+import argparse
+import io
+import json
+import pickle
 import sys
 import math
 import unittest
+from contextlib import redirect_stdout
 from pathlib import Path
+from unittest import mock
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import _optional
 from analyze_week import (
     calculate_tsb,
     calculate_acwr,
+    calculate_load_batch,
     calculate_monotony_strain,
+    rolling_monotony_strain,
+    RollingMonotony,
     estimate_ramp_rate,
     get_acwr_status,
     get_tsb_status,
     get_ramp_status,
     get_monotony_status,
-    analyze_week
+    analyze_week,
+    analyze_week_compact,
+    ACWR_STATUS,
+    RAMP_STATUS,
+    TSB_STATUS,
+    Status,
+    WeekAnalysis,
+    parse_batch_record,
+    run,
+    run_batch,
 )
 
 
@@ -205,6 +224,51 @@ class TestCalculateMonotonyStrain(unittest.TestCase):
         self.assertAlmostEqual(result['mean_daily'], expected_mean, places=1)
 
 
+class TestRollingMonotonyStrain(unittest.TestCase):
+    """Test the rolling 7-day monotony/strain series."""
+
+    HISTORY = [((i * 37) % 11) * 15 + (i % 3) * 7 for i in range(1500)]
+
+    def test_matches_windowed_recompute(self):
+        """Every day matches calculate_monotony_strain() on its window."""
+        series = rolling_monotony_strain(self.HISTORY)
+        self.assertEqual(len(series['monotony']), len(self.HISTORY))
+        for i in range(len(self.HISTORY)):
+            expected = calculate_monotony_strain(self.HISTORY[max(0, i - 6):i + 1])
+            if expected['monotony'] is None or math.isinf(expected['monotony']):
+                self.assertEqual(series['monotony'][i], expected['monotony'])
+                self.assertEqual(series['strain'][i], expected['strain'])
+            else:
+                self.assertAlmostEqual(series['monotony'][i], expected['monotony'], delta=0.011)
+                self.assertAlmostEqual(series['strain'][i], expected['strain'], delta=1.01)
+
+    def test_fewer_than_three_days(self):
+        """The first two days have no monotony."""
+        series = rolling_monotony_strain([60, 80, 40])
+        self.assertEqual(series['monotony'][:2], [None, None])
+        self.assertIsNotNone(series['monotony'][2])
+
+    def test_uniform_window_is_inf(self):
+        """A uniform window after varied days still reports inf."""
+        series = rolling_monotony_strain([300, 0, 150] + [70] * 7)
+        self.assertEqual(series['monotony'][-1], float('inf'))
+        self.assertEqual(series['strain'][-1], float('inf'))
+        self.assertNotEqual(series['monotony'][-2], float('inf'))
+
+    def test_stream_value_shape(self):
+        """RollingMonotony.value() has the calculate_monotony_strain() shape."""
+        rolling = RollingMonotony()
+        self.assertIn('error', rolling.add(60))
+        for tss in [80, 0, 70, 90, 80, None]:
+            result = rolling.add(tss)
+        self.assertEqual(result, calculate_monotony_strain([60, 80, 0, 70, 90, 80, 0]))
+
+    def test_invalid_window(self):
+        """Window must be at least one day."""
+        with self.assertRaises(ValueError):
+            RollingMonotony(0)
+
+
 class TestEstimateRampRate(unittest.TestCase):
     """Test ramp rate estimation."""
 
@@ -417,6 +481,155 @@ class TestGetRampStatus(unittest.TestCase):
         self.assertEqual(status['status'], 'CONSERVATIVE')
 
 
+class TestStatusTables(unittest.TestCase):
+    """Test table-driven classification and shared Status objects."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_shared_objects(self):
+        """Each classification returns the table's own Status object."""
+        self.assertIs(get_tsb_status(-12), get_tsb_status(-20))
+        self.assertIs(get_tsb_status(-12), TSB_STATUS.statuses[1])
+
+    def test_read_only(self):
+        """Shared statuses cannot be modified."""
+        status = get_acwr_status(1.0)
+        with self.assertRaises(TypeError):
+            status['status'] = 'CHANGED'
+        with self.assertRaises(TypeError):
+            status.update(color='red')
+        self.assertEqual(get_acwr_status(1.0)['status'], 'OPTIMAL')
+
+    def test_dict_compatible(self):
+        """Statuses compare, serialize and pickle like plain dicts."""
+        status = get_ramp_status(4)
+        self.assertIsInstance(status, Status)
+        self.assertEqual(status, {"status": "MODERATE", "color": "green",
+                                  "recommendation": "Standard progression - sustainable long-term"})
+        self.assertEqual(json.loads(json.dumps(status)), status)
+        self.assertEqual(pickle.loads(pickle.dumps(status)), status)
+        self.assertEqual(status.to_dict(), dict(status))
+
+    def test_inclusive_and_exclusive_bounds(self):
+        """'<' and '<=' bounds are honoured exactly at the threshold."""
+        self.assertEqual(ACWR_STATUS.classify(0.8)['status'], 'OPTIMAL')     # acwr < 0.8
+        self.assertEqual(ACWR_STATUS.classify(1.3)['status'], 'OPTIMAL')     # acwr <= 1.3
+        self.assertEqual(RAMP_STATUS.classify(3)['status'], 'MODERATE')      # ramp < 3
+        self.assertEqual(RAMP_STATUS.classify(8)['status'], 'AGGRESSIVE')    # ramp <= 8
+
+    def test_nan_takes_last_status(self):
+        """NaN fails every comparison, as in the old if/elif chains."""
+        self.assertEqual(get_tsb_status(float('nan'))['status'], 'VERY_FRESH')
+        self.assertEqual(get_acwr_status(float('nan'))['status'], 'DANGER')
+
+    def test_codes_match_classify(self):
+        """Vectorized codes agree with scalar classification."""
+        values = [-40, -30, -10.5, -10, 0, 5, 24.9, 25, 60, float('nan'), float('inf')]
+        for table in (TSB_STATUS, ACWR_STATUS, RAMP_STATUS):
+            with self.subTest(table=table.statuses[-1]['status']):
+                codes = table.codes(values)
+                self.assertEqual([table.statuses[c] for c in codes],
+                                 [table.classify(v) for v in values])
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestStatusTablesNumPy(TestStatusTables):
+    """Same classification tests on the NumPy path."""
+
+    def setUp(self):
+        pass
+
+
+class TestLoadBatch(unittest.TestCase):
+    """Test array-level TSB/ACWR/ramp against the scalar functions."""
+
+    CTL = [65, 0, -5, 80.5, 42.3, 60, 20]
+    ATL = [72, 50, 30, 60.2, 99.9, 60, 26]
+    WEEKLY = [450, 300, 0, 700, 1050, 385, 161]
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def filled(column):
+        """Masked arrays (NumPy path) with masked days as 0.0."""
+        return column.filled() if hasattr(column, 'filled') else column
+
+    def test_matches_scalar_functions(self):
+        """Every element equals the scalar result exactly."""
+        result = calculate_load_batch(self.CTL, self.ATL, self.WEEKLY)
+        acwr = self.filled(result['acwr'])
+        for i, (ctl, atl, weekly) in enumerate(zip(self.CTL, self.ATL, self.WEEKLY)):
+            self.assertEqual(result['tsb'][i], calculate_tsb(ctl, atl))
+            self.assertEqual(acwr[i], calculate_acwr(ctl, atl))
+            self.assertEqual(result['ramp_rate'][i], estimate_ramp_rate(weekly, ctl))
+
+    def test_status_codes(self):
+        """Status codes index the tables and match get_*_status()."""
+        result = calculate_load_batch(self.CTL, self.ATL, self.WEEKLY)
+        for i, (ctl, atl, weekly) in enumerate(zip(self.CTL, self.ATL, self.WEEKLY)):
+            self.assertIs(TSB_STATUS.statuses[result['tsb_status'][i]],
+                          get_tsb_status(calculate_tsb(ctl, atl)))
+            self.assertIs(ACWR_STATUS.statuses[result['acwr_status'][i]],
+                          get_acwr_status(calculate_acwr(ctl, atl)))
+            self.assertIs(RAMP_STATUS.statuses[result['ramp_status'][i]],
+                          get_ramp_status(estimate_ramp_rate(weekly, ctl)))
+
+    def test_acwr_masked_where_ctl_not_positive(self):
+        """ctl <= 0 is flagged in acwr_mask and ACWR reads 0.0 there."""
+        result = calculate_load_batch(self.CTL, self.ATL)
+        self.assertEqual([bool(m) for m in result['acwr_mask']],
+                         [False, True, True, False, False, False, False])
+        self.assertEqual(self.filled(result['acwr'])[1], 0.0)
+        self.assertNotIn('ramp_rate', result)
+
+    def test_scalar_broadcast(self):
+        """Scalars broadcast against sequences."""
+        result = calculate_load_batch(60, [50, 60, 70])
+        self.assertEqual(list(result['tsb']), [10, 0, -10])
+
+    def test_length_mismatch(self):
+        """Sequences of different lengths are rejected."""
+        with self.assertRaises(ValueError):
+            calculate_load_batch([60, 70], [50, 60, 70])
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestLoadBatchNumPy(TestLoadBatch):
+    """Same load-batch tests on the NumPy path, plus 2-D input."""
+
+    def setUp(self):
+        pass
+
+    def test_length_mismatch(self):
+        """Shapes that cannot broadcast are rejected."""
+        with self.assertRaises(ValueError):
+            calculate_load_batch([60, 70], [50, 60, 70])
+
+    def test_matrix_and_masked_mean(self):
+        """A roster x days matrix keeps its shape; masked days drop out of means."""
+        numpy = _optional.numpy()
+        ctl = numpy.array([[60.0, 0.0], [80.0, 40.0]])
+        atl = numpy.array([[66.0, 30.0], [80.0, 60.0]])
+        result = calculate_load_batch(ctl, atl, ctl * 7)
+        self.assertEqual(result['tsb'].shape, (2, 2))
+        self.assertAlmostEqual(float(result['acwr'].mean()), (1.1 + 1.0 + 1.5) / 3)
+        self.assertEqual(float(result['acwr'].filled()[0, 1]), 0.0)
+
+    def test_ramp_ties_round_like_python(self):
+        """Half-way ramp values round exactly as round(x, 1) does."""
+        numpy = _optional.numpy()
+        weekly = numpy.arange(0, 3000, 1.0)
+        result = calculate_load_batch(55.0, 50.0, weekly)
+        self.assertEqual(result['ramp_rate'].tolist(),
+                         [estimate_ramp_rate(w, 55.0) for w in weekly.tolist()])
+
+
 class TestGetMonotonyStatus(unittest.TestCase):
     """Test monotony status interpretation based on Foster 1998."""
 
@@ -684,6 +897,47 @@ class TestAnalyzeWeekEdgeCases(unittest.TestCase):
         self.assertIn('strain', result['metrics'])
 
 
+class TestCompactResult(unittest.TestCase):
+    """Test the slotted WeekAnalysis result type."""
+
+    def test_to_dict_matches_analyze_week(self):
+        """to_dict() gives exactly the analyze_week() dict, key order included."""
+        cases = [
+            (450, 65, 72, None, None),
+            (450, 65, 72, 300, [60, 80, 0, 70, 90, 80, 70]),
+            (900, 40, 110, 400, [70] * 7),
+            (300, 0, 50, 0, [60, 80]),
+        ]
+        for args in cases:
+            with self.subTest(args=args):
+                compact = analyze_week_compact(*args)
+                self.assertIsInstance(compact, WeekAnalysis)
+                self.assertEqual(json.dumps(compact.to_dict()), json.dumps(analyze_week(*args)))
+
+    def test_optional_metrics_absent(self):
+        """Without prev week or daily TSS those keys are left out."""
+        result = analyze_week_compact(450, 65, 72)
+        self.assertIsNone(result.week_over_week_change)
+        self.assertIsNone(result.monotony_status)
+        self.assertNotIn('monotony', result.to_dict()['status'])
+
+    def test_statuses_shared(self):
+        """Equal statuses are the same object across results."""
+        a = analyze_week_compact(450, 65, 72, daily_tss=[60, 80, 0, 70, 90, 80, 70])
+        b = analyze_week_compact(460, 66, 73, daily_tss=[50, 80, 0, 60, 90, 70, 70])
+        self.assertIs(a.tsb_status, b.tsb_status)
+        self.assertIs(a.monotony_status, b.monotony_status)
+
+    def test_immutable(self):
+        """Result objects cannot be modified or grow attributes."""
+        result = analyze_week_compact(450, 65, 72)
+        with self.assertRaises(AttributeError):
+            result.ctl = 70
+        with self.assertRaises(AttributeError):
+            result.tsb_status.extra = 1
+        self.assertIsInstance(result.warnings, tuple)
+
+
 class TestWarningStructure(unittest.TestCase):
     """Test the structure of warning objects."""
 
@@ -727,5 +981,84 @@ class TestStatusStructure(unittest.TestCase):
             self.assertIn(result['status'][key]['color'], valid_colors)
 
 
+class TestBatchMode(unittest.TestCase):
+    """Test streaming batch analysis over JSONL and CSV records."""
+
+    def run_batch(self, text: str, fmt: str = 'jsonl') -> tuple:
+        out = io.StringIO()
+        errors = run_batch(io.StringIO(text), out, fmt)
+        return errors, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_jsonl_matches_analyze_week(self):
+        """Each JSONL record yields exactly the analyze_week() result."""
+        errors, results = self.run_batch(
+            '{"weekly_tss": 450, "ctl": 65, "atl": 72, "prev_week_tss": 400, '
+            '"daily_tss": [60, 80, 0, 70, 90, 80, 70]}\n'
+            '{"weekly_tss": 700, "ctl": 60, "atl": 100}\n')
+        self.assertEqual(errors, 0)
+        expected = [
+            analyze_week(450, 65, 72, 400, [60, 80, 0, 70, 90, 80, 70]),
+            analyze_week(700, 60, 100),
+        ]
+        self.assertEqual(results, json.loads(json.dumps(expected)))
+
+    def test_csv_records(self):
+        """CSV rows with quoted daily TSS and blank optional fields."""
+        errors, results = self.run_batch(
+            'weekly_tss,ctl,atl,prev_week_tss,daily_tss\n'
+            '450,65,72,,"60,80,0,70,90,80,70"\n'
+            '490,70,72,400,\n', fmt='csv')
+        self.assertEqual(errors, 0)
+        self.assertEqual(len(results), 2)
+        self.assertIn('monotony', results[0]['metrics'])
+        self.assertNotIn('week_over_week_change', results[0]['metrics'])
+        self.assertEqual(results[1]['metrics']['week_over_week_change'], 22.5)
+
+    def test_id_is_echoed(self):
+        """An id field is passed through to the result."""
+        _, results = self.run_batch('{"id": "rider-7", "weekly_tss": 450, "ctl": 65, "atl": 72}\n')
+        self.assertEqual(results[0]['id'], 'rider-7')
+
+    def test_bad_records_reported_and_skipped(self):
+        """Invalid lines produce error objects; later records still run."""
+        errors, results = self.run_batch(
+            'not json\n'
+            '{"weekly_tss": 450, "ctl": 65}\n'
+            '\n'
+            '{"weekly_tss": 450, "ctl": 65, "atl": 72}\n')
+        self.assertEqual(errors, 2)
+        self.assertEqual(results[0]['line'], 1)
+        self.assertIn("atl", results[1]['error'])
+        self.assertIn('metrics', results[2])
+
+    def test_parallel_workers_preserve_order(self):
+        """A process pool with small chunks produces identical, ordered output."""
+        lines = ''.join(
+            json.dumps({"id": i, "weekly_tss": 300 + i * 7, "ctl": 40 + i % 30, "atl": 50 + i % 45,
+                        "daily_tss": [i % 90, 50, 0, 70, 90, 80, 60]}) + '\n'
+            for i in range(50)) + 'oops\n'
+        serial, parallel = io.StringIO(), io.StringIO()
+        self.assertEqual(run_batch(io.StringIO(lines), serial), 1)
+        self.assertEqual(run_batch(io.StringIO(lines), parallel, workers=2, chunk_size=7), 1)
+        self.assertEqual(parallel.getvalue(), serial.getvalue())
+        self.assertEqual([json.loads(l).get('id') for l in parallel.getvalue().splitlines()[:50]],
+                         list(range(50)))
+
+    def test_stdin_left_open(self):
+        """'--batch -' reads stdin without closing it."""
+        stdin, out = io.StringIO('{"weekly_tss": 450, "ctl": 65, "atl": 72}\n'), io.StringIO()
+        args = argparse.Namespace(batch='-', format=None, workers=1, chunk_size=1000)
+        with mock.patch('sys.stdin', stdin), redirect_stdout(out):
+            run(args)
+        self.assertFalse(stdin.closed)
+        self.assertIn('metrics', json.loads(out.getvalue()))
+
+    def test_parse_semicolon_daily_tss(self):
+        """Daily TSS strings may use semicolons."""
+        kwargs = parse_batch_record({'weekly_tss': '450', 'ctl': '65', 'atl': '72',
+                                     'daily_tss': '60;80;0'})
+        self.assertEqual(kwargs['daily_tss'], [60.0, 80.0, 0.0])
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
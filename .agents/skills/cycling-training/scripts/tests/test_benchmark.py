@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for tests/benchmark.py - the performance benchmark harness.
+
+Verifies that every public function is benchmarked, that results are
+JSON-serializable, and the baseline comparison logic.
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add this directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import benchmark
+
+
+def document(results: dict) -> dict:
+    return {"numpy": False, "results": results}
+
+
+class TestCoverage(unittest.TestCase):
+    """Test benchmark coverage of the public API."""
+
+    def test_every_public_function_benchmarked(self):
+        """New public functions must get a benchmark."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            names = benchmark.build_benchmarks(tmpdir)
+        self.assertEqual(benchmark.uncovered(names), set())
+
+    def test_names_include_module(self):
+        """Benchmark names are '<module>.<function>[size]'."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            names = benchmark.build_benchmarks(tmpdir)
+        modules = {m.__name__ for m in benchmark.MODULES}
+        for name in names:
+            self.assertIn(name.split('.')[0], modules)
+
+
+class TestRun(unittest.TestCase):
+    """Test a short benchmark run."""
+
+    def test_filtered_run_is_json(self):
+        """Results are seconds per call, serializable as JSON."""
+        result = benchmark.run('calculate_tsb', quick=True, cold_start=False)
+        self.assertEqual(list(result["results"]), ['analyze_week.calculate_tsb'])
+        self.assertGreater(result["results"]['analyze_week.calculate_tsb'], 0)
+        self.assertEqual(json.loads(json.dumps(result)), result)
+
+
+class TestCompare(unittest.TestCase):
+    """Test baseline comparison."""
+
+    def test_within_threshold(self):
+        """Ratios at or under max_slowdown pass."""
+        report = benchmark.compare(document({"a": 1.4, "b": 0.5}), document({"a": 1.0, "b": 1.0}), 1.5)
+        self.assertEqual(report["regressions"], [])
+        self.assertAlmostEqual(report["ratios"]["a"], 1.4)
+
+    def test_regression_detected(self):
+        """Ratios over max_slowdown are reported."""
+        report = benchmark.compare(document({"a": 10.0, "b": 1.0}), document({"a": 1.0, "b": 1.0}), 1.5)
+        self.assertEqual(report["regressions"], ["a"])
+
+    def test_missing_and_new_names(self):
+        """Only shared names are compared; baseline-only names are listed."""
+        report = benchmark.compare(document({"new": 1.0}), document({"old": 1.0}))
+        self.assertEqual(report["ratios"], {})
+        self.assertEqual(report["missing"], ["old"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,14 +5,38 @@ Tests for calculate_tss.py - Training Stress Score calculations.
 Verifies TSS formula, intensity factor, zone estimation, and recovery time.
 """
 
+import io
+import json
 import sys
+import tempfile
 import unittest
+from array import array
+from contextlib import redirect_stdout
 from pathlib import Path
+from unittest import mock
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from calculate_tss import calculate_tss
+import _optional
+from calculate_tss import (
+    IF_ZONE_LABELS,
+    calculate_tss,
+    calculate_tss_batch,
+    calculate_tss_from_stream,
+    main,
+    normalized_power,
+    read_power_samples,
+    NormalizedPowerStream,
+)
+from power_stream import write_stream
+
+
+def naive_normalized_power(samples: list, window: int = 30) -> float:
+    """Reference NP: recompute every 30-sample rolling mean from scratch."""
+    rolling = [sum(samples[i - window + 1:i + 1]) / window
+               for i in range(window - 1, len(samples))]
+    return (sum(r ** 4 for r in rolling) / len(rolling)) ** 0.25
 
 
 class TestTSSFormula(unittest.TestCase):
@@ -334,5 +358,228 @@ class TestEdgeCases(unittest.TestCase):
         self.assertEqual(result['estimated_zone'], "Z6+ Anaerobic")
 
 
+class TestNormalizedPowerStream(unittest.TestCase):
+    """Test the streaming Normalized Power engine."""
+
+    def test_constant_power_np_equals_power(self):
+        """Steady power: NP equals average power."""
+        self.assertAlmostEqual(normalized_power([200] * 600), 200.0)
+
+    def test_matches_naive_rolling_computation(self):
+        """Ring-buffer NP matches a from-scratch rolling-mean computation."""
+        samples = [(i * 37) % 400 for i in range(1800)]
+        self.assertAlmostEqual(normalized_power(samples),
+                               naive_normalized_power(samples), places=6)
+
+    def test_variable_power_np_above_average(self):
+        """Intervals push NP above average power."""
+        samples = ([350] * 60 + [100] * 60) * 30
+        stream = NormalizedPowerStream().extend(samples)
+        self.assertGreater(stream.normalized_power, stream.average_power)
+
+    def test_sample_rate_scales_window(self):
+        """At 2 Hz the rolling window spans 60 samples, not 30."""
+        samples = [(i * 37) % 400 for i in range(1200)]
+        self.assertAlmostEqual(normalized_power(samples, sample_rate_hz=2),
+                               naive_normalized_power(samples, window=60), places=6)
+
+    def test_short_stream_falls_back_to_average(self):
+        """Streams shorter than the window report average power."""
+        self.assertAlmostEqual(normalized_power([100, 200, 300]), 200.0)
+
+    def test_dropouts_count_as_zero(self):
+        """None samples are treated as 0 W."""
+        stream = NormalizedPowerStream().extend([200, None, 200, None])
+        self.assertEqual(stream.count, 4)
+        self.assertEqual(stream.average_power, 100.0)
+
+    def test_accepts_generators(self):
+        """Any iterable works, including one-shot generators."""
+        self.assertAlmostEqual(normalized_power(200 for _ in range(120)), 200.0)
+
+    def test_invalid_sample_rate(self):
+        """Non-positive sample rates are rejected."""
+        with self.assertRaises(ValueError):
+            NormalizedPowerStream(sample_rate_hz=0)
+
+
+class TestCalculateTSSFromStream(unittest.TestCase):
+    """Test TSS computed directly from power samples."""
+
+    def test_one_hour_at_ftp_is_100_tss(self):
+        """3600 samples at FTP = 100 TSS."""
+        result = calculate_tss_from_stream(250, [250] * 3600)
+        self.assertEqual(result['tss'], 100.0)
+        self.assertEqual(result['duration_minutes'], 60)
+        self.assertEqual(result['average_power'], 250.0)
+        self.assertEqual(result['variability_index'], 1.0)
+
+    def test_matches_scalar_calculate_tss(self):
+        """Stream result equals calculate_tss() with the stream's NP."""
+        samples = [(i * 37) % 400 for i in range(2700)]
+        np = normalized_power(samples)
+        expected = calculate_tss(250, np, 45)
+        result = calculate_tss_from_stream(250, samples)
+        for key in expected:
+            self.assertEqual(result[key], expected[key], key)
+
+    def test_empty_stream_rejected(self):
+        """An empty stream has no duration and is rejected."""
+        with self.assertRaises(ValueError):
+            calculate_tss_from_stream(250, [])
+
+
+class TestCalculateTSSBatch(unittest.TestCase):
+    """Test the columnar batch TSS API (pure-Python fallback)."""
+
+    WORKOUTS = [
+        # (ftp, np, duration_min)
+        (250, 125, 60),
+        (200, 110, 60),
+        (250, 200, 60),
+        (200, 180, 45),
+        (250, 250, 120),
+        (200, 210, 60),
+        (200, 240, 20),
+        (280, 252, 90),
+    ]
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def batch(self):
+        ftp, np, duration = (list(c) for c in zip(*self.WORKOUTS))
+        return calculate_tss_batch(ftp, np, duration)
+
+    def test_matches_scalar_function(self):
+        """Every column matches calculate_tss() for each workout."""
+        result = self.batch()
+        for i, (ftp, np, duration) in enumerate(self.WORKOUTS):
+            with self.subTest(ftp=ftp, np=np, duration=duration):
+                expected = calculate_tss(ftp, np, duration)
+                self.assertEqual(round(result['intensity_factor'][i], 3), expected['intensity_factor'])
+                self.assertEqual(round(result['tss'][i], 1), expected['tss'])
+                self.assertEqual(round(result['recovery_hours'][i], 1), expected['recovery_hours'])
+                self.assertEqual(IF_ZONE_LABELS[result['zone_code'][i]], expected['estimated_zone'])
+
+    def test_columns_have_equal_length(self):
+        """All output columns are as long as the input."""
+        result = self.batch()
+        for column in result.values():
+            self.assertEqual(len(column), len(self.WORKOUTS))
+
+    def test_scalar_ftp_is_broadcast(self):
+        """A single FTP applies to every workout."""
+        result = calculate_tss_batch(250, [250, 200], [60, 60])
+        self.assertEqual(list(result['tss']), [100.0, 64.0])
+
+    def test_length_mismatch_rejected(self):
+        """Columns of different lengths raise ValueError."""
+        with self.assertRaises(ValueError):
+            calculate_tss_batch([250, 250], [250, 200, 150], [60, 60])
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestCalculateTSSBatchNumpy(TestCalculateTSSBatch):
+    """Run the batch TSS tests against the NumPy implementation."""
+
+    def setUp(self):
+        pass
+
+    def test_float_array_nan(self):
+        """float_array() reads None and NaN as 0 from buffers and lists alike."""
+        values = [100.0, float('nan'), None, 200.0]
+        self.assertEqual(_optional.float_array(values).tolist(), [100.0, 0.0, 0.0, 200.0])
+        self.assertEqual(_optional.float_array(array('d', values[:2])).tolist(), [100.0, 0.0])
+
+
+class TestReadPowerSamples(unittest.TestCase):
+    """Test parsing of raw power files."""
+
+    def write(self, text: str) -> str:
+        f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        f.write(text)
+        f.close()
+        self.addCleanup(Path(f.name).unlink)
+        return f.name
+
+    def test_one_value_per_line(self):
+        """Plain files hold one sample per line; comments and blanks are skipped."""
+        path = self.write("# ride\n100\n\n200.5\n")
+        self.assertEqual(list(read_power_samples(path)), [100.0, 200.5])
+
+    def test_csv_with_power_column(self):
+        """CSV headers select the power/watts column; empty cells are dropouts."""
+        path = self.write("time,hr,watts\n0,120,150\n1,121,\n2,122,160\n")
+        self.assertEqual(list(read_power_samples(path)), [150.0, None, 160.0])
+
+    def test_nan_is_dropout(self):
+        """Non-finite cells such as "nan" are read as dropouts."""
+        path = self.write("100\nnan\ninf\n200\n")
+        self.assertEqual(list(read_power_samples(path)), [100.0, None, None, 200.0])
+
+    def test_invalid_value_raises(self):
+        """Unparseable samples without a power header raise ValueError."""
+        path = self.write("100\nabc\n")
+        with self.assertRaises(ValueError):
+            list(read_power_samples(path))
+
+
+
+def run_main(argv: list) -> tuple:
+    """(exit code, stdout) of the calculate_tss.py CLI with argv."""
+    out = io.StringIO()
+    with mock.patch.object(sys, 'argv', ['calculate_tss.py'] + argv), redirect_stdout(out), \
+            mock.patch('sys.stderr', io.StringIO()):
+        try:
+            main()
+        except SystemExit as e:
+            return e.code, out.getvalue()
+    return 0, out.getvalue()
+
+
+class TestCli(unittest.TestCase):
+    """Test the command-line argument forms."""
+
+    def test_argument_forms(self):
+        """FTP NP DURATION and FTP --ap AP DURATION score the same workout."""
+        code, out = run_main(['250', '200', '60', '--json'])
+        self.assertEqual((code, json.loads(out)['tss']), (0, 64.0))
+        code, out = run_main(['250', '--ap', '200', '60', '--json'])
+        self.assertEqual((code, json.loads(out)['tss']), (0, 64.0))
+
+    def test_wrong_positional_count(self):
+        """Missing or extra workout values are errors, not reinterpreted."""
+        for argv in (['250'], ['250', '230'], ['250', '--ap', '200', '230', '60'],
+                     ['250', '230', '60', '5']):
+            with self.subTest(argv=argv):
+                self.assertEqual(run_main(argv)[0], 1)
+
+    def test_power_file_header_rate(self):
+        """A 2 Hz .cyps ride is scored at its header rate unless --sample-rate is given."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'r2.cyps')
+            write_stream(path, [200] * 7200, sample_rate_hz=2.0)
+            code, out = run_main(['250', '--power-file', path, '--json'])
+            self.assertEqual(code, 0)
+            self.assertEqual(json.loads(out)['duration_minutes'], 60)
+            self.assertEqual(json.loads(out)['tss'], 64.0)
+            code, out = run_main(['250', '--power-file', path, '--sample-rate', '1', '--json'])
+            self.assertEqual(json.loads(out)['duration_minutes'], 120)
+
+    def test_power_file_nan_sample(self):
+        """A NaN sample in a text power file still gives valid JSON."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'ride.txt')
+            Path(path).write_text("200\nnan\n" * 1800)
+            code, out = run_main(['250', '--power-file', path, '--json'])
+        def reject(constant):
+            raise ValueError(constant)
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out, parse_constant=reject)['average_power'], 100.0)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -7,13 +7,28 @@ Verifies zone continuity (no gaps between zones) and correct boundaries.
 
 import re
 import sys
+from bisect import bisect_right
 import unittest
 from pathlib import Path
+from unittest import mock
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from calculate_zones import coggan_zones, isf_zones, seiler_zones, hr_zones_percent_lthr
+import _optional
+from calculate_zones import (
+    coggan_zones,
+    isf_zones,
+    seiler_zones,
+    hr_karvonen_bounds,
+    hr_lthr_bounds,
+    hr_zones_karvonen,
+    hr_zones_percent_lthr,
+    power_zone_bounds,
+    time_in_zone,
+    zone_model,
+    LOOKUP_MAX_WATTS,
+)
 
 
 def extract_zone_bounds(zone_data: dict) -> list[tuple[int | None, int | None]]:
@@ -228,6 +243,29 @@ class TestHRZoneContinuity(unittest.TestCase):
                 self.assertEqual(errors, [],
                     f"HR zone continuity errors for LTHR={lthr}:\n" + "\n".join(errors))
 
+    def test_hr_bounds_match_zone_ranges(self):
+        """Numeric HR bounds are the lower ends of the printed ranges."""
+        for lthr in [150, 165, 180]:
+            with self.subTest(lthr=lthr):
+                lowers = [lo for _, lo, _ in hr_zone_ranges(hr_zones_percent_lthr(lthr))[1:]]
+                self.assertEqual(hr_lthr_bounds(lthr), lowers)
+        lowers = [lo for _, lo, _ in hr_zone_ranges(hr_zones_karvonen(165, 40, 50))[1:]]
+        self.assertEqual(hr_karvonen_bounds(40, 50), lowers)
+
+
+def hr_zone_ranges(zone_data: dict) -> list:
+    """(zone name, lower, upper) bpm per zone; None where unbounded."""
+    ranges = []
+    for zone_name, zone_info in zone_data['zones'].items():
+        range_str = zone_info['range']
+        if match := re.match(r'<\s*(\d+)\s*bpm', range_str):
+            ranges.append((zone_name, None, int(match.group(1)) - 1))
+        elif match := re.match(r'>\s*(\d+)\s*bpm', range_str):
+            ranges.append((zone_name, int(match.group(1)) + 1, None))
+        elif match := re.match(r'(\d+)-(\d+)\s*bpm', range_str):
+            ranges.append((zone_name, int(match.group(1)), int(match.group(2))))
+    return ranges
+
 
 def check_hr_zone_continuity(zone_data: dict) -> list[str]:
     """
@@ -275,5 +313,112 @@ def check_hr_zone_continuity(zone_data: dict) -> list[str]:
     return errors
 
 
+class TestPowerZoneBounds(unittest.TestCase):
+    """Test that numeric bounds agree with the human-readable ranges."""
+
+    def test_bounds_match_range_strings(self):
+        """Each bound is the parsed lower edge of zones 2..N."""
+        for model, zone_fn in (('coggan', coggan_zones), ('isf', isf_zones)):
+            for ftp in [150, 200, 250, 275, 333]:
+                with self.subTest(model=model, ftp=ftp):
+                    parsed = [lower for lower, _ in extract_zone_bounds(zone_fn(ftp))[1:]]
+                    self.assertEqual(power_zone_bounds(ftp, model), parsed)
+
+    def test_seiler_bounds(self):
+        """Seiler bounds are LT1 and just above LT2 (FTP)."""
+        self.assertEqual(power_zone_bounds(250, 'seiler'), [187, 251])
+
+    def test_bounds_strictly_increasing(self):
+        """Bounds are strictly increasing for every model."""
+        for model in ('coggan', 'seiler', 'isf'):
+            bounds = power_zone_bounds(250, model)
+            self.assertEqual(bounds, sorted(set(bounds)))
+
+
+class TestZoneModelCache(unittest.TestCase):
+    """Test the cached zone models and watt lookup tables."""
+
+    def test_lookup_matches_bisect(self):
+        """lookup[w] equals bisecting the bounds for every integer watt."""
+        for model in ('coggan', 'seiler', 'isf'):
+            zm = zone_model(model, 263)
+            self.assertEqual(len(zm.lookup), LOOKUP_MAX_WATTS + 1)
+            for watts in range(LOOKUP_MAX_WATTS + 1):
+                self.assertEqual(zm.lookup[watts], bisect_right(zm.bounds, watts), (model, watts))
+
+    def test_zones_match_uncached_dict(self):
+        """The cached dict equals the freshly built one."""
+        self.assertEqual(zone_model('coggan', 250).zones, coggan_zones(250))
+        self.assertEqual(zone_model('isf', 250).names, tuple(isf_zones(250)['zones']))
+
+    def test_same_key_returns_same_object(self):
+        """Repeated (model, ftp) lookups hit the cache."""
+        self.assertIs(zone_model('seiler', 241), zone_model('seiler', 241))
+        self.assertIsNot(zone_model('seiler', 241), zone_model('coggan', 241))
+
+    def test_ftp_beyond_table_rejected(self):
+        """Bounds above the table range raise ValueError."""
+        with self.assertRaises(ValueError):
+            zone_model('coggan', 2000)
+
+
+class TestTimeInZone(unittest.TestCase):
+    """Test time-in-zone classification (pure-Python fallback)."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_boundary_watts(self):
+        """Samples at a zone's lower bound land in that zone (FTP=250)."""
+        # Coggan FTP=250: Z2 137-187, Z3 188-225
+        tiz = time_in_zone([136, 137, 187, 188], 250)
+        self.assertEqual(list(tiz.values())[:3], [1.0, 2.0, 1.0])
+
+    def test_all_zones_present_in_order(self):
+        """Every zone of the model is reported, in model order."""
+        for model, zone_fn in (('coggan', coggan_zones), ('seiler', seiler_zones), ('isf', isf_zones)):
+            with self.subTest(model=model):
+                tiz = time_in_zone([200] * 10, 250, model)
+                self.assertEqual(list(tiz), list(zone_fn(250)['zones']))
+                self.assertEqual(sum(tiz.values()), 10.0)
+
+    def test_matches_range_strings(self):
+        """Every integer watt is classified into the zone whose range contains it."""
+        zones = coggan_zones(250)
+        bounds = extract_zone_bounds(zones)
+        names = list(zones['zones'])
+        for watts in range(0, 500):
+            tiz = time_in_zone([watts], 250)
+            zone = next(name for name, seconds in tiz.items() if seconds)
+            lower, upper = bounds[names.index(zone)]
+            self.assertTrue((lower is None or watts >= lower) and (upper is None or watts <= upper),
+                            f"{watts}W classified as {zone}")
+
+    def test_fractional_and_extreme_watts(self):
+        """Fractional watts floor into zones; negative and huge values clamp."""
+        tiz = list(time_in_zone([187.9, -5, 5000], 250).values())
+        self.assertEqual(tiz, [1.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0])
+
+    def test_sample_rate_and_dropouts(self):
+        """Seconds scale with sample rate; None samples count as 0 W."""
+        tiz = time_in_zone([None, 300, 300, 300], 250, 'seiler', sample_rate_hz=2)
+        self.assertEqual(list(tiz.values()), [0.5, 0.0, 1.5])
+
+    def test_non_finite_samples(self):
+        """NaN and infinite samples count as 0 W."""
+        tiz = time_in_zone([float('nan'), float('inf'), float('-inf'), 300], 250)
+        self.assertEqual(list(tiz.values()), [3.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0])
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestTimeInZoneNumpy(TestTimeInZone):
+    """Run the time-in-zone tests against the NumPy implementation."""
+
+    def setUp(self):
+        pass
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for cp_model.py - CP/W' model fitting.
+
+Each model recovers known parameters from a synthetic curve of its own
+form; the pure-Python and NumPy backends run the same tests.
+"""
+
+import math
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from calculate_tss import calculate_tss
+from calculate_zones import coggan_zones
+from cp_model import cp_power, fit_cp, fit_cp_models
+from mmp import duration_grid
+
+DURATIONS = duration_grid(3600)
+CP, W_PRIME, PMAX = 280.0, 20000.0, 1100.0
+
+
+def curve(power_at) -> dict:
+    return {"durations": DURATIONS, "power": [power_at(t) for t in DURATIONS]}
+
+
+class TestFitCp(unittest.TestCase):
+    """Test model fitting with the pure-Python backend."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_2p_exact(self):
+        """2p recovers CP and W' from a hyperbolic curve."""
+        fit = fit_cp(curve(lambda t: CP + W_PRIME / t), '2p')
+        self.assertAlmostEqual(fit["cp"], CP, places=1)
+        self.assertEqual(fit["w_prime"], W_PRIME)
+        self.assertIsNone(fit["pmax"])
+        self.assertEqual(fit["rmse"], 0.0)
+        self.assertEqual((fit["min_duration"], fit["max_duration"]), (120, 1200))
+
+    def test_3p_exact(self):
+        """3p recovers CP, W' and Pmax (via k) from a Morton curve."""
+        k = W_PRIME / (PMAX - CP)
+        fit = fit_cp(curve(lambda t: CP + W_PRIME / (t + k)), '3p')
+        self.assertAlmostEqual(fit["cp"], CP, places=1)
+        self.assertAlmostEqual(fit["w_prime"], W_PRIME, delta=5)
+        self.assertAlmostEqual(fit["pmax"], PMAX, delta=1)
+        self.assertAlmostEqual(fit["k"], k, places=1)
+        self.assertEqual(fit["r2"], 1.0)
+
+    def test_exponential_exact(self):
+        """exp recovers CP, Pmax and tau; W' = (Pmax - CP) * tau."""
+        tau = 40.0
+        fit = fit_cp(curve(lambda t: CP + (PMAX - CP) * math.exp(-t / tau)), 'exp')
+        self.assertAlmostEqual(fit["cp"], CP, places=1)
+        self.assertAlmostEqual(fit["pmax"], PMAX, delta=1)
+        self.assertAlmostEqual(fit["tau"], tau, places=1)
+        self.assertAlmostEqual(fit["w_prime"], (PMAX - CP) * tau, delta=10)
+
+    def test_noisy_curve(self):
+        """Noise changes CP by about its own size, not more."""
+        k = W_PRIME / (PMAX - CP)
+        noisy = curve(lambda t: CP + W_PRIME / (t + k) + 3 * math.sin(t))
+        for model in ('2p', '3p'):
+            with self.subTest(model=model):
+                fit = fit_cp(noisy, model)
+                self.assertAlmostEqual(fit["cp"], CP, delta=5)
+                self.assertGreater(fit["rmse"], 1)
+
+    def test_duration_range(self):
+        """Only points within the requested range are fitted."""
+        fit = fit_cp(curve(lambda t: CP + W_PRIME / t), '2p', min_duration=180, max_duration=600)
+        self.assertEqual(fit["points"], sum(180 <= d <= 600 for d in DURATIONS))
+
+    def test_cp_usable_as_ftp(self):
+        """The rounded CP feeds coggan_zones() and calculate_tss()."""
+        fit = fit_cp(curve(lambda t: CP + W_PRIME / t), '2p')
+        self.assertEqual(fit["ftp"], 280)
+        self.assertEqual(coggan_zones(fit["ftp"])["ftp"], 280)
+        self.assertEqual(calculate_tss(fit["ftp"], 280, 60)["tss"], 100.0)
+
+    def test_predicted_power(self):
+        """cp_power() reproduces the fitted curve."""
+        k = W_PRIME / (PMAX - CP)
+        data = curve(lambda t: CP + W_PRIME / (t + k))
+        fit = fit_cp(data, '3p')
+        for predicted, actual in zip(cp_power(fit, DURATIONS), data["power"]):
+            self.assertAlmostEqual(predicted, actual, delta=1)
+
+    def test_all_models(self):
+        """fit_cp_models() returns one fit per model."""
+        fits = fit_cp_models(curve(lambda t: CP + W_PRIME / t))
+        self.assertEqual(list(fits), ['2p', '3p', 'exp'])
+
+    def test_errors(self):
+        """Too few points, flat or rising curves and unknown models fail."""
+        with self.assertRaises(ValueError):
+            fit_cp({"durations": [300], "power": [300]}, '2p')
+        with self.assertRaises(ValueError):
+            fit_cp(curve(lambda t: 250.0 + t / 100), '2p')
+        with self.assertRaises(ValueError):
+            fit_cp(curve(lambda t: CP + W_PRIME / t), '4p')
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestFitCpNumpy(TestFitCp):
+    """Same tests with the vectorized grid search."""
+
+    def setUp(self):
+        pass
+
+    def test_same_as_pure_python(self):
+        """Both backends choose the same parameters."""
+        k = W_PRIME / (PMAX - CP)
+        data = curve(lambda t: CP + W_PRIME / (t + k) + 3 * math.sin(t))
+        vectorized = fit_cp_models(data)
+        with mock.patch.dict(_optional._modules, {'numpy': None}):
+            self.assertEqual(fit_cp_models(data), vectorized)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for cycling.py - unified entry point.
+
+Verifies that the fast path gives the same output as each script's
+argparse CLI, falls back to argparse when needed, and that the scripts
+defer argparse/json imports.
+"""
+
+import io
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import cycling
+
+
+def run_cli(main, argv: list) -> str:
+    """Capture stdout of a CLI main() called with argv."""
+    out = io.StringIO()
+    with mock.patch.object(sys, 'argv', argv), redirect_stdout(out):
+        main()
+    return out.getvalue()
+
+
+class TestFastArgs(unittest.TestCase):
+    """Test the hand-written fast-path parser."""
+
+    def test_zones(self):
+        """Positionals and typed options are converted."""
+        args = cycling.fast_args('zones', ['250', '--model', 'seiler', '--json'])
+        self.assertEqual((args.ftp, args.model, args.json, args.lthr), (250, 'seiler', True, None))
+
+    def test_tss_workout_positionals(self):
+        """Positionals after FTP are collected as the workout values."""
+        args = cycling.fast_args('tss', ['250', '--ap', '200', '60'])
+        self.assertEqual((args.ftp, args.workout, args.ap), (250, [60.0], 200.0))
+        self.assertEqual(cycling.fast_args('tss', ['250', '230', '60']).workout, [230.0, 60.0])
+
+    def test_week_daily_tss(self):
+        """--daily-tss goes through parse_daily_tss()."""
+        args = cycling.fast_args('week', ['450', '65', '72', '--daily-tss', '60,80,0'])
+        self.assertEqual(args.daily_tss, [60.0, 80.0, 0.0])
+        self.assertIsNone(args.batch)
+
+    def test_fallback_cases(self):
+        """Anything unusual is left to argparse."""
+        for command, argv in (('zones', ['250', '--help']),
+                              ('zones', ['abc']),
+                              ('zones', ['250', '--model', 'other']),
+                              ('zones', ['250', '--lthr']),
+                              ('zones', ['250', '300']),
+                              ('tss', []),
+                              ('week', ['450', '65']),
+                              ('week', ['--batch', 'weeks.jsonl']),
+                              ('week', ['450', '65', '72', '--daily-tss', 'a,b']),
+                              ('pmc', ['history.csv'])):
+            with self.subTest(command=command, argv=argv):
+                self.assertIsNone(cycling.fast_args(command, argv))
+
+
+class TestMain(unittest.TestCase):
+    """Test that cycling.py output matches the scripts."""
+
+    CASES = (
+        ('zones', 'calculate_zones', ['250']),
+        ('zones', 'calculate_zones', ['250', '--model', 'isf', '--json']),
+        ('zones', 'calculate_zones', ['250', '--lthr', '170']),
+        ('tss', 'calculate_tss', ['250', '230', '60', '--json']),
+        ('tss', 'calculate_tss', ['250', '--ap', '200', '--vi', '1.05', '60']),
+        ('week', 'analyze_week', ['450', '65', '72']),
+        ('week', 'analyze_week', ['450', '65', '72', '--prev-week-tss', '400',
+                                  '--daily-tss', '60,80,0,70,90,80,70', '--json']),
+    )
+
+    def test_same_output_as_scripts(self):
+        """Fast path output is identical to the script's argparse CLI."""
+        for command, module_name, argv in self.CASES:
+            with self.subTest(command=command, argv=argv):
+                module = __import__(module_name)
+                expected = run_cli(module.main, [f'{module_name}.py'] + argv)
+                actual = run_cli(cycling.main, ['cycling.py', command] + argv)
+                self.assertEqual(actual, expected)
+
+    def test_fallback_to_argparse(self):
+        """Unrecognized arguments reach the script's own parser."""
+        with mock.patch.object(sys, 'argv', ['cycling.py', 'zones', '250', '--bogus']), \
+                mock.patch('sys.stderr', io.StringIO()) as err, \
+                self.assertRaises(SystemExit) as ctx:
+            cycling.main()
+        self.assertEqual(ctx.exception.code, 2)
+        self.assertIn('cycling.py zones', err.getvalue())
+
+    def test_unknown_command(self):
+        """Unknown commands exit with status 2."""
+        with mock.patch('sys.stderr', io.StringIO()), self.assertRaises(SystemExit) as ctx:
+            cycling.main(['ftp'])
+        self.assertEqual(ctx.exception.code, 2)
+
+    def test_usage(self):
+        """No arguments prints the command list."""
+        out = io.StringIO()
+        with redirect_stdout(out):
+            cycling.main([])
+        self.assertIn('zones', out.getvalue())
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test that heavy modules are not imported on the fast path."""
+
+    def test_no_argparse_or_json_on_import(self):
+        """Importing the scripts does not import argparse, json or csv."""
+        code = ("import sys; import calculate_zones, calculate_tss, analyze_week; "
+                "print(sorted(m for m in ('argparse', 'json', 'csv', 'typing') if m in sys.modules))")
+        out = subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR,
+                             capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), '[]')
+
+    def test_text_output_skips_argparse(self):
+        """A fast-path text command never imports argparse or json."""
+        code = ("import sys, cycling; cycling.main(['week', '450', '65', '72']); "
+                "print(sorted(m for m in ('argparse', 'json') if m in sys.modules))")
+        out = subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR,
+                             capture_output=True, text=True, check=True).stdout
+        self.assertTrue(out.strip().endswith('[]'))
+
+
+if __name__ == '__main__':
+    unittest.main()
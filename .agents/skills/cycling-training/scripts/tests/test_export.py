@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for export.py - columnar PMC/weekly export.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from analyze_week import calculate_acwr
+from export import (
+    DAILY_COLUMNS,
+    WEEKLY_COLUMNS,
+    daily_columns,
+    export_histories,
+    open_writer,
+    weekly_columns,
+)
+from pmc import analyze_pmc_week, compute_pmc
+
+START = date(2026, 1, 1)
+HISTORY = [(START + timedelta(days=i), [60, 80, 0, 70, 90, 120, 0][i % 7] + i % 5)
+           for i in range(40)]
+
+
+def concat(chunks) -> dict:
+    """Join column chunks into full columns."""
+    columns = {}
+    for chunk in chunks:
+        for name, values in chunk.items():
+            columns.setdefault(name, []).extend(values)
+    return columns
+
+
+def read_csv(path: str) -> list:
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+class TestDailyColumns(unittest.TestCase):
+    """Test the daily series chunks."""
+
+    def setUp(self):
+        self.pmc = compute_pmc(HISTORY)
+
+    def test_chunks(self):
+        """Chunks are at most chunk_size rows and cover every day."""
+        chunks = list(daily_columns(self.pmc, chunk_size=16))
+        self.assertEqual([len(c["date"]) for c in chunks], [16, 16, 8])
+        self.assertEqual(list(chunks[0]), list(DAILY_COLUMNS))
+
+    def test_values(self):
+        """Columns are the PMC series, rounded; ACWR is calculate_acwr()."""
+        columns = concat(daily_columns(self.pmc, chunk_size=16))
+        self.assertEqual(columns["date"], self.pmc["dates"])
+        self.assertEqual(columns["ctl"], [round(v, 2) for v in self.pmc["ctl"]])
+        self.assertEqual(columns["acwr"][10],
+                         round(calculate_acwr(self.pmc["ctl"][10], self.pmc["atl"][10]), 2))
+        self.assertIsNone(columns["monotony"][0])
+        self.assertIsNotNone(columns["monotony"][-1])
+
+    def test_athlete_column(self):
+        """An athlete name adds a leading "athlete" column."""
+        chunk = next(daily_columns(self.pmc, athlete='ann'))
+        self.assertEqual(list(chunk)[0], 'athlete')
+        self.assertEqual(set(chunk["athlete"]), {'ann'})
+
+
+class TestWeeklyColumns(unittest.TestCase):
+    """Test the weekly analysis chunks."""
+
+    def setUp(self):
+        self.pmc = compute_pmc(HISTORY)
+        self.columns = concat(weekly_columns(self.pmc, chunk_size=2))
+
+    def test_weeks_end_on_last_day(self):
+        """Weeks end every 7 days, the last on the last day of the history."""
+        ends = self.columns["week_ending"]
+        self.assertEqual(ends[-1], HISTORY[-1][0])
+        self.assertEqual(len(ends), 6)
+        self.assertTrue(all((b - a).days == 7 for a, b in zip(ends, ends[1:])))
+
+    def test_matches_analyze_pmc_week(self):
+        """Each row is analyze_pmc_week() for its week ending."""
+        for i, week_ending in enumerate(self.columns["week_ending"]):
+            week = analyze_pmc_week(self.pmc, week_ending)
+            with self.subTest(week_ending=week_ending):
+                self.assertEqual(self.columns["weekly_tss"][i], week["input"]["weekly_tss"])
+                self.assertEqual(self.columns["tsb"][i], week["metrics"]["tsb"])
+                self.assertEqual(self.columns["monotony"][i], week["metrics"]["monotony"])
+                self.assertEqual(self.columns["acwr_status"][i], week["status"]["acwr"]["status"])
+                self.assertEqual(self.columns["warnings"][i],
+                                 '; '.join(w["message"] for w in week["warnings"]))
+        self.assertEqual(list(self.columns), list(WEEKLY_COLUMNS))
+
+
+class TestExport(unittest.TestCase):
+    """Test writing files."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.daily = os.path.join(self.tmpdir.name, 'daily.csv')
+        self.weekly = os.path.join(self.tmpdir.name, 'weekly.csv')
+
+    def test_single_history_csv(self):
+        """One history without athlete names: no athlete column."""
+        rows = export_histories([(None, HISTORY)], self.daily, self.weekly, chunk_size=16)
+        self.assertEqual(rows, {self.daily: 40, self.weekly: 6})
+        daily = read_csv(self.daily)
+        self.assertEqual(list(daily[0]), list(DAILY_COLUMNS))
+        self.assertEqual(daily[-1]["date"], HISTORY[-1][0].isoformat())
+        self.assertEqual(daily[0]["monotony"], '')
+
+    def test_several_athletes(self):
+        """Histories are consumed lazily and tagged by athlete."""
+        histories = ((name, HISTORY[:n]) for name, n in (('ann', 40), ('bob', 21)))
+        rows = export_histories(histories, weekly_path=self.weekly)
+        self.assertEqual(rows, {self.weekly: 6 + 3})
+        weekly = read_csv(self.weekly)
+        self.assertEqual([r["athlete"] for r in weekly], ['ann'] * 6 + ['bob'] * 3)
+
+    def test_empty(self):
+        """No histories is an error."""
+        with self.assertRaises(ValueError):
+            export_histories([], self.daily)
+
+    def test_failed_open_closes_earlier_writers(self):
+        """A writer that cannot be opened does not leak the ones before it."""
+        opened = []
+
+        def open_or_fail(path, columns, fmt=None):
+            if path == self.weekly:
+                raise OSError("No such directory")
+            opened.append(open_writer(path, columns, fmt))
+            return opened[-1]
+
+        with mock.patch('export.open_writer', open_or_fail), self.assertRaises(OSError):
+            export_histories([(None, HISTORY)], self.daily, self.weekly)
+        self.assertTrue(opened[0]._file.closed)
+
+    def test_unknown_format(self):
+        """Unknown formats raise ValueError."""
+        with self.assertRaises(ValueError):
+            open_writer(self.daily, DAILY_COLUMNS, 'xlsx')
+
+    def test_arrow_requires_pyarrow(self):
+        """Parquet/Arrow without pyarrow raise RuntimeError."""
+        with mock.patch.dict(_optional._modules, {'pyarrow': None}):
+            for name in ('daily.parquet', 'daily.arrow'):
+                with self.subTest(name=name), self.assertRaises(RuntimeError):
+                    open_writer(os.path.join(self.tmpdir.name, name), DAILY_COLUMNS)
+
+    @unittest.skipUnless(_optional.load('pyarrow'), "pyarrow not installed")
+    def test_parquet_and_arrow_match_csv(self):
+        """Parquet and Arrow files hold the same rows as the CSV."""
+        pa = _optional.load('pyarrow')
+        parquet = _optional.load('pyarrow.parquet')
+        export_histories([(None, HISTORY)], self.daily, chunk_size=16)
+        expected = compute_pmc(HISTORY)
+        for name in ('daily.parquet', 'daily.arrow'):
+            path = os.path.join(self.tmpdir.name, name)
+            export_histories([(None, HISTORY)], path, chunk_size=16)
+            with self.subTest(name=name):
+                if name.endswith('.parquet'):
+                    table = parquet.read_table(path)
+                else:
+                    with pa.OSFile(path, 'rb') as f:
+                        table = pa.ipc.open_file(f).read_all()
+                self.assertEqual(table.num_rows, 40)
+                self.assertEqual(table.column('date').to_pylist(), expected["dates"])
+                self.assertEqual(table.column('ctl').to_pylist(),
+                                 [float(r["ctl"]) for r in read_csv(self.daily)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Tests for fit_decoder.py - streaming FIT record decoder.
+
+FIT files are built in-memory by a small encoder so each header and
+message feature (definitions, endianness, developer fields, compressed
+timestamps, invalid values) is exercised explicitly.
+"""
+
+import io
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from calculate_tss import calculate_tss_from_stream
+from fit_decoder import (
+    CHANNELS,
+    FIT_EPOCH_OFFSET,
+    FIT_MAX_GAP_SEC,
+    FitError,
+    fit_heart_rate,
+    is_fit_file,
+    iter_record_chunks,
+    read_fit_records,
+    resample_records,
+)
+from power_stream import power_samples
+
+# (field number, size, base type) for a typical record definition
+RECORD_FIELDS = [(253, 4, 0x86), (7, 2, 0x84), (3, 1, 0x02), (4, 1, 0x02),
+                 (6, 2, 0x84), (2, 2, 0x84)]
+RECORD_FORMAT = 'IHBBHH'
+START = 1100000000  # FIT timestamp (seconds since 1989-12-31)
+
+
+def definition(local, global_num, fields, big_endian=False, dev_fields=()):
+    """Encode a definition message."""
+    header = 0x40 | local | (0x20 if dev_fields else 0)
+    order = '>' if big_endian else '<'
+    out = bytes([header, 0, int(big_endian)]) + struct.pack(order + 'H', global_num)
+    out += bytes([len(fields)]) + b''.join(bytes(f) for f in fields)
+    if dev_fields:
+        out += bytes([len(dev_fields)]) + b''.join(bytes(f) for f in dev_fields)
+    return out
+
+
+def data(local, fmt, values, big_endian=False, header=None):
+    """Encode a data message with a normal (or given) header byte."""
+    order = '>' if big_endian else '<'
+    return bytes([local if header is None else header]) + struct.pack(order + fmt, *values)
+
+
+def fit_file(messages: bytes, header_size: int = 14) -> bytes:
+    """Wrap encoded messages in a FIT file header and trailing CRC."""
+    header = struct.pack('<BBHI4s', header_size, 0x20, 2132, len(messages), b'.FIT')
+    if header_size == 14:
+        header += b'\x00\x00'
+    return header + messages + b'\x00\x00'
+
+
+def ride(n, local=0, interval=1):
+    """Encode n record messages, one every `interval` seconds."""
+    return b''.join(data(local, RECORD_FORMAT,
+                         (START + i * interval, 200 + i % 50, 140, 90, 8333, 2750))
+                    for i in range(n))
+
+
+def decode(raw: bytes, chunk_size: int = 4096) -> dict:
+    """Decode FIT bytes into full columns."""
+    columns = {name: [] for name in CHANNELS}
+    for chunk in iter_record_chunks(io.BytesIO(raw), chunk_size):
+        for name in CHANNELS:
+            columns[name].extend(chunk[name])
+    return columns
+
+
+class TestRecords(unittest.TestCase):
+    """Test decoding of record messages."""
+
+    def test_fields_and_scaling(self):
+        """Record fields are decoded with FIT scale and offset applied."""
+        raw = fit_file(definition(0, 20, RECORD_FIELDS) + ride(3))
+        columns = decode(raw)
+        self.assertEqual(columns['timestamp'], [START + FIT_EPOCH_OFFSET + i for i in range(3)])
+        self.assertEqual(columns['power'], [200, 201, 202])
+        self.assertEqual(columns['heart_rate'], [140] * 3)
+        self.assertEqual(columns['cadence'], [90] * 3)
+        self.assertEqual(columns['speed'], [8.333] * 3)
+        self.assertEqual(columns['altitude'], [50.0] * 3)
+
+    def test_invalid_values_are_none(self):
+        """All-ones field values mean 'no data'."""
+        raw = fit_file(definition(0, 20, RECORD_FIELDS)
+                       + data(0, RECORD_FORMAT, (START, 0xFFFF, 0xFF, 0xFF, 0xFFFF, 0xFFFF)))
+        columns = decode(raw)
+        self.assertEqual(columns['power'], [None])
+        self.assertEqual(columns['heart_rate'], [None])
+        self.assertEqual(columns['speed'], [None])
+        self.assertEqual(columns['altitude'], [None])
+
+    def test_missing_fields_are_none(self):
+        """Channels absent from the definition decode as None."""
+        raw = fit_file(definition(0, 20, [(253, 4, 0x86), (7, 2, 0x84)])
+                       + data(0, 'IH', (START, 250)))
+        columns = decode(raw)
+        self.assertEqual(columns['power'], [250])
+        self.assertEqual(columns['cadence'], [None])
+
+    def test_big_endian(self):
+        """Big-endian definitions decode the same values."""
+        raw = fit_file(definition(0, 20, RECORD_FIELDS, big_endian=True)
+                       + data(0, RECORD_FORMAT, (START, 300, 150, 95, 10000, 3000), big_endian=True))
+        columns = decode(raw)
+        self.assertEqual(columns['power'], [300])
+        self.assertEqual(columns['speed'], [10.0])
+        self.assertEqual(columns['altitude'], [100.0])
+
+    def test_enhanced_fields_preferred(self):
+        """enhanced_speed/enhanced_altitude override the 16-bit fields."""
+        fields = [(253, 4, 0x86), (6, 2, 0x84), (73, 4, 0x86), (78, 4, 0x86)]
+        raw = fit_file(definition(0, 20, fields) + data(0, 'IHII', (START, 1000, 70000, 45000)))
+        columns = decode(raw)
+        self.assertEqual(columns['speed'], [70.0])
+        self.assertEqual(columns['altitude'], [8500.0])
+
+    def test_developer_and_unknown_fields_skipped(self):
+        """Developer and non-record fields are skipped by size."""
+        fields = [(253, 4, 0x86), (0, 4, 0x85), (7, 2, 0x84)]
+        raw = fit_file(definition(0, 20, fields, dev_fields=[(0, 2, 0), (1, 1, 0)])
+                       + data(0, 'IiHHB', (START, -5, 321, 7, 9)))
+        self.assertEqual(decode(raw)['power'], [321])
+
+    def test_other_messages_skipped(self):
+        """Non-record messages interleaved with records are ignored."""
+        messages = (definition(1, 0, [(0, 1, 0), (4, 4, 0x86)]) + data(1, 'BI', (4, START))
+                    + definition(0, 20, RECORD_FIELDS) + ride(2)
+                    + definition(2, 21, [(0, 1, 0), (1, 1, 0)]) + data(2, 'BB', (0, 4))
+                    + ride(2))
+        self.assertEqual(decode(fit_file(messages))['power'], [200, 201, 200, 201])
+
+    def test_redefined_local_type(self):
+        """A new definition replaces the layout of its local type."""
+        messages = (definition(0, 20, RECORD_FIELDS) + ride(1)
+                    + definition(0, 20, [(7, 2, 0x84)]) + data(0, 'H', (400,)))
+        self.assertEqual(decode(fit_file(messages))['power'], [200, 400])
+
+    def test_compressed_timestamps(self):
+        """Compressed headers advance the 5-bit timestamp offset with rollover."""
+        base = START - START % 32 + 30
+        messages = (definition(0, 20, [(253, 4, 0x86), (7, 2, 0x84)]) + data(0, 'IH', (base, 100))
+                    + definition(1, 20, [(7, 2, 0x84)])
+                    + data(1, 'H', (110,), header=0x80 | (1 << 5) | 31)
+                    + data(1, 'H', (120,), header=0x80 | (1 << 5) | 1))
+        columns = decode(fit_file(messages))
+        self.assertEqual(columns['power'], [100, 110, 120])
+        self.assertEqual([t - FIT_EPOCH_OFFSET for t in columns['timestamp']],
+                         [base, base + 1, base + 3])
+
+    def test_12_byte_header(self):
+        """Legacy 12-byte headers (no header CRC) are accepted."""
+        raw = fit_file(definition(0, 20, RECORD_FIELDS) + ride(2), header_size=12)
+        self.assertEqual(decode(raw)['power'], [200, 201])
+
+
+class TestChunks(unittest.TestCase):
+    """Test fixed-size chunking and block buffering."""
+
+    def test_fixed_size_chunks(self):
+        """Chunks hold exactly chunk_size samples except the last."""
+        raw = fit_file(definition(0, 20, RECORD_FIELDS) + ride(25))
+        sizes = [len(c['power']) for c in iter_record_chunks(io.BytesIO(raw), 10)]
+        self.assertEqual(sizes, [10, 10, 5])
+
+    def test_spans_read_blocks(self):
+        """Messages straddling 64 KB read blocks decode correctly."""
+        n = 20000  # ~300 KB of records
+        columns = decode(fit_file(definition(0, 20, RECORD_FIELDS) + ride(n)), chunk_size=777)
+        self.assertEqual(len(columns['power']), n)
+        self.assertEqual(columns['power'], [200 + i % 50 for i in range(n)])
+        self.assertEqual(columns['timestamp'][-1], START + FIT_EPOCH_OFFSET + n - 1)
+
+    def test_invalid_chunk_size(self):
+        """chunk_size must be positive."""
+        raw = fit_file(definition(0, 20, RECORD_FIELDS) + ride(1))
+        with self.assertRaises(ValueError):
+            list(iter_record_chunks(io.BytesIO(raw), 0))
+
+
+class TestResample(unittest.TestCase):
+    """Test expansion of records to 1 Hz samples."""
+
+    def resample(self, times, max_gap_sec=FIT_MAX_GAP_SEC) -> list:
+        chunk = {'timestamp': times, 'power': list(range(len(times)))}
+        return [watts for watts, in resample_records([chunk], max_gap_sec=max_gap_sec)]
+
+    def test_forward_fill(self):
+        """Each record holds until the next record's timestamp."""
+        self.assertEqual(self.resample([0, 1, 4, 5]), [0, 1, 1, 1, 2, 3])
+
+    def test_pauses_dropped(self):
+        """Gaps over max_gap_sec keep one second of the paused record."""
+        self.assertEqual(self.resample([0, 5, 100, 101], max_gap_sec=10), [0] * 5 + [1, 2, 3])
+
+    def test_duplicate_and_missing_timestamps(self):
+        """Repeated timestamps are superseded; missing ones count one second."""
+        self.assertEqual(self.resample([0, 0, 2, None, 3]), [1, 1, 2, 3, 4])
+
+    def test_smart_recording_ride(self):
+        """A 1 h ride recorded every 5 s scores like the 1 Hz ride."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'smart.fit')
+            Path(path).write_bytes(fit_file(definition(0, 20, RECORD_FIELDS) + ride(720, interval=5)))
+            with power_samples(path) as (samples, rate):
+                result = calculate_tss_from_stream(250, samples, rate)
+            self.assertEqual(len(list(fit_heart_rate(path))), 3596)
+        watts = [200 + i % 50 for i in range(720) for _ in range(5)][:3596]
+        self.assertEqual(result, calculate_tss_from_stream(250, watts))
+        self.assertAlmostEqual(result['duration_minutes'], 60, places=0)
+
+
+class TestErrors(unittest.TestCase):
+    """Test malformed input handling."""
+
+    def test_not_fit(self):
+        """Missing .FIT signature raises FitError."""
+        with self.assertRaises(FitError):
+            list(iter_record_chunks(io.BytesIO(b'power\n200\n210\n')))
+
+    def test_truncated(self):
+        """Data ending before data_size raises FitError."""
+        raw = fit_file(definition(0, 20, RECORD_FIELDS) + ride(5))
+        with self.assertRaises(FitError):
+            list(iter_record_chunks(io.BytesIO(raw[:-20])))
+
+    def test_undefined_local_type(self):
+        """Data for an undefined local message type raises FitError."""
+        with self.assertRaises(FitError):
+            list(iter_record_chunks(io.BytesIO(fit_file(ride(1, local=3)))))
+
+
+class TestPipeline(unittest.TestCase):
+    """Test FIT files feeding the NP/TSS pipeline."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = str(Path(tmp.name) / 'ride.fit')
+        with open(self.path, 'wb') as f:
+            f.write(fit_file(definition(0, 20, RECORD_FIELDS) + ride(3600)))
+
+    def test_is_fit_file(self):
+        """FIT files are detected by header signature."""
+        self.assertTrue(is_fit_file(self.path))
+        self.assertFalse(is_fit_file(self.path + '.missing'))
+
+    def test_read_fit_records(self):
+        """Paths decode the same as streams."""
+        total = sum(len(c['power']) for c in read_fit_records(self.path))
+        self.assertEqual(total, 3600)
+
+    def test_tss_from_fit(self):
+        """power_samples() streams FIT power into calculate_tss_from_stream()."""
+        watts = [200 + i % 50 for i in range(3600)]
+        with power_samples(self.path) as (samples, rate):
+            result = calculate_tss_from_stream(250, samples, rate)
+        self.assertEqual(result, calculate_tss_from_stream(250, watts))
+        self.assertEqual(result['duration_minutes'], 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for hr_tss.py - hrTSS and TRIMP from heart rate streams.
+
+Loads are checked against the formulas evaluated directly per sample; the
+streaming and NumPy paths run the same tests.
+"""
+
+import math
+import random
+import sys
+import tempfile
+import unittest
+from array import array
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from analyze_week import analyze_week
+from calculate_tss import calculate_tss
+from calculate_zones import hr_lthr_bounds
+from hr_tss import LTHR_FLOOR, HeartRateLoadStream, calculate_hr_tss, hr_model
+from power_stream import heart_rate_samples, write_stream
+
+random.seed(5)
+HR = [random.randint(95, 190) for _ in range(3600)]
+
+
+def banister(samples, rhr, max_hr, a=0.64, b=1.92) -> float:
+    total = 0.0
+    for bpm in samples:
+        x = min(max((int(bpm) - rhr) / (max_hr - rhr), 0.0), 1.0)
+        total += x * a * math.exp(b * x) / 60
+    return total
+
+
+class TestHrTss(unittest.TestCase):
+    """Test hrTSS/TRIMP with the streaming backend."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def samples(self, values):
+        """Samples in the form the backend under test consumes."""
+        return array('d', values)
+
+    def test_hour_at_threshold(self):
+        """One hour at LTHR is 100 hrTSS, like an hour at FTP."""
+        result = calculate_hr_tss(self.samples([165] * 3600), 165)
+        self.assertEqual(result["tss"], 100.0)
+        self.assertEqual(result["tss"], calculate_tss(250, 250, 60)["tss"])
+        self.assertEqual(result["intensity_factor"], 1.0)
+        self.assertEqual(result["estimated_zone"], calculate_tss(250, 250, 60)["estimated_zone"])
+
+    def test_percent_lthr(self):
+        """hrTSS is hours × mean(((HR - F)/(LTHR - F))²) × 100, F = 50% LTHR."""
+        result = calculate_hr_tss(self.samples(HR), 165)
+        floor = 165 * LTHR_FLOOR
+        expected = sum(((bpm - floor) / (165 - floor)) ** 2 for bpm in HR) / 3600 * 100
+        self.assertAlmostEqual(result["tss"], expected, places=1)
+        self.assertAlmostEqual(result["average_hr"], sum(HR) / len(HR), places=1)
+        self.assertIsNone(result["trimp"])
+
+    def test_no_load_at_rest(self):
+        """Heart rates at or below the floor add time but no hrTSS."""
+        result = calculate_hr_tss(self.samples([60] * 3600), 165)
+        self.assertEqual(result["tss"], 0.0)
+        self.assertEqual(result["duration_minutes"], 60.0)
+        self.assertEqual(calculate_hr_tss(self.samples([82] * 3600), 165)["tss"], 0.0)
+
+    def test_dropouts_excluded_from_average(self):
+        """Dropouts count as elapsed time but not towards average HR."""
+        result = calculate_hr_tss(self.samples([150, 0, 160, 0]), 165)
+        self.assertEqual(result["average_hr"], 155.0)
+        self.assertEqual(result["duration_minutes"], round(4 / 60, 2))
+        self.assertIsNone(calculate_hr_tss(self.samples([0, 0]), 165)["average_hr"])
+
+    def test_karvonen(self):
+        """The Karvonen model scales intensity by heart rate reserve."""
+        result = calculate_hr_tss(self.samples(HR), 165, 'karvonen', age=40, rhr=50)
+        expected = sum((max(bpm - 50, 0) / 115) ** 2 for bpm in HR) / 3600 * 100
+        self.assertAlmostEqual(result["tss"], expected, places=1)
+
+    def test_trimp(self):
+        """TRIMP follows Banister's weighting, by sex."""
+        male = calculate_hr_tss(self.samples(HR), 165, age=40, rhr=50)
+        female = calculate_hr_tss(self.samples(HR), 165, age=40, rhr=50, sex='female')
+        self.assertAlmostEqual(male["trimp"], banister(HR, 50, 180), places=1)
+        self.assertAlmostEqual(female["trimp"], banister(HR, 50, 180, 0.86, 1.67), places=1)
+
+    def test_time_in_zone(self):
+        """Zone time uses the hr_zones_percent_lthr() bounds."""
+        result = calculate_hr_tss(self.samples(HR), 165, sample_rate_hz=2)
+        bounds = hr_lthr_bounds(165)
+        counts = [0] * 7
+        for bpm in HR:
+            counts[sum(bpm >= b for b in bounds)] += 1
+        self.assertEqual(list(result["time_in_zone_seconds"].values()), [n / 2 for n in counts])
+        self.assertEqual(result["duration_minutes"], 30.0)
+
+    def test_feeds_weekly_analysis(self):
+        """hrTSS can stand in for power TSS in a week's daily loads."""
+        rides = [calculate_hr_tss(self.samples(HR[:n]), 165)["tss"] for n in (1800, 3600, 2700)]
+        daily = [rides[0], 0, rides[1], 0, rides[2], 0, 0]
+        result = analyze_week(sum(daily), 60, 65, daily_tss=daily)
+        self.assertEqual(result["input"]["weekly_tss"], sum(daily))
+        self.assertIsNotNone(result["metrics"]["monotony"])
+
+    def test_errors(self):
+        """Empty streams and bad parameters are rejected."""
+        with self.assertRaises(ValueError):
+            calculate_hr_tss(self.samples([]), 165)
+        with self.assertRaises(ValueError):
+            calculate_hr_tss(self.samples(HR), 165, 'karvonen')
+        with self.assertRaises(ValueError):
+            calculate_hr_tss(self.samples(HR), 165, 'zones')
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestHrTssNumpy(TestHrTss):
+    """Same tests with the vectorized gather."""
+
+    def setUp(self):
+        pass
+
+    def test_same_as_streaming(self):
+        """Buffer-backed and streamed samples give the same result."""
+        values = HR + [0, 300]
+        bulk = calculate_hr_tss(array('d', values), 165, age=40, rhr=50)
+        self.assertEqual(calculate_hr_tss(iter(values), 165, age=40, rhr=50), bulk)
+
+
+class TestHeartRateLoadStream(unittest.TestCase):
+    """Test the streaming accumulator directly."""
+
+    def test_dropouts_and_clamping(self):
+        """None adds time without load; readings above the table are clamped."""
+        stream = HeartRateLoadStream(hr_model(165)).extend([None, 300, 165.9])
+        count, hr_count, hr_sum, intensity, _, zones = stream.sums()
+        self.assertEqual((count, hr_count, hr_sum), (3, 2, 465.9))
+        self.assertAlmostEqual(intensity, ((250 - 82.5) / 82.5) ** 2 + 1.0)
+        self.assertEqual(zones[0], 1)
+        self.assertEqual(stream.duration_sec, 3.0)
+
+    def test_model_cached(self):
+        """Parameter sets are built once."""
+        self.assertIs(hr_model(170, 'karvonen', 35, 48), hr_model(170, 'karvonen', 35, 48))
+
+
+class TestHeartRateSamples(unittest.TestCase):
+    """Test reading HR channels from files."""
+
+    def test_csv_column(self):
+        """CSV files use the heart rate column."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("power,hr\n200,140\n210,\n220,150\n")
+        self.addCleanup(Path(f.name).unlink)
+        with heart_rate_samples(f.name) as (samples, rate):
+            self.assertEqual(list(samples), [140.0, None, 150.0])
+            self.assertEqual(rate, 1.0)
+
+    def test_power_stream_channel(self):
+        """A .cyps HR channel is read; one without it is an error."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'ride.cyps')
+            write_stream(path, [200] * 3, heart_rate=[140, 141, 142], sample_rate_hz=2.0)
+            with heart_rate_samples(path) as (samples, rate):
+                self.assertEqual(list(samples), [140, 141, 142])
+                self.assertEqual(rate, 2.0)
+            write_stream(path, [200] * 3)
+            with self.assertRaises(ValueError):
+                with heart_rate_samples(path):
+                    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
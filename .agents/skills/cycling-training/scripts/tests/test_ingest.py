@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Tests for ingest.py - concurrent activity ingestion.
+
+Scoring runs in a thread pool for most tests; one test checks the
+default process pool gives the same result.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import ingest
+from calculate_tss import calculate_tss_from_stream
+from fit_decoder import FIT_EPOCH_OFFSET
+from pmc import compute_pmc
+from power_stream import write_stream
+from test_fit_decoder import RECORD_FIELDS, START, definition, fit_file, ride
+
+WATTS = [200 + i % 50 for i in range(600)]
+
+
+def write_csv(path, watts) -> None:
+    with open(path, 'w') as f:
+        f.write('time,power\n')
+        f.writelines(f'{i},{w}\n' for i, w in enumerate(watts))
+
+
+def write_fit(path) -> None:
+    with open(path, 'wb') as f:
+        f.write(fit_file(definition(0, 20, RECORD_FIELDS) + ride(600)))
+
+
+def make_rides(directory) -> None:
+    """Two rides on 2026-03-02 (csv + cyps), one FIT ride, one bad file."""
+    write_csv(os.path.join(directory, '2026-03-02-morning.csv'), WATTS)
+    write_stream(os.path.join(directory, 'evening.cyps'), WATTS,
+                 start_time=1772470800)  # 2026-03-02T17:00Z
+    write_fit(os.path.join(directory, 'ride.fit'))
+    with open(os.path.join(directory, '20260303.txt'), 'w') as f:
+        f.write('not power\n')
+    with open(os.path.join(directory, 'notes.md'), 'w') as f:
+        f.write('ignored\n')
+
+
+def run(directory, **options):
+    with ThreadPoolExecutor(2) as pool:
+        return ingest.ingest_directory(directory, 250, executor=pool, workers=2, **options)
+
+
+class TestActivityDate(unittest.TestCase):
+    """Test activity date resolution."""
+
+    def test_start_time_wins(self):
+        """A start time is used as a UTC date."""
+        self.assertEqual(ingest.activity_date('2020-01-01.csv', 1772470800), date(2026, 3, 2))
+
+    def test_name_formats(self):
+        """Dates in the file name, with or without dashes."""
+        self.assertEqual(ingest.activity_date('rides/2026-03-02_zwift.csv'), date(2026, 3, 2))
+        self.assertEqual(ingest.activity_date('ride_20260302.txt'), date(2026, 3, 2))
+
+    def test_invalid_name_date_uses_mtime(self):
+        """Digits that are not a date fall back to the modification time."""
+        mtime = time.mktime((2026, 3, 4, 12, 0, 0, 0, 0, -1))
+        self.assertEqual(ingest.activity_date('2026-13-45.csv', mtime=mtime), date(2026, 3, 4))
+
+    def test_no_date(self):
+        """Nothing to go on raises ValueError."""
+        with self.assertRaises(ValueError):
+            ingest.activity_date('ride.csv')
+
+
+class TestScoreActivity(unittest.TestCase):
+    """Test scoring of in-memory activity bytes."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.expected = calculate_tss_from_stream(250, WATTS)
+
+    def read(self, name: str) -> bytes:
+        with open(os.path.join(self.tmpdir.name, name), 'rb') as f:
+            return f.read()
+
+    def test_formats_match_stream_result(self):
+        """CSV, .cyps and FIT bytes give the same TSS as the samples."""
+        write_csv(os.path.join(self.tmpdir.name, 'a.csv'), WATTS)
+        write_stream(os.path.join(self.tmpdir.name, 'a.cyps'), WATTS, start_time=1772470800)
+        write_fit(os.path.join(self.tmpdir.name, 'a.fit'))
+        for name in ('a.csv', 'a.cyps', 'a.fit'):
+            with self.subTest(name=name):
+                result = ingest.score_activity(name, self.read(name), 250, mtime=0)
+                self.assertEqual(result["tss"], self.expected["tss"])
+                self.assertEqual(result["file"], name)
+
+    def test_fit_date_from_first_record(self):
+        """FIT rides are dated by their first timestamp."""
+        write_fit(os.path.join(self.tmpdir.name, 'a.fit'))
+        result = ingest.score_activity('a.fit', self.read('a.fit'), 250)
+        start = datetime.fromtimestamp(START + FIT_EPOCH_OFFSET, timezone.utc)
+        self.assertEqual(result["date"], start.date().isoformat())
+
+    def test_bad_text(self):
+        """Non-numeric text raises ValueError."""
+        with self.assertRaises(ValueError):
+            ingest.score_activity('bad.txt', b'not power\n', 250, mtime=0)
+
+
+class TestIngest(unittest.TestCase):
+    """Test the concurrent pipeline."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        make_rides(self.tmpdir.name)
+
+    def test_activity_files(self):
+        """Only activity suffixes are picked up, sorted."""
+        names = [p.name for p in ingest.activity_files(self.tmpdir.name)]
+        self.assertEqual(names, ['2026-03-02-morning.csv', '20260303.txt', 'evening.cyps', 'ride.fit'])
+
+    def test_daily_aggregation(self):
+        """Same-day rides are summed; bad files are reported, not fatal."""
+        result = run(self.tmpdir.name)
+        tss = calculate_tss_from_stream(250, WATTS)["tss"]
+        self.assertEqual(len(result["activities"]), 3)
+        self.assertEqual(result["daily_tss"]["2026-03-02"], round(2 * tss, 1))
+        self.assertEqual(sum(result["daily_tss"].values()), round(3 * tss, 1))
+        self.assertEqual([e["file"] for e in result["errors"]],
+                         [os.path.join(self.tmpdir.name, '20260303.txt')])
+        self.assertEqual(list(result["daily_tss"]), sorted(result["daily_tss"]))
+
+    def test_feeds_pmc(self):
+        """daily_tss is a valid compute_pmc() history."""
+        daily = run(self.tmpdir.name)["daily_tss"]
+        pmc = compute_pmc(daily)
+        self.assertEqual(pmc["start_date"], date.fromisoformat(min(daily)))
+        self.assertAlmostEqual(sum(pmc["tss"]), sum(daily.values()))
+
+    def test_progress(self):
+        """progress() is called once per file, counting up to the total."""
+        calls = []
+        run(self.tmpdir.name, progress=lambda done, total, item: calls.append((done, total)))
+        self.assertEqual(calls, [(i, 4) for i in range(1, 5)])
+
+    def test_unreadable_file(self):
+        """Read errors are reported per file."""
+        paths = ingest.activity_files(self.tmpdir.name) + [Path(self.tmpdir.name, 'missing.csv')]
+        with ThreadPoolExecutor(1) as pool:
+            result = asyncio.run(ingest.ingest_files(paths, 250, executor=pool, workers=1))
+        self.assertEqual(len(result["errors"]), 2)
+        self.assertEqual(len(result["activities"]), 3)
+
+    def test_process_pool(self):
+        """The default process pool gives the same result."""
+        self.assertEqual(ingest.ingest_directory(self.tmpdir.name, 250, workers=2),
+                         run(self.tmpdir.name))
+
+    def test_invalid_concurrency(self):
+        """concurrency must be positive."""
+        with self.assertRaises(ValueError):
+            run(self.tmpdir.name, concurrency=0)
+
+    def test_invalid_ftp(self):
+        """FTP is checked before any file is scheduled."""
+        with mock.patch.object(ingest, '_read_file') as read, ThreadPoolExecutor(1) as pool, \
+                self.assertRaises(ValueError):
+            ingest.ingest_directory(self.tmpdir.name, 0, executor=pool)
+        read.assert_not_called()
+
+    def test_scorer_exception_reported(self):
+        """Any exception while scoring a file is recorded, not raised."""
+        def score(name, *args):
+            if name.endswith('.fit'):
+                raise ZeroDivisionError("float division by zero")
+            return score_activity(name, *args)
+
+        score_activity = ingest.score_activity
+        with mock.patch.object(ingest, 'score_activity', score):
+            result = run(self.tmpdir.name)
+        self.assertEqual(len(result["activities"]), 2)
+        self.assertIn({"file": os.path.join(self.tmpdir.name, 'ride.fit'),
+                       "error": "float division by zero"}, result["errors"])
+
+
+class TestBackpressure(unittest.TestCase):
+    """Test that reads are bounded and wait for slow scoring."""
+
+    def test_bounded_in_flight(self):
+        """Reads never exceed concurrency; unscored files stay bounded."""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        for i in range(20):
+            write_csv(os.path.join(tmpdir.name, f'2026-03-{i + 1:02d}.csv'), WATTS[:60])
+
+        lock = threading.Lock()
+        state = {"reading": 0, "max_reading": 0, "unscored": 0, "max_unscored": 0}
+        read_file, score_activity = ingest._read_file, ingest.score_activity
+
+        def slow_read(path):
+            with lock:
+                state["reading"] += 1
+                state["max_reading"] = max(state["max_reading"], state["reading"])
+            time.sleep(0.002)
+            try:
+                return read_file(path)
+            finally:
+                with lock:
+                    state["reading"] -= 1
+                    state["unscored"] += 1
+                    state["max_unscored"] = max(state["max_unscored"], state["unscored"])
+
+        def slow_score(*args):
+            time.sleep(0.005)
+            with lock:
+                state["unscored"] -= 1
+            return score_activity(*args)
+
+        with mock.patch.object(ingest, '_read_file', slow_read), \
+                mock.patch.object(ingest, 'score_activity', slow_score), \
+                ThreadPoolExecutor(1) as pool:
+            result = ingest.ingest_directory(tmpdir.name, 250, executor=pool, workers=1,
+                                             concurrency=3, queue_size=2)
+
+        self.assertEqual(len(result["activities"]), 20)
+        self.assertLessEqual(state["max_reading"], 3)
+        self.assertLessEqual(state["max_unscored"], 3 + 2 + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for mmp.py - Mean Maximal Power (power-duration curve).
+
+Verifies the prefix-sum sliding-window maxima against a brute-force
+search, the duration grids, and NumPy/pure-Python parity.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from mmp import duration_grid, mean_max_power
+
+SAMPLES = [(i * 37) % 400 + (150 if 100 <= i < 160 else 0) for i in range(600)]
+
+
+def brute_force_mmp(samples: list, duration: int) -> float:
+    """Reference MMP: average every window explicitly."""
+    return max(sum(samples[i:i + duration]) / duration
+               for i in range(len(samples) - duration + 1))
+
+
+class TestDurationGrid(unittest.TestCase):
+    """Test duration grid generation."""
+
+    def test_full_grid(self):
+        """Full grid is every second up to the ride length."""
+        self.assertEqual(duration_grid(5, sparse=False), [1, 2, 3, 4, 5])
+
+    def test_sparse_grid_shape(self):
+        """Sparse grid is strictly increasing and ends at the ride length."""
+        grid = duration_grid(6 * 3600 + 17)
+        self.assertEqual(grid[:3], [1, 2, 3])
+        self.assertEqual(grid[-1], 6 * 3600 + 17)
+        self.assertEqual(grid, sorted(set(grid)))
+        self.assertLess(len(grid), 700)
+
+    def test_sparse_grid_includes_key_durations(self):
+        """Common reporting durations are on the sparse grid."""
+        grid = set(duration_grid(7200))
+        for d in (5, 30, 60, 300, 1200, 3600):
+            self.assertIn(d, grid)
+
+    def test_empty_ride(self):
+        """No samples, no durations."""
+        self.assertEqual(duration_grid(0), [])
+
+
+class TestMeanMaxPower(unittest.TestCase):
+    """Test MMP computation (pure-Python fallback)."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_matches_brute_force(self):
+        """Every duration matches the brute-force best window."""
+        curve = mean_max_power(SAMPLES, sparse=False)
+        self.assertEqual(curve["durations"], list(range(1, 601)))
+        for d in (1, 5, 30, 60, 61, 299, 600):
+            with self.subTest(duration=d):
+                self.assertAlmostEqual(curve["power"][d - 1], brute_force_mmp(SAMPLES, d), places=6)
+
+    def test_one_second_is_peak_power(self):
+        """MMP at 1 s is the maximum sample."""
+        curve = mean_max_power(SAMPLES, durations=[1])
+        self.assertEqual(curve["power"], [max(SAMPLES)])
+
+    def test_full_length_is_average_power(self):
+        """MMP at the ride length is the average power."""
+        curve = mean_max_power(SAMPLES, durations=[600])
+        self.assertAlmostEqual(curve["power"][0], sum(SAMPLES) / 600)
+
+    def test_durations_longer_than_ride_dropped(self):
+        """Requested durations beyond the ride are ignored."""
+        curve = mean_max_power([100] * 10, durations=[5, 20])
+        self.assertEqual(curve["durations"], [5])
+
+    def test_sample_rate(self):
+        """At 2 Hz a 5 s duration spans 10 samples."""
+        curve = mean_max_power(SAMPLES, durations=[5], sample_rate_hz=2)
+        self.assertAlmostEqual(curve["power"][0], brute_force_mmp(SAMPLES, 10))
+
+    def test_dropouts_count_as_zero(self):
+        """None samples are 0 W."""
+        curve = mean_max_power([100, None, 100], durations=[3])
+        self.assertAlmostEqual(curve["power"][0], 200 / 3)
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestMeanMaxPowerNumpy(TestMeanMaxPower):
+    """Run the MMP tests against the NumPy implementation."""
+
+    def setUp(self):
+        pass
+
+    def test_accepts_ndarray(self):
+        """NumPy arrays are used directly."""
+        numpy = _optional.numpy()
+        curve = mean_max_power(numpy.array(SAMPLES, dtype=float), durations=[60])
+        self.assertAlmostEqual(curve["power"][0], brute_force_mmp(SAMPLES, 60))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
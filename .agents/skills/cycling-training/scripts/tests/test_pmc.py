@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Tests for pmc.py - Performance Management Chart engine.
+
+Verifies the exact CTL/ATL EWMA recurrence, TSB and ramp rate series,
+gap handling in dated input, and the hand-off to analyze_week().
+"""
+
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from analyze_week import analyze_week, calculate_monotony_strain
+from pmc import (
+    LoadState,
+    analyze_pmc_week,
+    compute_pmc,
+    compute_pmc_matrix,
+    daily_series,
+    load_checkpoint,
+    read_daily_tss,
+    save_checkpoint,
+    verify_checkpoint,
+)
+
+START = date(2026, 1, 1)
+
+
+def dated(values: list, start: date = START) -> list:
+    """Turn a list of daily TSS values into (date, tss) pairs."""
+    return [(start + timedelta(days=i), v) for i, v in enumerate(values)]
+
+
+class TestDailySeries(unittest.TestCase):
+    """Test normalization of dated TSS input."""
+
+    def test_gaps_filled_with_zero(self):
+        """Missing days count as rest days."""
+        start, series = daily_series({"2026-01-01": 50, "2026-01-04": 80})
+        self.assertEqual(start, START)
+        self.assertEqual(series, [50.0, 0.0, 0.0, 80.0])
+
+    def test_same_day_entries_summed(self):
+        """Two rides on one day add up."""
+        _, series = daily_series([("2026-01-01", 50), ("2026-01-01", 30)])
+        self.assertEqual(series, [80.0])
+
+    def test_unsorted_input(self):
+        """Entries may arrive in any order."""
+        start, series = daily_series([(date(2026, 1, 3), 30), (START, 10)])
+        self.assertEqual(start, START)
+        self.assertEqual(series, [10.0, 0.0, 30.0])
+
+    def test_empty_history_rejected(self):
+        """An empty history raises ValueError."""
+        with self.assertRaises(ValueError):
+            daily_series([])
+
+
+class TestComputePMC(unittest.TestCase):
+    """Test the CTL/ATL/TSB/ramp series."""
+
+    def test_first_day_from_zero(self):
+        """Day one: CTL = TSS/42, ATL = TSS/7."""
+        pmc = compute_pmc(dated([84]))
+        self.assertAlmostEqual(pmc["ctl"][0], 2.0)
+        self.assertAlmostEqual(pmc["atl"][0], 12.0)
+        self.assertAlmostEqual(pmc["tsb"][0], -10.0)
+
+    def test_steady_load_converges(self):
+        """Constant daily TSS drives CTL and ATL to that value."""
+        pmc = compute_pmc(dated([60] * 730))
+        self.assertAlmostEqual(pmc["ctl"][-1], 60.0, places=3)
+        self.assertAlmostEqual(pmc["atl"][-1], 60.0, places=6)
+        self.assertAlmostEqual(pmc["tsb"][-1], 0.0, places=3)
+
+    def test_seeded_rest_decays(self):
+        """Rest from a seeded state decays CTL by (41/42) per day."""
+        pmc = compute_pmc(dated([0] * 7), ctl=70, atl=90)
+        self.assertAlmostEqual(pmc["ctl"][-1], 70 * (41 / 42) ** 7)
+        self.assertAlmostEqual(pmc["atl"][-1], 90 * (6 / 7) ** 7)
+
+    def test_ramp_rate_is_seven_day_ctl_change(self):
+        """Ramp rate compares CTL with the value 7 days earlier."""
+        pmc = compute_pmc(dated([50, 90, 0, 70, 100, 60, 0] * 4), ctl=40)
+        self.assertAlmostEqual(pmc["ramp_rate"][6], pmc["ctl"][6] - 40)
+        self.assertAlmostEqual(pmc["ramp_rate"][20], pmc["ctl"][20] - pmc["ctl"][13])
+
+    def test_series_lengths_and_dates(self):
+        """All series cover every day from the first to the last entry."""
+        pmc = compute_pmc({"2026-01-01": 50, "2026-01-10": 80})
+        for key in ("dates", "tss", "ctl", "atl", "tsb", "ramp_rate"):
+            self.assertEqual(len(pmc[key]), 10, key)
+        self.assertEqual(pmc["dates"][-1], date(2026, 1, 10))
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestComputePMCMatrix(unittest.TestCase):
+    """Test the roster-wide vectorized PMC."""
+
+    def test_rows_match_single_series(self):
+        """Each row matches compute_pmc() on that series."""
+        rows = [[(d * 17 + a * 31) % 150 for d in range(120)] for a in range(4)]
+        matrix = compute_pmc_matrix(rows, ctl=[10, 20, 30, 40], atl=15)
+        for a, row in enumerate(rows):
+            pmc = compute_pmc(dated(row), ctl=10 * (a + 1), atl=15)
+            self.assertAlmostEqual(matrix["ctl"][a, -1], pmc["ctl"][-1], places=9)
+            self.assertAlmostEqual(matrix["tsb"][a, 50], pmc["tsb"][50], places=9)
+
+
+class TestAnalyzePMCWeek(unittest.TestCase):
+    """Test running analyze_week() on a PMC week."""
+
+    def setUp(self):
+        self.daily = [(d * 23) % 120 for d in range(60)]
+        self.pmc = compute_pmc(dated(self.daily))
+
+    def test_default_is_last_week(self):
+        """Without a date the final 7 days are analyzed."""
+        result = analyze_pmc_week(self.pmc)
+        expected = analyze_week(sum(self.daily[-7:]),
+                                round(self.pmc["ctl"][-1], 1), round(self.pmc["atl"][-1], 1),
+                                prev_week_tss=sum(self.daily[-14:-7]),
+                                daily_tss=[float(v) for v in self.daily[-7:]],
+                                ramp_rate=self.pmc["ramp_rate"][-1])
+        self.assertEqual(result, expected)
+
+    def test_exact_ramp_rate(self):
+        """The week reports the PMC's 7-day CTL change, not the estimate."""
+        pmc = compute_pmc(dated([60] * 60 + [110] * 7), ctl=60, atl=60)
+        result = analyze_pmc_week(pmc)
+        self.assertEqual(result["metrics"]["ramp_rate"], round(pmc["ramp_rate"][-1], 1))
+        self.assertEqual(result["status"]["ramp"]["status"], "AGGRESSIVE")  # Estimate: EXCESSIVE
+        self.assertFalse(any("Ramp rate" in w["message"] for w in result["warnings"]))
+        state = LoadState.from_pmc(pmc, ctl=60, atl=60)
+        self.assertEqual(state.analyze_week()["metrics"]["ramp_rate"], result["metrics"]["ramp_rate"])
+
+    def test_specific_week(self):
+        """A week ending mid-history uses that week's CTL/ATL."""
+        result = analyze_pmc_week(self.pmc, START + timedelta(days=20))
+        self.assertEqual(result["input"]["weekly_tss"], sum(self.daily[14:21]))
+        self.assertEqual(result["input"]["ctl"], round(self.pmc["ctl"][20], 1))
+
+    def test_first_week_has_no_previous_week(self):
+        """The first week has no week-over-week comparison."""
+        result = analyze_pmc_week(self.pmc, START + timedelta(days=3))
+        self.assertNotIn("week_over_week_change", result["metrics"])
+        self.assertEqual(result["input"]["weekly_tss"], sum(self.daily[:4]))
+
+    def test_out_of_range_week_rejected(self):
+        """Weeks outside the history raise ValueError."""
+        with self.assertRaises(ValueError):
+            analyze_pmc_week(self.pmc, START - timedelta(days=1))
+
+
+class TestLoadState(unittest.TestCase):
+    """Test incremental PMC checkpointing."""
+
+    def setUp(self):
+        self.history = dated([(d * 23) % 120 for d in range(100)])
+
+    def test_incremental_matches_full_recompute(self):
+        """Appending day by day ends where compute_pmc() ends."""
+        state = LoadState(ctl=40, atl=45)
+        for day, tss in self.history:
+            state.advance(day, tss)
+        pmc = compute_pmc(self.history, ctl=40, atl=45)
+        self.assertAlmostEqual(state.ctl, pmc["ctl"][-1], places=9)
+        self.assertAlmostEqual(state.atl, pmc["atl"][-1], places=9)
+        self.assertAlmostEqual(state.ramp_rate, pmc["ramp_rate"][-1], places=9)
+        self.assertEqual(list(state.daily), pmc["tss"][-7:])
+
+    def test_resume_from_pmc_checkpoint(self):
+        """A checkpoint built from a PMC continues exactly."""
+        state = LoadState.from_pmc(compute_pmc(self.history[:60]))
+        for day, tss in self.history[60:]:
+            state.advance(day, tss)
+        self.assertTrue(verify_checkpoint(state, self.history)["ok"])
+
+    def test_gap_days_are_rest_days(self):
+        """Skipping dates fills rest days."""
+        state = LoadState()
+        state.advance(START, 100)
+        state.advance(START + timedelta(days=3), 50)
+        pmc = compute_pmc([(START, 100), (START + timedelta(days=3), 50)])
+        self.assertAlmostEqual(state.ctl, pmc["ctl"][-1], places=12)
+        self.assertEqual(list(state.daily), [100.0, 0.0, 0.0, 50.0])
+
+    def test_same_day_adds_second_ride(self):
+        """Two appends on one date equal one day with the summed TSS."""
+        state = LoadState.from_pmc(compute_pmc(self.history))
+        next_day = self.history[-1][0] + timedelta(days=1)
+        state.advance(next_day, 60)
+        state.advance(next_day, 40)
+        self.assertTrue(verify_checkpoint(state, self.history + [(next_day, 100)])["ok"])
+
+    def test_past_date_rejected(self):
+        """Dates before the checkpoint need a full recompute."""
+        state = LoadState.from_pmc(compute_pmc(self.history))
+        with self.assertRaises(ValueError):
+            state.advance(START, 50)
+
+    def test_verify_detects_mismatch(self):
+        """Verification fails when the history differs from what was appended."""
+        state = LoadState.from_pmc(compute_pmc(self.history))
+        altered = self.history[:-1] + [(self.history[-1][0], 500)]
+        report = verify_checkpoint(state, altered)
+        self.assertFalse(report["ok"])
+        self.assertGreater(report["ctl_error"], 0)
+
+    def test_monotony_uses_seven_day_window(self):
+        """Monotony comes from the rolling 7-day window."""
+        state = LoadState.from_pmc(compute_pmc(self.history))
+        self.assertEqual(state.monotony_strain(),
+                         calculate_monotony_strain([float(t) for _, t in self.history[-7:]]))
+
+    def test_analyze_week_matches_pmc_week(self):
+        """Week analysis from the state equals analyze_pmc_week() without WoW."""
+        pmc = compute_pmc(self.history)
+        result = LoadState.from_pmc(pmc).analyze_week(prev_week_tss=sum(pmc["tss"][-14:-7]))
+        self.assertEqual(result, analyze_pmc_week(pmc))
+
+    def test_checkpoint_round_trip(self):
+        """save_checkpoint()/load_checkpoint() preserve the state."""
+        state = LoadState.from_pmc(compute_pmc(self.history), ctl=5, atl=6)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "state.json")
+            save_checkpoint(state, path)
+            restored = load_checkpoint(path)
+        self.assertEqual(restored.to_dict(), state.to_dict())
+
+
+class TestReadDailyTSS(unittest.TestCase):
+    """Test parsing of 'date,tss' files."""
+
+    def test_reads_csv_with_header(self):
+        """Header row is skipped; rows become (date, tss) pairs."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("date,tss\n2026-01-01,55\n\n2026-01-02,70.5\n")
+        self.addCleanup(Path(f.name).unlink)
+        self.assertEqual(read_daily_tss(f.name), [(START, 55.0), (date(2026, 1, 2), 70.5)])
+
+    def test_header_after_comments(self):
+        """The header may follow blank and comment lines."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("# exported 2026-01-03\n\ndate,tss\n2026-01-01,55\n")
+        self.addCleanup(Path(f.name).unlink)
+        self.assertEqual(read_daily_tss(f.name), [(START, 55.0)])
+
+    def test_bad_first_row_raises(self):
+        """A first row with a date is data, so a bad TSS is reported, not skipped."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("# history\n2026-01-01,abc\n2026-01-02,70\n")
+        self.addCleanup(Path(f.name).unlink)
+        with self.assertRaisesRegex(ValueError, ':2: expected'):
+            read_daily_tss(f.name)
+
+    def test_bad_row_raises(self):
+        """Malformed rows after the header raise ValueError."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("2026-01-01,55\nnot-a-date,1\n")
+        self.addCleanup(Path(f.name).unlink)
+        with self.assertRaises(ValueError):
+            read_daily_tss(f.name)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tests for power_stream.py - binary power-stream format.
+
+Verifies write/read round trips, zero-copy memory-mapped channel views,
+header validation, and that NP/TSS/zone functions accept the views.
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from calculate_tss import calculate_tss_from_stream, normalized_power
+from calculate_zones import time_in_zone
+from power_stream import (
+    HEADER,
+    PowerStream,
+    is_power_stream,
+    power_samples,
+    write_stream,
+)
+
+WATTS = [(i * 37) % 400 for i in range(1800)]
+
+
+class StreamFileTestCase(unittest.TestCase):
+    """Provide a temporary directory for stream files."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def path(self, name: str = 'ride.cyps') -> str:
+        return str(self.dir / name)
+
+
+class TestRoundTrip(StreamFileTestCase):
+    """Test writing and mapping streams."""
+
+    def test_power_only(self):
+        """Power samples round-trip exactly."""
+        path = self.path()
+        self.assertEqual(write_stream(path, WATTS, sample_rate_hz=1, start_time=1767261600), 1800)
+        with PowerStream(path) as stream:
+            self.assertEqual(stream.count, 1800)
+            self.assertEqual(stream.sample_rate_hz, 1.0)
+            self.assertEqual(stream.start_time, 1767261600)
+            self.assertEqual(list(stream.watts), WATTS)
+            self.assertIsNone(stream.heart_rate)
+            self.assertIsNone(stream.cadence)
+            self.assertEqual(stream.duration_sec, 1800)
+
+    def test_all_channels(self):
+        """HR and cadence are stored as bytes alongside power."""
+        path = self.path()
+        write_stream(path, [200, 210, 220], heart_rate=[140, 141, 142], cadence=[90, 91, 92])
+        with PowerStream(path) as stream:
+            self.assertEqual(list(stream.heart_rate), [140, 141, 142])
+            self.assertEqual(list(stream.cadence), [90, 91, 92])
+
+    def test_file_size_is_compact(self):
+        """2 bytes per power sample plus 1 per HR sample after the header."""
+        path = self.path()
+        write_stream(path, WATTS, heart_rate=[150] * len(WATTS))
+        self.assertEqual(Path(path).stat().st_size, HEADER.size + 3 * len(WATTS))
+
+    def test_values_rounded_and_clamped(self):
+        """Watts round to integers; None/negative become 0; HR clamps to 255."""
+        path = self.path()
+        write_stream(path, [199.6, None, -5, 70000], heart_rate=[300, None, 60, 0])
+        with PowerStream(path) as stream:
+            self.assertEqual(list(stream.watts), [200, 0, 0, 65535])
+            self.assertEqual(list(stream.heart_rate), [255, 0, 60, 0])
+
+    def test_channel_length_mismatch(self):
+        """Channels must have the same number of samples."""
+        with self.assertRaises(ValueError):
+            write_stream(self.path(), [1, 2, 3], heart_rate=[1, 2])
+
+    def test_views_are_zero_copy_memoryviews(self):
+        """Channels are memoryviews over the mapping, not copies."""
+        path = self.path()
+        write_stream(path, WATTS)
+        with PowerStream(path) as stream:
+            self.assertIsInstance(stream.watts, memoryview)
+            self.assertEqual(stream.watts.format, 'H')
+            self.assertEqual(stream.watts.nbytes, 2 * len(WATTS))
+
+
+class TestValidation(StreamFileTestCase):
+    """Test header validation."""
+
+    def test_is_power_stream(self):
+        """Only files with the magic bytes are detected."""
+        path = self.path()
+        write_stream(path, WATTS)
+        text = self.path('ride.csv')
+        Path(text).write_text("100\n200\n")
+        self.assertTrue(is_power_stream(path))
+        self.assertFalse(is_power_stream(text))
+        self.assertFalse(is_power_stream(self.path('missing.cyps')))
+
+    def test_bad_magic(self):
+        """Non-stream files are rejected."""
+        path = self.path()
+        Path(path).write_bytes(b'X' * 64)
+        with self.assertRaises(ValueError):
+            PowerStream(path)
+
+    def test_truncated_channel(self):
+        """A file shorter than its header claims is rejected."""
+        path = self.path()
+        write_stream(path, WATTS)
+        data = Path(path).read_bytes()
+        Path(path).write_bytes(data[:-10])
+        with self.assertRaises(ValueError):
+            PowerStream(path)
+
+    def test_empty_file(self):
+        """Empty files are rejected."""
+        path = self.path()
+        Path(path).write_bytes(b'')
+        with self.assertRaises(ValueError):
+            PowerStream(path)
+
+
+class TestConsumers(StreamFileTestCase):
+    """Test that NP, TSS and zone functions accept mapped views (pure Python)."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.file = self.path()
+        write_stream(self.file, WATTS)
+
+    def test_normalized_power(self):
+        """NP from the view equals NP from the list."""
+        with PowerStream(self.file) as stream:
+            self.assertAlmostEqual(normalized_power(stream.watts), normalized_power(WATTS), places=9)
+
+    def test_tss(self):
+        """TSS from the view equals TSS from the list."""
+        with PowerStream(self.file) as stream:
+            self.assertEqual(calculate_tss_from_stream(250, stream.watts),
+                             calculate_tss_from_stream(250, WATTS))
+
+    def test_time_in_zone(self):
+        """Time in zone from the view equals the list result."""
+        with PowerStream(self.file) as stream:
+            self.assertEqual(time_in_zone(stream.watts, 250), time_in_zone(WATTS, 250))
+
+    def test_power_samples_helper(self):
+        """power_samples() maps binary files and parses text files."""
+        text = self.path('ride.txt')
+        Path(text).write_text("\n".join(map(str, WATTS)))
+        with power_samples(self.file) as (binary, _), power_samples(text) as (parsed, _):
+            self.assertEqual(list(binary), [float(w) for w in parsed])
+
+    def test_power_samples_rate(self):
+        """The .cyps header rate is used unless a rate is given."""
+        write_stream(self.file, WATTS, sample_rate_hz=2.0)
+        with power_samples(self.file) as (_, rate):
+            self.assertEqual(rate, 2.0)
+        with power_samples(self.file, 4.0) as (_, rate):
+            self.assertEqual(rate, 4.0)
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestConsumersNumpy(TestConsumers):
+    """Run the consumer tests with the vectorized NumPy paths."""
+
+    def setUp(self):
+        StreamFileTestCase.setUp(self)
+        self.file = self.path()
+        write_stream(self.file, WATTS)
+
+    def test_numpy_channel(self):
+        """numpy_channel() is a uint16 view of the power samples."""
+        with PowerStream(self.file) as stream:
+            watts = stream.numpy_channel('watts')
+            self.assertEqual(watts.dtype.name, 'uint16')
+            self.assertEqual(watts.tolist(), WATTS)
+
+    def test_numpy_channel_outlives_close(self):
+        """An array still referenced when the stream closes stays valid."""
+        with PowerStream(self.file) as stream:
+            watts = stream.numpy_channel('watts')
+        self.assertIsNone(stream.watts)
+        self.assertEqual(watts.tolist(), WATTS)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
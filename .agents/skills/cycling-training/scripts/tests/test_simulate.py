@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for simulate.py - forward load simulation of candidate plans.
+
+Projected trajectories are checked against compute_pmc() and every
+projected week against analyze_week(); the pure-Python and NumPy backends
+run the same tests.
+"""
+
+import math
+import random
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from analyze_week import ACWR_STATUS, RAMP_STATUS, TSB_STATUS
+from pmc import analyze_pmc_week, compute_pmc
+from simulate import (
+    DEFAULT_PATTERN,
+    WEEKLY_KEYS,
+    expand_weekly_tss,
+    read_plans,
+    simulate_plans,
+    week_analysis,
+)
+
+random.seed(7)
+PLANS = [[random.choice([0, 0, 40, 60, 90, 150, 220, 320]) for _ in range(28)] for _ in range(6)]
+PLANS.append([60] * 28)  # Uniform: infinite monotony
+
+
+def cell(result: dict, key: str, plan: int, week: int):
+    value = result["weekly"][key][plan][week]
+    value = value.item() if hasattr(value, 'item') else value
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+class TestSimulate(unittest.TestCase):
+    """Test plan simulation with the pure-Python backend."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_trajectory_matches_pmc(self):
+        """Daily CTL/ATL/TSB equal compute_pmc() seeded with current load."""
+        result = simulate_plans(PLANS, ctl=60, atl=55)
+        start = date(2026, 3, 2)
+        for p, plan in enumerate(PLANS):
+            pmc = compute_pmc([(start + timedelta(days=i), tss) for i, tss in enumerate(plan)], 60, 55)
+            for key in ("ctl", "atl", "tsb"):
+                self.assertEqual(list(result["daily"][key][p]), pmc[key])
+
+    def test_weeks_match_analyze_week(self):
+        """Each projected week is analyze_pmc_week() of the same days."""
+        result = simulate_plans(PLANS, ctl=60, atl=55)
+        start = date(2026, 3, 2)
+        for p, plan in enumerate(PLANS):
+            pmc = compute_pmc([(start + timedelta(days=i), tss) for i, tss in enumerate(plan)], 60, 55)
+            for w in range(4):
+                expected = analyze_pmc_week(pmc, start + timedelta(days=7 * w + 6))
+                levels = [x["level"] for x in expected["warnings"]]
+                with self.subTest(plan=p, week=w):
+                    self.assertEqual(week_analysis(result, PLANS, p, w), expected)
+                    self.assertEqual(cell(result, "tsb", p, w), expected["metrics"]["tsb"])
+                    self.assertEqual(cell(result, "acwr", p, w), expected["metrics"]["acwr"])
+                    self.assertEqual(cell(result, "monotony", p, w), expected["metrics"]["monotony"])
+                    self.assertEqual(cell(result, "strain", p, w), expected["metrics"]["strain"])
+                    self.assertEqual(cell(result, "week_over_week_change", p, w),
+                                     expected["metrics"].get("week_over_week_change"))
+                    self.assertEqual(TSB_STATUS.statuses[cell(result, "tsb_status", p, w)],
+                                     expected["status"]["tsb"])
+                    self.assertEqual(ACWR_STATUS.statuses[cell(result, "acwr_status", p, w)],
+                                     expected["status"]["acwr"])
+                    self.assertEqual(cell(result, "ramp_rate", p, w), expected["metrics"]["ramp_rate"])
+                    self.assertEqual(RAMP_STATUS.statuses[cell(result, "ramp_status", p, w)],
+                                     expected["status"]["ramp"])
+                    self.assertEqual(cell(result, "high_warnings", p, w), levels.count("high"))
+                    self.assertEqual(cell(result, "moderate_warnings", p, w), levels.count("moderate"))
+
+    def test_week_over_week(self):
+        """The first week compares with prev_week_tss, or has no change."""
+        plan = expand_weekly_tss([400, 500])
+        self.assertIsNone(cell(simulate_plans(plan), "week_over_week_change", 0, 0))
+        result = simulate_plans(plan, prev_week_tss=320)
+        self.assertEqual(cell(result, "week_over_week_change", 0, 0), 25.0)
+        self.assertEqual(cell(result, "week_over_week_change", 0, 1), 25.0)
+        self.assertEqual(cell(result, "moderate_warnings", 0, 0), 1)
+
+    def test_ctl_change(self):
+        """ctl_change is the projected CTL gain over each week."""
+        result = simulate_plans(PLANS[:1], ctl=60, atl=55)
+        ctl = result["daily"]["ctl"][0]
+        self.assertAlmostEqual(cell(result, "ctl_change", 0, 0), ctl[6] - 60)
+        self.assertAlmostEqual(cell(result, "ctl_change", 0, 1), ctl[13] - ctl[6])
+
+    def test_uniform_week(self):
+        """Identical days give infinite monotony and a high warning."""
+        result = simulate_plans(PLANS[-1:], ctl=60, atl=60)
+        self.assertEqual(cell(result, "monotony", 0, 0), float('inf'))
+        self.assertEqual(cell(result, "high_warnings", 0, 0), 1)
+
+    def test_shapes(self):
+        """A single plan is one row; every weekly key is plans × weeks."""
+        result = simulate_plans(PLANS[0])
+        self.assertEqual(len(result["daily"]["ctl"]), 1)
+        self.assertEqual(set(result["weekly"]), set(WEEKLY_KEYS))
+        self.assertEqual(len(result["weekly"]["weekly_tss"][0]), 4)
+
+    def test_invalid_plans(self):
+        """Partial weeks and ragged plans are rejected."""
+        for plans in ([0] * 10, [], [[0] * 7, [0] * 14]):
+            with self.subTest(plans=plans), self.assertRaises(ValueError):
+                simulate_plans(plans)
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestSimulateNumpy(TestSimulate):
+    """Same tests with the vectorized simulation."""
+
+    def setUp(self):
+        pass
+
+    def test_same_as_pure_python(self):
+        """Both backends give the same weekly results."""
+        vectorized = simulate_plans(PLANS, ctl=60, atl=55, prev_week_tss=400)
+        with mock.patch.dict(_optional._modules, {'numpy': None}):
+            pure = simulate_plans(PLANS, ctl=60, atl=55, prev_week_tss=400)
+        for key in WEEKLY_KEYS:
+            for p in range(len(PLANS)):
+                for w in range(4):
+                    with self.subTest(key=key, plan=p, week=w):
+                        self.assertAlmostEqual(cell(vectorized, key, p, w), cell(pure, key, p, w))
+
+
+class TestPlans(unittest.TestCase):
+    """Test plan construction and parsing."""
+
+    def test_expand_weekly_tss(self):
+        """Weekly targets are spread by the pattern and keep their totals."""
+        daily = expand_weekly_tss([353, 706])
+        self.assertEqual(daily[:7], [float(x) for x in DEFAULT_PATTERN])
+        self.assertAlmostEqual(sum(daily[7:]), 706)
+        with self.assertRaises(ValueError):
+            expand_weekly_tss([400], (1, 1, 1))
+
+    def test_read_plans(self):
+        """Rows may start with a name; unnamed plans are numbered."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("# plans\nbase," + ",".join(["50"] * 7) + "\n" + ",".join(["60"] * 7) + "\n")
+        self.addCleanup(Path(f.name).unlink)
+        names, rows = read_plans(f.name)
+        self.assertEqual(names, ['base', 'plan 2'])
+        self.assertEqual(rows[1], [60.0] * 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
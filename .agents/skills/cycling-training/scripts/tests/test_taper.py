@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for taper.py - taper plan search.
+
+The chosen plan is replayed through compute_pmc() and checked against the
+target band and limits; the pure-Python and NumPy backends run the same
+tests.
+"""
+
+import sys
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from pmc import compute_pmc
+from taper import _evaluate_pure, candidate_grid, optimize_taper, taper_plan, tsb_range
+
+
+def replay(plan: list, ctl: float, atl: float) -> dict:
+    start = date(2026, 5, 1)
+    return compute_pmc([(start + timedelta(days=i), tss) for i, tss in enumerate(plan)], ctl, atl)
+
+
+class TestOptimizeTaper(unittest.TestCase):
+    """Test the taper search with the pure-Python backend."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reaches_target(self):
+        """The chosen plan replays to a race-day TSB inside the band."""
+        result = optimize_taper(85, 90, 21, 10, 20)
+        self.assertTrue(result["target_met"])
+        pmc = replay(result["daily_tss"], 85, 90)
+        self.assertGreaterEqual(pmc["tsb"][-1], 10 - 0.05)
+        self.assertLessEqual(pmc["tsb"][-1], 20 + 0.05)
+        self.assertAlmostEqual(result["ctl"], pmc["ctl"][-1], places=1)
+        self.assertAlmostEqual(result["ctl_loss"], 85 - pmc["ctl"][-1], places=1)
+        self.assertEqual(len(result["daily_tss"]), 21)
+
+    def test_keeps_most_fitness(self):
+        """No other in-band candidate ends with more CTL."""
+        result = optimize_taper(70, 75, 14, 10, 20)
+        best = 70 - result["ctl_loss"]
+        for candidate in candidate_grid(14)[::37]:
+            pmc = replay(taper_plan(70, 14, *candidate), 70, 75)
+            if 10 <= pmc["tsb"][-1] <= 20:
+                self.assertLessEqual(round(pmc["ctl"][-1], 1), best)
+
+    def test_respects_limits(self):
+        """ACWR and 7-day ramp stay within the limits on every day."""
+        result = optimize_taper(60, 40, 21, baseline=80, max_acwr=1.2, max_ramp=5)
+        pmc = replay(result["daily_tss"], 60, 40)
+        self.assertLessEqual(max(a / c for a, c in zip(pmc["atl"], pmc["ctl"])), 1.2)
+        self.assertLessEqual(max(pmc["ramp_rate"]), 5)
+        self.assertLessEqual(result["max_acwr"], 1.2)
+        self.assertLessEqual(result["feasible"], result["evaluated"])
+
+    def test_unreachable_target(self):
+        """An out-of-reach band returns the closest plan, not a failure."""
+        result = optimize_taper(85, 90, 5, 40, 50)
+        self.assertFalse(result["target_met"])
+        self.assertLess(result["tsb"], 40)
+        self.assertEqual(result["reduction"], 0.9)
+
+    def test_no_feasible_plan(self):
+        """Limits that every candidate breaks raise ValueError."""
+        with self.assertRaises(ValueError):
+            optimize_taper(50, 80, 14, max_acwr=1.0)
+
+    def test_invalid_arguments(self):
+        """Too few days or an inverted band are rejected."""
+        with self.assertRaises(ValueError):
+            optimize_taper(85, 90, 2)
+        with self.assertRaises(ValueError):
+            optimize_taper(85, 90, 14, 20, 10)
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestOptimizeTaperNumpy(TestOptimizeTaper):
+    """Same tests with the vectorized search."""
+
+    def setUp(self):
+        pass
+
+    def test_same_as_pure_python(self):
+        """Both backends choose the same taper."""
+        vectorized = optimize_taper(85, 90, 21, baseline=95)
+        with mock.patch.dict(_optional._modules, {'numpy': None}):
+            self.assertEqual(optimize_taper(85, 90, 21, baseline=95), vectorized)
+
+
+class TestTaperPlans(unittest.TestCase):
+    """Test candidate construction."""
+
+    def test_plan_shape(self):
+        """Days before the taper are at baseline; the taper cuts volume."""
+        plan = taper_plan(100, 14, 7, 0.5, 'step', 0)
+        self.assertEqual(plan[:7], [100.0] * 7)
+        self.assertEqual(plan[7:], [50.0] * 7)
+        linear = taper_plan(100, 7, 7, 0.7, 'linear', 0)
+        self.assertAlmostEqual(linear[-1], 30.0)
+        self.assertEqual(linear, sorted(linear, reverse=True))
+
+    def test_intensity_days_keep_volume(self):
+        """Intensity days redistribute a taper week without adding TSS."""
+        easy = taper_plan(100, 7, 7, 0.4, 'step', 0)
+        hard = taper_plan(100, 7, 7, 0.4, 'step', 2)
+        self.assertAlmostEqual(sum(hard), sum(easy))
+        self.assertEqual(hard[3], 2 * hard[-1])
+
+    def test_tsb_range(self):
+        """Status names map to their TSB_STATUS bands."""
+        self.assertEqual(tsb_range("FRESH"), (5, 25))
+        with self.assertRaises(ValueError):
+            tsb_range("RESTED")
+
+    def test_grid_capped_by_days(self):
+        """Tapers never start before the plan does."""
+        self.assertEqual(max(c[0] for c in candidate_grid(10)), 10)
+
+
+class TestTargetBand(unittest.TestCase):
+    """Test that the target band matches TSB_STATUS classification."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_upper_bound_excluded(self):
+        """A race-day TSB exactly on tsb_high misses the band."""
+        plan = taper_plan(85, 21, 7, 0.5, 'step', 0)
+        race_ctl, race_atl, _, _ = next(iter(_evaluate_pure([plan], 85, 90)))
+        edge = race_ctl - race_atl
+        self.assertFalse(optimize_taper(85, 90, 21, edge - 1e-9, edge)["target_met"])
+        self.assertTrue(optimize_taper(85, 90, 21, edge, edge + 1e-9)["target_met"])
+
+    def test_met_target_has_band_status(self):
+        """A met status band is the status analyze_week() reports."""
+        for name in ("NEUTRAL", "FRESH"):
+            result = optimize_taper(85, 90, 21, *tsb_range(name))
+            with self.subTest(status=name):
+                self.assertTrue(result["target_met"])
+                self.assertEqual(result["tsb_status"]["status"], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for wbal.py - W' balance (Skiba differential model).
+
+Verifies depletion above CP, exponential recovery below CP, summary
+metrics, and agreement between the streaming and vectorized forms.
+"""
+
+import math
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import _optional
+from wbal import WbalStream, wbal_series, wbal_summary
+
+CP = 250
+W_PRIME = 20000
+
+# 5 × (2 min @ 300 W, 3 min @ 150 W), then 10 min easy
+INTERVALS = ([300] * 120 + [150] * 180) * 5 + [100] * 600
+
+
+class TestWbalStream(unittest.TestCase):
+    """Test the streaming W'bal calculator."""
+
+    def test_starts_full(self):
+        """W'bal starts at W'."""
+        self.assertEqual(WbalStream(CP, W_PRIME).wbal, W_PRIME)
+
+    def test_depletion_above_cp(self):
+        """60 s at CP+100 W spends 6000 J."""
+        stream = WbalStream(CP, W_PRIME)
+        for _ in range(60):
+            stream.add(CP + 100)
+        self.assertAlmostEqual(stream.wbal, W_PRIME - 6000)
+
+    def test_at_cp_no_change(self):
+        """Riding exactly at CP neither depletes nor recovers."""
+        stream = WbalStream(CP, W_PRIME)
+        stream.add(CP + 100)
+        stream.add(CP)
+        self.assertAlmostEqual(stream.wbal, W_PRIME - 100)
+
+    def test_exponential_recovery_below_cp(self):
+        """Below CP the deficit decays by exp(-(CP-P)t/W')."""
+        stream = WbalStream(CP, W_PRIME)
+        for _ in range(60):
+            stream.add(CP + 100)
+        for _ in range(120):
+            stream.add(CP - 50)
+        expected_deficit = 6000 * math.exp(-50 * 120 / W_PRIME)
+        self.assertAlmostEqual(stream.wbal, W_PRIME - expected_deficit, places=6)
+
+    def test_minimum_and_time_below(self):
+        """Minimum and time below thresholds are tracked."""
+        stream = WbalStream(CP, 10000, thresholds=(0.5, 0.0))
+        for _ in range(150):
+            stream.add(CP + 100)  # 15000 J: goes negative
+        self.assertAlmostEqual(stream.minimum, -5000)
+        below = stream.time_below()
+        self.assertEqual(below[0.5], 100)  # W'bal < 5000 J from second 51
+        self.assertEqual(below[0.0], 50)   # W'bal < 0 J from second 101
+
+    def test_sample_rate(self):
+        """At 2 Hz each sample is half a second."""
+        stream = WbalStream(CP, W_PRIME, sample_rate_hz=2)
+        for _ in range(120):
+            stream.add(CP + 100)
+        self.assertAlmostEqual(stream.wbal, W_PRIME - 6000)
+
+    def test_invalid_parameters(self):
+        """CP and W' must be positive."""
+        with self.assertRaises(ValueError):
+            WbalStream(0, W_PRIME)
+        with self.assertRaises(ValueError):
+            WbalStream(CP, -1)
+
+
+class TestWbalSummary(unittest.TestCase):
+    """Test W'bal series and summaries (pure-Python fallback)."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(_optional._modules, {'numpy': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_series_matches_stream(self):
+        """The bulk series equals sample-by-sample streaming."""
+        stream = WbalStream(CP, W_PRIME, thresholds=())
+        expected = [stream.add(w) for w in INTERVALS]
+        series = wbal_series(INTERVALS, CP, W_PRIME)
+        self.assertEqual(len(series), len(INTERVALS))
+        for i in range(0, len(INTERVALS), 97):
+            self.assertAlmostEqual(float(series[i]), expected[i], places=6)
+
+    def test_summary(self):
+        """Summary reports the lowest point and time below thresholds."""
+        summary = wbal_summary(INTERVALS, CP, W_PRIME, thresholds=(0.75, 0.0))
+        self.assertLess(summary["min_wbal"], W_PRIME * 0.75)
+        self.assertGreater(summary["min_wbal"], 0)
+        self.assertGreater(summary["time_below"][0.75], 0)
+        self.assertEqual(summary["time_below"][0.0], 0)
+
+    def test_long_recovery_is_stable(self):
+        """Hours below CP decay the deficit to ~0 without overflow."""
+        series = wbal_series([400] * 60 + [0] * 20000, CP, 5000)
+        self.assertAlmostEqual(float(series[-1]), 5000, places=6)
+
+    def test_dropouts_count_as_zero(self):
+        """None samples are 0 W (recovery)."""
+        series = wbal_series([CP + 100, None], CP, W_PRIME)
+        self.assertGreater(float(series[1]), float(series[0]))
+
+
+@unittest.skipUnless(_optional.numpy(), "NumPy not installed")
+class TestWbalSummaryNumpy(TestWbalSummary):
+    """Run the summary tests against the vectorized implementation."""
+
+    def setUp(self):
+        pass
+
+    def test_small_w_prime_uses_many_chunks(self):
+        """Fast recovery rates force small chunks; results still match streaming."""
+        stream = WbalStream(400, 500, thresholds=())
+        samples = ([600] * 20 + [0] * 40) * 50
+        expected = [stream.add(w) for w in samples]
+        series = wbal_series(samples, 400, 500)
+        for i in range(0, len(samples), 37):
+            self.assertAlmostEqual(float(series[i]), expected[i], places=6)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+W' balance (W'bal) from a power stream using Skiba's differential model.
+
+Usage:
+    python wbal.py <CP_watts> <W_prime_joules> <power_file>
+    python wbal.py 250 20000 ride.csv
+    python wbal.py 250 20000 ride.csv --below 0.5,0.25,0 --json
+    python wbal.py 250 20000 ride.csv --json --series
+
+CP may be FTP when no CP test is available. Power file format is the same
+as calculate_tss.py --power-file.
+
+Model (Skiba et al. 2015, differential form):
+- P > CP:  W'bal drops by (P - CP) joules per second
+- P <= CP: dW'bal/dt = (W' - W'bal) × (CP - P) / W'  (recovery toward W')
+Each sample is integrated exactly assuming constant power within it, so
+the streaming and vectorized forms agree to floating-point precision.
+"""
+
+import argparse
+import json
+import math
+import sys
+
+import _optional
+from power_stream import power_samples
+
+DEFAULT_THRESHOLDS = (0.5, 0.25, 0.0)
+
+# Cap on cumulative recovery exponent per vectorized chunk (keeps exp() finite)
+_MAX_CHUNK_EXPONENT = 600.0
+
+
+class WbalStream:
+    """
+    Streaming W'bal calculator: O(1) work and memory per sample.
+
+    Tracks the current W'bal, its minimum, and time spent below each
+    threshold (fractions of W'; 0.0 means W' fully depleted).
+    """
+
+    __slots__ = ('cp', 'w_prime', 'dt', 'thresholds', '_expended', 'minimum',
+                 'count', '_below')
+
+    def __init__(self, cp: float, w_prime: float, sample_rate_hz: float = 1.0,
+                 thresholds=DEFAULT_THRESHOLDS):
+        if cp <= 0 or w_prime <= 0:
+            raise ValueError("CP and W' must be positive")
+        if sample_rate_hz <= 0:
+            raise ValueError("sample_rate_hz must be positive")
+        self.cp = cp
+        self.w_prime = w_prime
+        self.dt = 1.0 / sample_rate_hz
+        self.thresholds = tuple(thresholds)
+        self._expended = 0.0
+        self.minimum = w_prime
+        self.count = 0
+        self._below = [0] * len(self.thresholds)
+
+    @property
+    def wbal(self) -> float:
+        """Current W' balance in joules."""
+        return self.w_prime - self._expended
+
+    def add(self, watts: float) -> float:
+        """Add one power sample (None = 0 W); returns the new W'bal."""
+        watts = float(watts) if watts is not None else 0.0
+        if watts > self.cp:
+            self._expended += (watts - self.cp) * self.dt
+        else:
+            self._expended *= math.exp(-(self.cp - watts) * self.dt / self.w_prime)
+        self.count += 1
+
+        wbal = self.w_prime - self._expended
+        if wbal < self.minimum:
+            self.minimum = wbal
+        for i, fraction in enumerate(self.thresholds):
+            if wbal < fraction * self.w_prime:
+                self._below[i] += 1
+        return wbal
+
+    def time_below(self) -> dict:
+        """Seconds spent below each threshold, keyed by fraction of W'."""
+        return {fraction: n * self.dt for fraction, n in zip(self.thresholds, self._below)}
+
+
+def wbal_series(samples, cp: float, w_prime: float, sample_rate_hz: float = 1.0):
+    """
+    Compute the full W'bal series for a ride.
+
+    With NumPy the recurrence e[t] = e[t-1]·exp(-r[t]) + b[t] (e = W'
+    expended) is solved in closed form per chunk via cumulative sums,
+    with chunks sized so the exponents stay finite. Without NumPy it
+    falls back to WbalStream. Returns an ndarray or list.
+    """
+    numpy = _optional.numpy()
+    if numpy is None:
+        stream = WbalStream(cp, w_prime, sample_rate_hz, thresholds=())
+        return [stream.add(w) for w in samples]
+
+    if cp <= 0 or w_prime <= 0:
+        raise ValueError("CP and W' must be positive")
+    if sample_rate_hz <= 0:
+        raise ValueError("sample_rate_hz must be positive")
+
+    watts = _optional.float_array(samples)
+    dt = 1.0 / sample_rate_hz
+    recovery = numpy.where(watts < cp, (cp - watts) * dt / w_prime, 0.0)
+    depletion = numpy.where(watts > cp, (watts - cp) * dt, 0.0)
+
+    max_rate = float(recovery.max()) if recovery.size else 0.0
+    chunk = len(watts) if max_rate == 0 else max(1, int(_MAX_CHUNK_EXPONENT / max_rate))
+
+    expended = numpy.empty_like(watts)
+    carry = 0.0
+    for start in range(0, len(watts), chunk):
+        r = numpy.cumsum(recovery[start:start + chunk])
+        growth = numpy.exp(r)
+        e = (carry + numpy.cumsum(depletion[start:start + chunk] * growth)) / growth
+        expended[start:start + chunk] = e
+        carry = float(e[-1])
+
+    return w_prime - expended
+
+
+def wbal_summary(samples, cp: float, w_prime: float, sample_rate_hz: float = 1.0,
+                 thresholds=DEFAULT_THRESHOLDS) -> dict:
+    """
+    Summarize W'bal for a ride: series, minimum and time below thresholds.
+
+    Uses the vectorized series when NumPy is available, otherwise one
+    streaming pass. Time below is in seconds, keyed by fraction of W'.
+    """
+    numpy = _optional.numpy()
+    if numpy is None:
+        stream = WbalStream(cp, w_prime, sample_rate_hz, thresholds)
+        series = [stream.add(w) for w in samples]
+        return {
+            "series": series,
+            "min_wbal": stream.minimum if series else w_prime,
+            "time_below": stream.time_below(),
+        }
+
+    series = wbal_series(samples, cp, w_prime, sample_rate_hz)
+    dt = 1.0 / sample_rate_hz
+    return {
+        "series": series,
+        "min_wbal": min(float(series.min()), w_prime) if len(series) else w_prime,
+        "time_below": {fraction: int(numpy.count_nonzero(series < fraction * w_prime)) * dt
+                       for fraction in thresholds},
+    }
+
+
+def parse_thresholds(value: str) -> tuple:
+    """Parse comma-separated W' fractions for --below."""
+    try:
+        return tuple(float(x) for x in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError("--below expects comma-separated fractions (e.g., 0.5,0.25,0)")
+
+
+def print_summary(summary: dict, cp: float, w_prime: float, as_json: bool = False,
+                  include_series: bool = False):
+    """Print a W'bal summary."""
+    if as_json:
+        output = {
+            "cp": cp,
+            "w_prime": w_prime,
+            "min_wbal": round(summary["min_wbal"], 0),
+            "min_wbal_percent": round(summary["min_wbal"] / w_prime * 100, 1),
+            "time_below_seconds": {f"{fraction:g}": round(sec, 1)
+                                   for fraction, sec in summary["time_below"].items()},
+        }
+        if include_series:
+            output["series"] = [round(float(v), 0) for v in summary["series"]]
+        print(json.dumps(output, indent=2))
+        return
+
+    print(f"\n{'='*50}")
+    print(f"  W' Balance - CP: {cp:g}W | W': {w_prime:g} J")
+    print(f"{'='*50}\n")
+    print(f"  Minimum W'bal:     {summary['min_wbal']:.0f} J "
+          f"({summary['min_wbal'] / w_prime * 100:.0f}%)")
+    for fraction, seconds in summary["time_below"].items():
+        print(f"  Time below {fraction * 100:>3.0f}%:  {seconds / 60:.1f} min")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute W' balance (Skiba) from a power stream")
+    parser.add_argument('cp', type=float, help='Critical Power (or FTP) in watts')
+    parser.add_argument('w_prime', type=float, help="W' in joules")
+    parser.add_argument('power_file', help="Power samples ('-' for stdin)")
+    parser.add_argument('--sample-rate', type=float,
+                        help='Samples per second (default: .cyps header rate, else 1)')
+    parser.add_argument('--below', type=parse_thresholds, default=DEFAULT_THRESHOLDS,
+                        help="W' fractions to report time below (default: 0.5,0.25,0)")
+    parser.add_argument('--series', action='store_true', help='Include the W\'bal series in JSON output')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        with power_samples(args.power_file, args.sample_rate) as (samples, rate):
+            summary = wbal_summary(samples, args.cp, args.w_prime, rate, args.below)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_summary(summary, args.cp, args.w_prime, args.json, args.series)
+
+
+if __name__ == '__main__':
+    main()